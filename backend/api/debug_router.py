@@ -0,0 +1,96 @@
+"""
+Rotas de diagnóstico (apenas dev/ops).
+Montadas somente quando `DEBUG_ENDPOINTS=1`.
+"""
+import threading
+from typing import Optional
+
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException
+from starlette.responses import PlainTextResponse
+
+from .. import glpi_client
+from ..logic.ticket_snapshot import snapshot_store
+from ..utils import bulkhead, profiling
+from ..utils.glpi_stats import latency_tracker
+from ..utils.governor import governor
+from ..utils.inflight import inflight
+from ..utils.jobs import job_store
+from ..utils.leader import leader
+from ..utils.tracing import trace_store
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+@router.get("/traces")
+def list_slow_traces(limit: int = 10, endpoint: Optional[str] = None, spans: bool = False):
+    """
+    Lista as traces mais lentas do ring buffer (ordem decrescente de duração).
+    Use `spans=true` para incluir os spans individuais de cada trace.
+    """
+    result = []
+    for trace in trace_store.slowest(limit=limit, endpoint=endpoint):
+        data = trace.to_dict()
+        if not spans:
+            data.pop("spans", None)
+        result.append(data)
+    return result
+
+
+@router.get("/traces/{request_id}")
+def get_trace(request_id: str):
+    trace = trace_store.get(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace não encontrada.")
+    return trace.to_dict()
+
+
+@router.get("/profiles")
+def list_profiles():
+    """Lista os arquivos de profiling (`.folded`) disponíveis em `PROFILE_DIR`."""
+    return profiling.list_profiles()
+
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def get_profile(name: str):
+    content = profiling.read_profile(name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile não encontrado.")
+    return content
+
+
+@router.get("/runtime")
+async def runtime_stats():
+    """
+    Ocupação do threadpool padrão do Starlette e dos bulkheads (`heavy`, `light`,
+    `names`), onde rodam as rotas do dashboard e a resolução de nomes.
+    Precisa ser `async` para ler o limitador no event loop.
+    Inclui o estado do snapshot colunar de tickets (null quando ausente/expirado)
+    e as sessões do pool GLPI (idade e requisições em andamento), além da
+    ocupação/fila do governador de chamadas GLPI por classe de tráfego e o
+    estado da eleição de líder do trabalho agendado.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    snap = snapshot_store.current()
+    return {
+        "threadpool": {
+            "total_tokens": limiter.total_tokens,
+            "borrowed_tokens": stats.borrowed_tokens,
+            "tasks_waiting": stats.tasks_waiting,
+        },
+        "bulkheads": bulkhead.stats(),
+        "inflight": inflight.stats(),
+        "jobs": job_store.stats(),
+        "threads": threading.active_count(),
+        "snapshot": snap.info() if snap is not None else None,
+        "glpi_sessions": glpi_client.session_pool.stats(),
+        "glpi_governor": governor.stats(),
+        "leader": leader.stats(),
+    }
+
+
+@router.get("/glpi-stats")
+def glpi_stats():
+    """Latência/payload por formato de consulta e passo atual (usado com `GLPI_ADAPTIVE=1`)."""
+    return latency_tracker.snapshot()
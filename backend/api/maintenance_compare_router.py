@@ -0,0 +1,127 @@
+"""
+Rota de comparação de períodos para Dashboard de Manutenção (uma passada para N períodos)
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from .. import glpi_client
+from ..config import get_api_url, get_app_token, get_user_token
+from ..logic.criteria_helpers import parse_day
+from ..logic.dimensions import DIMENSIONS
+from ..logic.maintenance_compare_logic import generate_period_comparison
+from ..schemas_maintenance import MaintenanceComparison
+from ..logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
+from ..utils.cache import cache
+from ..utils import deadline, tracing
+from ..utils.bulkhead import bulkhead
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
+
+MAX_PERIODS = 6
+
+
+def _parse_periods(periodo: List[str]) -> List[Tuple[str, str]]:
+    """`inicio,fim` (YYYY-MM-DD) por período, normalizados; ValueError com mensagem legível."""
+    if not periodo:
+        raise ValueError("informe ao menos um período (periodo=inicio,fim)")
+    if len(periodo) > MAX_PERIODS:
+        raise ValueError(f"no máximo {MAX_PERIODS} períodos")
+    out = []
+    for raw in periodo:
+        inicio, sep, fim = raw.partition(",")
+        try:
+            if not sep:
+                raise ValueError(raw)
+            first, last = parse_day(inicio.strip()), parse_day(fim.strip())
+            if first > last:
+                raise ValueError(raw)
+        except ValueError:
+            raise ValueError(f"período inválido: {raw!r} (use inicio,fim no formato YYYY-MM-DD, inicio <= fim)")
+        out.append((first.isoformat(), last.isoformat()))
+    return out
+
+
+def _compare_key(dimensao: str, periodos: List[Tuple[str, str]], top: Optional[int] = None) -> str:
+    top_key = 'all' if (top is None or top == 0) else str(top)
+    return f"maintenance_compare_{dimensao}_{'|'.join(f'{a},{b}' for a, b in periodos)}_{top_key}"
+
+
+def _route_key(dimensao: str, periodo: List[str], top: Optional[int] = None) -> str:
+    """Chave do bulkhead (single-flight/stale): mesma da rota, com os períodos normalizados."""
+    try:
+        return _compare_key(dimensao, _parse_periods(periodo), top)
+    except ValueError:
+        return f"maintenance_compare_invalid_{dimensao}_{'|'.join(periodo)}"
+
+
+@router.get("/comparativo", response_model=MaintenanceComparison)
+@bulkhead('heavy', cache_key=_route_key)
+def get_period_comparison(
+    dimensao: str,
+    periodo: List[str] = Query(..., description="Período `inicio,fim` (YYYY-MM-DD); repita para comparar. O primeiro é a referência."),
+    top: Optional[int] = None,
+):
+    """
+    Compara uma dimensão (`entidade`, `categoria`, `tecnico` ou `status`) entre períodos,
+    com uma única varredura da união dos períodos. Deltas em relação ao primeiro período.
+    """
+    if dimensao not in DIMENSIONS:
+        raise HTTPException(status_code=422, detail=f"dimensao inválida; use uma de: {', '.join(DIMENSIONS)}")
+    try:
+        periodos = _parse_periods(periodo)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    cache_key = _compare_key(dimensao, periodos, top)
+    cached = cache.get(cache_key)
+    if cached:
+        return cached
+
+    API_URL = get_api_url()
+    APP_TOKEN = get_app_token()
+    USER_TOKEN = get_user_token()
+
+    if not all([API_URL, APP_TOKEN, USER_TOKEN]):
+        raise HTTPException(status_code=500, detail="Variáveis de ambiente da API não configuradas.")
+
+    try:
+        headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
+        with tracing.span('router.compute', endpoint='comparativo'):
+            comparison = generate_period_comparison(
+                api_url=API_URL,
+                session_headers=headers,
+                dimensao=dimensao,
+                periodos=periodos,
+                top_n=top if (top not in (None, 0)) else None,
+            )
+
+        result = MaintenanceComparison(**comparison)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
+        logger.info(
+            "endpoint=/manutencao/comparativo dimensao=%s periodos=%d itens=%d",
+            dimensao, len(periodos), len(result.itens)
+        )
+        return result
+
+    except GLPIAuthError as e:
+        logger.error("Erro de autenticação GLPI: %s", str(e))
+        raise HTTPException(status_code=502, detail="Falha de comunicação com serviço GLPI.")
+    except GLPINetworkError as e:
+        logger.error("Erro de rede GLPI: %s", str(e))
+        stale = cache.get_stale(cache_key)
+        if stale is not None:
+            logger.warning("Retornando valor stale para comparativo devido a erro de rede")
+            return stale
+        status = 504 if getattr(e, 'timeout', False) else 502
+        raise HTTPException(status_code=status, detail="Falha de comunicação com serviço GLPI.")
+    except GLPISearchError as e:
+        logger.error("Erro de busca GLPI: %s", str(e))
+        raise HTTPException(status_code=502, detail="Erro ao buscar dados no GLPI.")
+    except Exception as e:
+        logger.exception("Erro inesperado ao comparar períodos: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno ao comparar períodos.")
@@ -0,0 +1,131 @@
+"""
+Rotas de jobs assíncronos para períodos grandes (rankings e estatísticas).
+"""
+import asyncio
+import inspect
+import json
+import logging
+import typing
+from typing import Any, Callable, Dict, Type
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ConfigDict, ValidationError, create_model
+from starlette.responses import StreamingResponse
+
+from . import maintenance_pivot_router, maintenance_ranking_router, maintenance_stats_router
+from ..schemas_maintenance import MaintenanceJobRequest, MaintenanceJobStatus
+from ..utils.bulkhead import BulkheadFullError
+from ..utils.jobs import job_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
+
+# tipo -> rota síncrona (decorada com @bulkhead, expõe `__wrapped__` e `cache_key`)
+JOB_KINDS = {
+    'ranking-entidades': maintenance_ranking_router.get_entity_ranking,
+    'ranking-categorias': maintenance_ranking_router.get_category_ranking,
+    'ranking-tecnicos': maintenance_ranking_router.get_technician_ranking,
+    'top-atribuicao-entidades': maintenance_ranking_router.get_top_atribuicao_entidades,
+    'top-atribuicao-categorias': maintenance_ranking_router.get_top_atribuicao_categorias,
+    'stats-gerais': maintenance_stats_router.get_maintenance_general_stats,
+    'pivot': maintenance_pivot_router.get_pivot,
+}
+
+_EVENTS_POLL_SEC = 0.5
+
+_PARAM_MODELS: Dict[str, Type[BaseModel]] = {}
+
+
+def _params_model(tipo: str, fn: Callable[..., Any]) -> Type[BaseModel]:
+    """Modelo pydantic dos parâmetros da rota (mesmos tipos e defaults da assinatura)."""
+    model = _PARAM_MODELS.get(tipo)
+    if model is None:
+        hints = typing.get_type_hints(fn)
+        fields = {
+            name: (
+                hints.get(name, Any),
+                ... if param.default is inspect.Parameter.empty else param.default,
+            )
+            for name, param in inspect.signature(fn).parameters.items()
+        }
+        model = create_model(
+            f"JobParams_{tipo.replace('-', '_')}",
+            __config__=ConfigDict(extra='forbid'),
+            **fields,
+        )
+        _PARAM_MODELS[tipo] = model
+    return model
+
+
+def _validate_params(tipo: str, fn: Callable[..., Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida e converte `params` como a rota síncrona faria com a query string; 422 se inválidos."""
+    try:
+        return _params_model(tipo, fn).model_validate(params).model_dump()
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'params'}: {err['msg']}" for err in e.errors()
+        )
+        raise HTTPException(status_code=422, detail=f"Parâmetros inválidos para {tipo}: {problems}")
+
+
+@router.post("/jobs", response_model=MaintenanceJobStatus, status_code=202)
+def create_job(body: MaintenanceJobRequest, response: Response):
+    """
+    Agenda o cálculo de uma rota de ranking/estatística e devolve o job na hora.
+    O resultado vai para o cache com a chave normal da rota.
+    """
+    route = JOB_KINDS.get(body.tipo)
+    if route is None:
+        raise HTTPException(status_code=422, detail=f"tipo inválido; use um de: {', '.join(sorted(JOB_KINDS))}")
+    fn = route.__wrapped__
+    params = _validate_params(body.tipo, fn, body.params)
+    key = route.cache_key(**params)
+
+    try:
+        job = job_store.submit(body.tipo, fn, key, params)
+    except BulkheadFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Fila de jobs cheia, tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+    logger.info("endpoint=/manutencao/jobs tipo=%s job=%s status=%s", body.tipo, job.id, job.status)
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.id}"
+    return job.to_dict(include_result=False)
+
+
+@router.get("/jobs/{job_id}", response_model=MaintenanceJobStatus)
+def get_job(job_id: str):
+    """Estado, progresso e (quando `done`) resultado do job."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado (ou expirado).")
+    return jsonable_encoder(job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-Sent Events: `progress` a cada mudança e `done`/`failed` (com o job completo) no fim.
+    O `StreamingResponse` encerra o gerador quando o cliente desconecta.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado (ou expirado).")
+
+    async def events():
+        last = None
+        while True:
+            if job.finished:
+                data = json.dumps(jsonable_encoder(job.to_dict()), ensure_ascii=False)
+                yield f"event: {job.status}\ndata: {data}\n\n"
+                return
+            state = job.to_dict(include_result=False)
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(_EVENTS_POLL_SEC)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
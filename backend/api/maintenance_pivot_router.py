@@ -0,0 +1,125 @@
+"""
+Rota de tabela cruzada (pivot) para Dashboard de Manutenção (2 ou 3 dimensões, uma passada)
+"""
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from .. import glpi_client
+from ..config import get_api_url, get_app_token, get_user_token
+from ..logic.criteria_helpers import parse_day
+from ..logic.dimensions import DIMENSIONS
+from ..logic.maintenance_pivot_logic import generate_pivot
+from ..schemas_maintenance import MaintenancePivot
+from ..logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
+from ..utils.cache import cache
+from ..utils import deadline, tracing
+from ..utils.bulkhead import bulkhead
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
+
+
+def _parse_dimensions(dimensoes: str) -> List[str]:
+    names = [d.strip() for d in dimensoes.split(",") if d.strip()]
+    if not 2 <= len(names) <= 3 or len(set(names)) != len(names):
+        raise ValueError("informe 2 ou 3 dimensões distintas (ex.: dimensoes=entidade,status)")
+    unknown = [d for d in names if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"dimensão inválida: {', '.join(unknown)}; use: {', '.join(DIMENSIONS)}")
+    return names
+
+
+def _parse_top(top: Optional[str], n: int) -> List[Optional[int]]:
+    """`10` vale para todos os eixos; `10,4` é um K por eixo (0 ou vazio = eixo inteiro)."""
+    if top is None or not top.strip():
+        return [None] * n
+    try:
+        values = [int(v) if v.strip() else None for v in top.split(",")]
+    except ValueError:
+        raise ValueError("top inválido: use um inteiro ou um por dimensão (ex.: top=10,4)")
+    if len(values) == 1:
+        values = values * n
+    if len(values) != n or any(v is not None and v < 0 for v in values):
+        raise ValueError("top inválido: use um inteiro ou um por dimensão (ex.: top=10,4)")
+    return [v or None for v in values]
+
+
+def _pivot_key(dimensoes: str, inicio: str, fim: str, top: Optional[str] = None) -> str:
+    return f"maintenance_pivot_{dimensoes}_{inicio}_{fim}_{top or 'all'}"
+
+
+@router.get("/pivot", response_model=MaintenancePivot)
+@bulkhead('heavy', cache_key=_pivot_key)
+def get_pivot(dimensoes: str, inicio: str, fim: str, top: Optional[str] = None):
+    """
+    Tabela cruzada esparsa (ex.: entidade x status, tecnico x categoria) no período,
+    calculada numa única varredura, com top-K por eixo.
+
+    - `dimensoes`: 2 ou 3 de `entidade`, `categoria`, `tecnico`, `status` (ex.: `entidade,status`)
+    - `top`: K por eixo, `10` (todos os eixos) ou `10,4` (um por dimensão); omita ou use 0 para o eixo inteiro
+    """
+    try:
+        names = _parse_dimensions(dimensoes)
+        top_k = _parse_top(top, len(names))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        # Estrito: `fromisoformat` aceitaria `YYYYMMDD`, que o GLPI rejeita e o snapshot/fatias ignoram
+        if parse_day(inicio) > parse_day(fim):
+            raise ValueError(inicio)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="período inválido: use inicio e fim no formato YYYY-MM-DD, inicio <= fim")
+
+    cache_key = _pivot_key(dimensoes, inicio, fim, top)
+    cached = cache.get(cache_key)
+    if cached:
+        return cached
+
+    API_URL = get_api_url()
+    APP_TOKEN = get_app_token()
+    USER_TOKEN = get_user_token()
+
+    if not all([API_URL, APP_TOKEN, USER_TOKEN]):
+        raise HTTPException(status_code=500, detail="Variáveis de ambiente da API não configuradas.")
+
+    try:
+        headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
+        with tracing.span('router.compute', endpoint='pivot'):
+            pivot = generate_pivot(
+                api_url=API_URL,
+                session_headers=headers,
+                dimensoes=names,
+                inicio=inicio,
+                fim=fim,
+                top=top_k,
+            )
+
+        result = MaintenancePivot(**pivot)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
+        logger.info(
+            "endpoint=/manutencao/pivot dimensoes=%s celulas=%d total=%d",
+            ",".join(names), len(result.celulas), result.total
+        )
+        return result
+
+    except GLPIAuthError as e:
+        logger.error("Erro de autenticação GLPI: %s", str(e))
+        raise HTTPException(status_code=502, detail="Falha de comunicação com serviço GLPI.")
+    except GLPINetworkError as e:
+        logger.error("Erro de rede GLPI: %s", str(e))
+        stale = cache.get_stale(cache_key)
+        if stale is not None:
+            logger.warning("Retornando valor stale para pivot devido a erro de rede")
+            return stale
+        status = 504 if getattr(e, 'timeout', False) else 502
+        raise HTTPException(status_code=status, detail="Falha de comunicação com serviço GLPI.")
+    except GLPISearchError as e:
+        logger.error("Erro de busca GLPI: %s", str(e))
+        raise HTTPException(status_code=502, detail="Erro ao buscar dados no GLPI.")
+    except Exception as e:
+        logger.exception("Erro inesperado ao gerar pivot: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno ao gerar tabela cruzada.")
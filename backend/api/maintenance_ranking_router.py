@@ -23,16 +23,26 @@ from ..schemas_maintenance import (
 )
 from ..logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
 from ..utils.cache import cache
+from ..utils import deadline, tracing
+from ..utils.bulkhead import bulkhead
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
 
 
+def _top_key(top: Optional[int]) -> str:
+    return 'all' if (top is None or top == 0) else str(top)
+
+
+def _entity_rank_key(inicio: str, fim: str, top: Optional[int] = None) -> str:
+    return f"maintenance_entity_rank_{inicio}_{fim}_{_top_key(top)}"
+
+
 @router.get("/ranking-entidades", response_model=list[EntityRankingItem])
+@bulkhead('heavy', cache_key=_entity_rank_key)
 def get_entity_ranking(inicio: str, fim: str, top: Optional[int] = None):
-    top_key = 'all' if (top is None or top == 0) else str(top)
-    cache_key = f"maintenance_entity_rank_{inicio}_{fim}_{top_key}"
+    cache_key = _entity_rank_key(inicio, fim, top)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -47,13 +57,14 @@ def get_entity_ranking(inicio: str, fim: str, top: Optional[int] = None):
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
         t0 = time.perf_counter()
-        ranking = generate_entity_ranking(
-            api_url=API_URL,
-            session_headers=headers,
-            inicio=inicio,
-            fim=fim,
-            top_n=top if (top not in (None, 0)) else None
-        )
+        with tracing.span('router.compute', endpoint='ranking-entidades'):
+            ranking = generate_entity_ranking(
+                api_url=API_URL,
+                session_headers=headers,
+                inicio=inicio,
+                fim=fim,
+                top_n=top if (top not in (None, 0)) else None
+            )
         t1 = time.perf_counter()
         try:
             from ..utils import metrics
@@ -66,7 +77,9 @@ def get_entity_ranking(inicio: str, fim: str, top: Optional[int] = None):
             pass
 
         result = [EntityRankingItem(**item) for item in ranking]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/ranking-entidades inicio=%s fim=%s count=%d duration_ms=%.1f",
             inicio, fim, len(result), (t1 - t0) * 1000
@@ -99,10 +112,14 @@ def get_entity_ranking(inicio: str, fim: str, top: Optional[int] = None):
         raise HTTPException(status_code=500, detail="Erro interno ao processar ranking.")
 
 
+def _category_rank_key(inicio: str, fim: str, top: Optional[int] = None) -> str:
+    return f"maintenance_category_rank_{inicio}_{fim}_{_top_key(top)}"
+
+
 @router.get("/ranking-categorias", response_model=list[CategoryRankingItem])
+@bulkhead('heavy', cache_key=_category_rank_key)
 def get_category_ranking(inicio: str, fim: str, top: Optional[int] = None):
-    top_key = 'all' if (top is None or top == 0) else str(top)
-    cache_key = f"maintenance_category_rank_{inicio}_{fim}_{top_key}"
+    cache_key = _category_rank_key(inicio, fim, top)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -117,13 +134,14 @@ def get_category_ranking(inicio: str, fim: str, top: Optional[int] = None):
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
         t0 = time.perf_counter()
-        ranking = generate_category_ranking(
-            api_url=API_URL,
-            session_headers=headers,
-            inicio=inicio,
-            fim=fim,
-            top_n=top if (top not in (None, 0)) else None
-        )
+        with tracing.span('router.compute', endpoint='ranking-categorias'):
+            ranking = generate_category_ranking(
+                api_url=API_URL,
+                session_headers=headers,
+                inicio=inicio,
+                fim=fim,
+                top_n=top if (top not in (None, 0)) else None
+            )
         t1 = time.perf_counter()
         try:
             from ..utils import metrics
@@ -136,7 +154,9 @@ def get_category_ranking(inicio: str, fim: str, top: Optional[int] = None):
             pass
 
         result = [CategoryRankingItem(**item) for item in ranking]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/ranking-categorias inicio=%s fim=%s count=%d duration_ms=%.1f",
             inicio, fim, len(result), (t1 - t0) * 1000
@@ -169,10 +189,14 @@ def get_category_ranking(inicio: str, fim: str, top: Optional[int] = None):
         raise HTTPException(status_code=500, detail="Erro interno ao processar ranking.")
 
 
+def _top_entities_key(top: Optional[int] = None) -> str:
+    return f"maintenance_top_entities_{_top_key(top)}"
+
+
 @router.get("/top-atribuicao-entidades", response_model=list[EntityRankingItem])
+@bulkhead('heavy', cache_key=_top_entities_key)
 def get_top_atribuicao_entidades(top: Optional[int] = None):
-    top_key = 'all' if (top is None or top == 0) else str(top)
-    cache_key = f"maintenance_top_entities_{top_key}"
+    cache_key = _top_entities_key(top)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -187,11 +211,12 @@ def get_top_atribuicao_entidades(top: Optional[int] = None):
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
         t0 = time.perf_counter()
-        ranking = generate_entity_top_all(
-            api_url=API_URL,
-            session_headers=headers,
-            top_n=top if (top not in (None, 0)) else None,
-        )
+        with tracing.span('router.compute', endpoint='top-atribuicao-entidades'):
+            ranking = generate_entity_top_all(
+                api_url=API_URL,
+                session_headers=headers,
+                top_n=top if (top not in (None, 0)) else None,
+            )
         t1 = time.perf_counter()
         try:
             from ..utils import metrics
@@ -204,7 +229,9 @@ def get_top_atribuicao_entidades(top: Optional[int] = None):
             pass
 
         result = [EntityRankingItem(**item) for item in ranking]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/top-atribuicao-entidades count=%d duration_ms=%.1f",
             len(result), (t1 - t0) * 1000
@@ -237,10 +264,14 @@ def get_top_atribuicao_entidades(top: Optional[int] = None):
         raise HTTPException(status_code=500, detail="Erro interno ao processar ranking.")
 
 
+def _top_categories_key(top: Optional[int] = None) -> str:
+    return f"maintenance_top_categories_{_top_key(top)}"
+
+
 @router.get("/top-atribuicao-categorias", response_model=list[CategoryRankingItem])
+@bulkhead('heavy', cache_key=_top_categories_key)
 def get_top_atribuicao_categorias(top: Optional[int] = None):
-    top_key = 'all' if (top is None or top == 0) else str(top)
-    cache_key = f"maintenance_top_categories_{top_key}"
+    cache_key = _top_categories_key(top)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -255,11 +286,12 @@ def get_top_atribuicao_categorias(top: Optional[int] = None):
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
         t0 = time.perf_counter()
-        ranking = generate_category_top_all(
-            api_url=API_URL,
-            session_headers=headers,
-            top_n=top if (top not in (None, 0)) else None,
-        )
+        with tracing.span('router.compute', endpoint='top-atribuicao-categorias'):
+            ranking = generate_category_top_all(
+                api_url=API_URL,
+                session_headers=headers,
+                top_n=top if (top not in (None, 0)) else None,
+            )
         t1 = time.perf_counter()
         try:
             from ..utils import metrics
@@ -272,7 +304,9 @@ def get_top_atribuicao_categorias(top: Optional[int] = None):
             pass
 
         result = [CategoryRankingItem(**item) for item in ranking]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/top-atribuicao-categorias count=%d duration_ms=%.1f",
             len(result), (t1 - t0) * 1000
@@ -305,16 +339,23 @@ def get_top_atribuicao_categorias(top: Optional[int] = None):
         raise HTTPException(status_code=500, detail="Erro interno ao processar ranking.")
 
 
-@router.get("/ranking-tecnicos", response_model=list[TechnicianRankingItem])
-def get_technician_ranking(inicio: str, fim: str, top: Optional[int] = None, incluirNaoAtribuido: Optional[bool] = False):
+def _applied_tech_top(top: Optional[int]) -> int:
     # Limite de TOP vindo do ambiente (padrão 20)
     top_limit = tech_rank_top_limit()
-
     # Aplicar clamp do top ao limite e defaultar para limite quando ausente
-    applied_top = top_limit if (top is None or top == 0) else min(int(top), top_limit)
-    top_key = str(applied_top)
+    return top_limit if (top is None or top == 0) else min(int(top), top_limit)
+
+
+def _technician_rank_key(inicio: str, fim: str, top: Optional[int] = None, incluirNaoAtribuido: Optional[bool] = False) -> str:
     include_key = 'inclui' if incluirNaoAtribuido else 'nao_inclui'
-    cache_key = f"maintenance_technician_rank_{inicio}_{fim}_{top_key}_{include_key}"
+    return f"maintenance_technician_rank_{inicio}_{fim}_{_applied_tech_top(top)}_{include_key}"
+
+
+@router.get("/ranking-tecnicos", response_model=list[TechnicianRankingItem])
+@bulkhead('heavy', cache_key=_technician_rank_key)
+def get_technician_ranking(inicio: str, fim: str, top: Optional[int] = None, incluirNaoAtribuido: Optional[bool] = False):
+    applied_top = _applied_tech_top(top)
+    cache_key = _technician_rank_key(inicio, fim, top, incluirNaoAtribuido)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -329,14 +370,15 @@ def get_technician_ranking(inicio: str, fim: str, top: Optional[int] = None, inc
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
         t0 = time.perf_counter()
-        ranking = generate_technician_ranking(
-            api_url=API_URL,
-            session_headers=headers,
-            inicio=inicio,
-            fim=fim,
-            top_n=applied_top,
-            include_unassigned=bool(incluirNaoAtribuido),
-        )
+        with tracing.span('router.compute', endpoint='ranking-tecnicos'):
+            ranking = generate_technician_ranking(
+                api_url=API_URL,
+                session_headers=headers,
+                inicio=inicio,
+                fim=fim,
+                top_n=applied_top,
+                include_unassigned=bool(incluirNaoAtribuido),
+            )
         t1 = time.perf_counter()
         try:
             from ..utils import metrics
@@ -349,7 +391,9 @@ def get_technician_ranking(inicio: str, fim: str, top: Optional[int] = None, inc
             pass
 
         result = [TechnicianRankingItem(**item) for item in ranking]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/ranking-tecnicos inicio=%s fim=%s count=%d top_applied=%d",
             inicio, fim, len(result), applied_top
@@ -15,16 +15,22 @@ from ..schemas_maintenance import (
 )
 from ..logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
 from ..utils.cache import cache
+from ..utils import deadline, tracing
+from ..utils.bulkhead import bulkhead
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
 
 
+def _stats_key(inicio: str, fim: str) -> str:
+    return f"maintenance_stats_{inicio}_{fim}"
+
 
 @router.get("/stats-gerais", response_model=MaintenanceGeneralStats)
+@bulkhead('heavy', cache_key=_stats_key)
 def get_maintenance_general_stats(inicio: str, fim: str):
-    cache_key = f"maintenance_stats_{inicio}_{fim}"
+    cache_key = _stats_key(inicio, fim)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -38,15 +44,18 @@ def get_maintenance_general_stats(inicio: str, fim: str):
 
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
-        stats = generate_maintenance_stats(
-            api_url=API_URL,
-            session_headers=headers,
-            inicio=inicio,
-            fim=fim
-        )
+        with tracing.span('router.compute', endpoint='stats-gerais'):
+            stats = generate_maintenance_stats(
+                api_url=API_URL,
+                session_headers=headers,
+                inicio=inicio,
+                fim=fim
+            )
 
         result = MaintenanceGeneralStats(**stats)
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/stats-gerais inicio=%s fim=%s novos=%d em_atendimento=%d pendentes=%d planejados=%d resolvidos=%d",
             inicio, fim, stats['novos'], stats.get('em_atendimento', 0), stats['pendentes'], stats['planejados'], stats['resolvidos']
@@ -12,18 +12,25 @@ from ..logic.maintenance_tickets_logic import get_maintenance_new_tickets
 from ..schemas_maintenance import MaintenanceNewTicketItem
 from ..logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
 from ..utils.cache import cache
+from ..utils import deadline, tracing
+from ..utils.bulkhead import bulkhead
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/manutencao", tags=["Manutenção"])
 
 
+def _new_tickets_key(limit: Optional[int] = 10) -> str:
+    return f"maintenance_new_tickets_{limit}"
+
+
 @router.get("/tickets-novos", response_model=list[MaintenanceNewTicketItem])
+@bulkhead('light', cache_key=_new_tickets_key)
 def get_new_tickets(limit: Optional[int] = 10):
     """
     Lista os tickets novos mais recentes de manutenção.
     """
-    cache_key = f"maintenance_new_tickets_{limit}"
+    cache_key = _new_tickets_key(limit)
     cached = cache.get(cache_key)
     if cached:
         return cached
@@ -40,14 +47,17 @@ def get_new_tickets(limit: Optional[int] = 10):
 
     try:
         headers = glpi_client.authenticate(API_URL, APP_TOKEN, USER_TOKEN)
-        tickets = get_maintenance_new_tickets(
-            api_url=API_URL,
-            session_headers=headers,
-            limit=limit
-        )
+        with tracing.span('router.compute', endpoint='tickets-novos'):
+            tickets = get_maintenance_new_tickets(
+                api_url=API_URL,
+                session_headers=headers,
+                limit=limit
+            )
 
         result = [MaintenanceNewTicketItem(**ticket) for ticket in tickets]
-        cache.set(cache_key, result)
+        # Resultado parcial (prazo estourado) não vai para o cache; a conclusão em background grava o completo
+        if not deadline.is_partial():
+            cache.set(cache_key, result)
         logger.info(
             "endpoint=/manutencao/tickets-novos count=%d",
             len(result)
@@ -92,4 +92,334 @@ def name_workers() -> int:
         # Clamp seguro entre 1 e 16
         return min(max(1, v), 16)
     except Exception:
-        return 8
\ No newline at end of file
+        return 8
+
+def trace_enabled() -> bool:
+    raw = os.getenv("TRACE_ENABLED", "1").strip().lower()
+    return raw not in ("0", "false")
+
+
+def trace_buffer_size() -> int:
+    try:
+        v = int(os.getenv("TRACE_BUFFER_SIZE", "50"))
+        return max(1, v)
+    except Exception:
+        return 50
+
+
+def trace_slow_ms() -> float:
+    """Duração mínima (ms) para uma trace entrar no buffer de traces lentas."""
+    try:
+        return max(0.0, float(os.getenv("TRACE_SLOW_MS", "0")))
+    except Exception:
+        return 0.0
+
+
+def debug_endpoints_enabled() -> bool:
+    raw = os.getenv("DEBUG_ENDPOINTS", "0").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def profile_token() -> Optional[str]:
+    """Token exigido no header `X-Profile` (ou `?__profile=`) para perfilar uma requisição."""
+    v = (os.getenv("PROFILE_TOKEN") or "").strip()
+    return v or None
+
+
+def profile_dir() -> str:
+    return os.getenv("PROFILE_DIR", "/tmp/manutencao-profiles")
+
+
+def profile_interval_ms() -> float:
+    try:
+        return max(0.5, float(os.getenv("PROFILE_INTERVAL_MS", "5")))
+    except Exception:
+        return 5.0
+
+
+def profile_sampling_enabled() -> bool:
+    raw = os.getenv("PROFILE_SAMPLING", "0").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def profile_dump_interval_sec() -> int:
+    try:
+        return max(5, int(os.getenv("PROFILE_DUMP_INTERVAL_SEC", "60")))
+    except Exception:
+        return 60
+
+
+def ticket_snapshot_enabled() -> bool:
+    raw = os.getenv("TICKET_SNAPSHOT", "0").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def ticket_snapshot_refresh_sec() -> int:
+    """Intervalo entre reconstruções do snapshot colunar de tickets."""
+    try:
+        return max(10, int(os.getenv("TICKET_SNAPSHOT_REFRESH_SEC", "300")))
+    except Exception:
+        return 300
+
+
+def ticket_snapshot_max_age_sec() -> int:
+    """Idade máxima do snapshot para responder consultas (acima disso, volta ao GLPI)."""
+    try:
+        return max(10, int(os.getenv("TICKET_SNAPSHOT_MAX_AGE_SEC", "900")))
+    except Exception:
+        return 900
+
+
+def ticket_snapshot_dir() -> Optional[str]:
+    """Diretório das colunas mapeadas em memória; vazio => snapshot só no processo."""
+    v = (os.getenv("TICKET_SNAPSHOT_DIR") or "").strip()
+    return v or None
+
+
+def session_pool_size() -> int:
+    """Quantidade de sessões GLPI independentes (o GLPI serializa requisições da mesma sessão)."""
+    try:
+        v = int(os.getenv("GLPI_SESSION_POOL_SIZE", "1"))
+        return min(max(1, v), 16)
+    except Exception:
+        return 1
+
+
+def session_refresh_ahead() -> float:
+    """Fração do TTL a partir da qual a sessão é renovada em background (antes de expirar)."""
+    try:
+        v = float(os.getenv("GLPI_SESSION_REFRESH_AHEAD", "0.8"))
+        return min(max(0.1, v), 1.0)
+    except Exception:
+        return 0.8
+
+
+def retry_attempts() -> int:
+    """Novas tentativas (além da primeira) para 5xx transitório e falha de conexão no GLPI."""
+    try:
+        return min(max(0, int(os.getenv("GLPI_RETRY_ATTEMPTS", "2"))), 10)
+    except Exception:
+        return 2
+
+
+def retry_backoff_ms() -> Tuple[int, int]:
+    """(base, teto) do backoff exponencial entre tentativas, em ms."""
+    def _int(env_name: str, default: int) -> int:
+        try:
+            return max(0, int(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    return _int("GLPI_RETRY_BACKOFF_MS", 200), _int("GLPI_RETRY_BACKOFF_MAX_MS", 2000)
+
+
+def breaker_enabled() -> bool:
+    raw = os.getenv("GLPI_BREAKER_ENABLED", "1").strip().lower()
+    return raw not in ("0", "false")
+
+
+def breaker_settings() -> dict:
+    """Parâmetros do circuit breaker do GLPI (ver `utils/circuit_breaker.py`)."""
+    def _num(env_name: str, default: float, minimum: float) -> float:
+        try:
+            return max(minimum, float(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    return {
+        'failure_rate': min(1.0, _num("GLPI_BREAKER_FAILURE_RATE", 0.5, 0.01)),
+        'min_calls': int(_num("GLPI_BREAKER_MIN_CALLS", 10, 1)),
+        'window_sec': _num("GLPI_BREAKER_WINDOW_SEC", 30, 1),
+        'slow_ms': _num("GLPI_BREAKER_SLOW_MS", 8000, 0),
+        'open_sec': _num("GLPI_BREAKER_OPEN_SEC", 15, 1),
+        'half_open_probes': int(_num("GLPI_BREAKER_HALF_OPEN_PROBES", 2, 1)),
+    }
+
+
+def adaptive_enabled() -> bool:
+    raw = os.getenv("GLPI_ADAPTIVE", "0").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def adaptive_timeout_k() -> float:
+    try:
+        return max(1.0, float(os.getenv("GLPI_ADAPTIVE_TIMEOUT_K", "3")))
+    except Exception:
+        return 3.0
+
+
+def adaptive_timeout_min_ms() -> float:
+    try:
+        return max(100.0, float(os.getenv("GLPI_ADAPTIVE_TIMEOUT_MIN_MS", "1000")))
+    except Exception:
+        return 1000.0
+
+
+def adaptive_page_budget_ms() -> float:
+    """Latência alvo por página para o ajuste automático do tamanho de página."""
+    try:
+        return max(50.0, float(os.getenv("GLPI_ADAPTIVE_PAGE_BUDGET_MS", "2000")))
+    except Exception:
+        return 2000.0
+
+
+def adaptive_step_bounds() -> Tuple[int, int]:
+    def _int(env_name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    lo = _int("GLPI_ADAPTIVE_STEP_MIN", 100)
+    return lo, max(lo, _int("GLPI_ADAPTIVE_STEP_MAX", 2000))
+
+
+def hedge_enabled() -> bool:
+    raw = os.getenv("GLPI_HEDGE", "0").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def hedge_max_ratio() -> float:
+    """Fração máxima de requisições duplicadas (hedge) na janela recente."""
+    try:
+        return min(1.0, max(0.0, float(os.getenv("GLPI_HEDGE_MAX_RATIO", "0.05"))))
+    except Exception:
+        return 0.05
+
+
+def hedge_min_delay_ms() -> float:
+    try:
+        return max(1.0, float(os.getenv("GLPI_HEDGE_MIN_DELAY_MS", "50")))
+    except Exception:
+        return 50.0
+
+
+def hedge_workers() -> int:
+    try:
+        return min(max(2, int(os.getenv("GLPI_HEDGE_WORKERS", "8"))), 32)
+    except Exception:
+        return 8
+
+
+def governor_settings() -> dict:
+    """Limites globais de chamadas ao GLPI (ver `utils/governor.py`)."""
+    def _num(env_name: str, default: float, minimum: float) -> float:
+        try:
+            return max(minimum, float(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    return {
+        'max_inflight': int(_num("GLPI_MAX_INFLIGHT", 16, 2)),
+        'max_rps': _num("GLPI_MAX_RPS", 0, 0),
+        'background_share': min(0.9, _num("GLPI_BACKGROUND_SHARE", 0.25, 0.05)),
+        'max_wait_ms': _num("GLPI_GOVERNOR_MAX_WAIT_MS", 30000, 1),
+    }
+
+
+def bulkhead_settings() -> dict:
+    """(workers, limite de fila) de cada bulkhead (ver `utils/bulkhead.py`)."""
+    def _int(env_name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    return {
+        'heavy': (_int("BULKHEAD_HEAVY_WORKERS", 4), _int("BULKHEAD_HEAVY_QUEUE", 16)),
+        'light': (_int("BULKHEAD_LIGHT_WORKERS", 8), _int("BULKHEAD_LIGHT_QUEUE", 64)),
+        'names': (name_workers(), _int("BULKHEAD_NAMES_QUEUE", 256)),
+        'completion': (_int("BULKHEAD_COMPLETION_WORKERS", 2), _int("BULKHEAD_COMPLETION_QUEUE", 16)),
+        'jobs': (_int("JOBS_WORKERS", 2), _int("JOBS_QUEUE", 32)),
+        'shards': (_int("SCAN_SHARD_WORKERS", 4), _int("SCAN_SHARD_QUEUE", 64)),
+    }
+
+
+def jobs_ttl_sec() -> int:
+    """Por quanto tempo um job concluído (e seu resultado) fica consultável."""
+    try:
+        return max(60, int(os.getenv("JOBS_TTL_SEC", "3600")))
+    except Exception:
+        return 3600
+
+
+def request_deadline_ms() -> int:
+    """Prazo padrão das rotas do dashboard quando o cliente não envia `X-Deadline-Ms` (0 = sem prazo)."""
+    try:
+        return max(0, int(os.getenv("REQUEST_DEADLINE_MS", "0")))
+    except Exception:
+        return 0
+
+
+def shared_cache_dir() -> Optional[str]:
+    """Diretório da camada compartilhada do cache (entre workers); vazio => cache só em memória."""
+    v = (os.getenv("SHARED_CACHE_DIR") or "").strip()
+    return v or None
+
+
+def leader_settings() -> dict:
+    """Eleição de líder do trabalho agendado (ver `utils/leader.py`)."""
+    shared = ticket_snapshot_dir() or shared_cache_dir()
+    lock_path = (os.getenv("LEADER_LOCK_PATH") or "").strip() or (
+        os.path.join(shared, "writer.lock") if shared else None
+    )
+    lease_url = (os.getenv("LEADER_LEASE_URL") or "").strip() or None
+    backend = (os.getenv("LEADER_BACKEND") or "auto").strip().lower()
+    if backend not in ("file", "http", "none"):
+        backend = "http" if lease_url else ("file" if lock_path else "none")
+    try:
+        ttl = max(3.0, float(os.getenv("LEADER_LEASE_TTL_SEC", "30")))
+    except Exception:
+        ttl = 30.0
+    return {
+        'backend': backend,
+        'lock_path': lock_path,
+        'lease_url': lease_url,
+        'lease_ttl_sec': ttl,
+    }
+
+
+def warmup_settings() -> dict:
+    """Aquecimento na subida do app (ver `logic/warmup.py`)."""
+    def _num(env_name: str, default: float, minimum: float) -> float:
+        try:
+            return max(minimum, float(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    def _list(env_name: str, default: str) -> list:
+        return [p.strip() for p in os.getenv(env_name, default).split(",") if p.strip()]
+
+    days = []
+    for raw in _list("WARMUP_RANGES_DAYS", ""):
+        try:
+            days.append(max(0, int(raw)))
+        except ValueError:
+            continue
+    return {
+        'enabled': os.getenv("WARMUP", "1").strip().lower() in ("1", "true", "yes", "on"),
+        'dictionaries': _list("WARMUP_DICTIONARIES", "Entity,ITILCategory,User"),
+        'dictionary_ttl_sec': int(_num("WARMUP_DICTIONARY_TTL_SEC", 3600, 60)),
+        'ranges_days': days,
+        'kinds': _list("WARMUP_KINDS", "stats-gerais,ranking-entidades,ranking-categorias,ranking-tecnicos"),
+        'timeout_sec': _num("WARMUP_TIMEOUT_SEC", 120, 1),
+    }
+
+
+def scan_shard_settings() -> dict:
+    """Varreduras por fatias de data (ver `logic/sharding.py`)."""
+    unit = (os.getenv("SCAN_SHARD") or "month").strip().lower()
+    if unit not in ("month", "week", "none"):
+        unit = "month"
+
+    def _int(env_name: str, default: int, minimum: int) -> int:
+        try:
+            return max(minimum, int(os.getenv(env_name, str(default))))
+        except Exception:
+            return default
+
+    return {
+        'unit': unit,
+        'min_days': _int("SCAN_SHARD_MIN_DAYS", 120, 1),
+        'ttl_sec': _int("SCAN_SHARD_TTL_SEC", 600, 1),
+    }
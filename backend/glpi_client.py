@@ -6,58 +6,312 @@ Lança exceções específicas para que a camada de API mapeie respostas HTTP ne
 
 Sessão e Cache
 ---------------
-- Usa cache por processo com TTL para reuso de `Session-Token`.
+- Usa um pool por processo de `Session-Token` com TTL (`GLPI_SESSION_POOL_SIZE`, padrão 1).
+- Todas as requisições de leitura passam por `get`, que usa a sessão menos ocupada.
 - Protegido por lock para evitar condições de corrida em ambientes multi-thread.
 - TTL padrão vem de `SESSION_TTL_SEC` (env), mas pode ser injetado via argumento.
 - Mudança de entidade ativa pode ser desabilitada via env `GLPI_CHANGE_ENTITY`.
+- Todas as chamadas passam por um circuit breaker (`glpi_breaker`, `GLPI_BREAKER_*`)
+  e pelo governador de concorrência/taxa (`utils/governor.py`, `GLPI_MAX_*`).
 """
 import os
+import random
 import time
 import threading
-from typing import Any, Dict, List, Optional, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Iterator, Tuple
 
 import requests
 import logging
 
-from .logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError
+from .logic.errors import GLPIAuthError, GLPINetworkError, GLPISearchError, GLPICircuitOpenError
 from .utils.glpi_params import build_search_params, mask_sensitive_keys
 from .utils.convert import to_int_zero
-from .config import timeouts_sec, should_change_entity, session_ttl_sec
+from .utils import metrics
+from .utils.circuit_breaker import CircuitBreaker
+from .utils.glpi_stats import latency_tracker, query_shape
+from .utils.hedging import hedged_call
+from .utils.governor import governor, traffic_class, BACKGROUND
+from .utils import deadline
+from .utils import tracing
+from .config import (
+    timeouts_sec, should_change_entity, session_ttl_sec,
+    session_pool_size, session_refresh_ahead,
+    retry_attempts, retry_backoff_ms,
+    breaker_enabled, breaker_settings,
+    adaptive_enabled,
+    hedge_enabled, hedge_min_delay_ms,
+)
 
 logger = logging.getLogger(__name__)
 
-# Cache leve de sessão (reuso de Session-Token por TTL curto)
-_SESSION_HEADERS: Optional[Dict[str, str]] = None
-_SESSION_TS: float = 0.0
-_SESSION_LOCK = threading.Lock()
 SESSION_TTL_SEC = session_ttl_sec()
 
+# Circuit breaker único para o upstream GLPI (estado exposto em /health)
+glpi_breaker = CircuitBreaker('glpi', **breaker_settings())
 
-def authenticate(
-    api_url: str,
-    app_token: str,
-    user_token: str,
-    session_ttl_sec: Optional[int] = None,
-    change_entity: Optional[bool] = None,
-) -> Dict[str, str]:
+
+def _guarded(call: Callable[[], requests.Response]) -> requests.Response:
     """
-    Autentica no GLPI e configura entidade ativa.
-    
-    Args:
-        api_url: URL da API GLPI (já incluindo /apirest.php)
-        app_token: Token da aplicação
-        user_token: Token do usuário
-        
-    Returns:
-        Headers com session-token para uso nas próximas requisições
+    Executa uma chamada HTTP ao GLPI sob o governador global e o circuit breaker.
+    Com o circuito aberto, falha na hora com `GLPICircuitOpenError` (sem esperar timeouts);
+    senão aguarda vaga no governador (`utils/governor.py`) e só então consulta o breaker,
+    para que uma espera desistida no governador não prenda uma vaga de prova do `half_open`.
     """
-    # Cache de sessão: reutiliza se ainda válido (com proteção de lock)
-    global _SESSION_HEADERS, _SESSION_TS
-    ttl = SESSION_TTL_SEC if session_ttl_sec is None else int(session_ttl_sec)
-    with _SESSION_LOCK:
-        if _SESSION_HEADERS and (time.time() - _SESSION_TS) < ttl:
-            return _SESSION_HEADERS
+    if not breaker_enabled():
+        with governor.slot():
+            return call()
+    if glpi_breaker.retry_after_sec() > 0:
+        metrics.increment('glpi.circuit_rejected')
+        raise GLPICircuitOpenError(retry_after_sec=glpi_breaker.retry_after_sec())
+    with governor.slot():
+        permit = glpi_breaker.allow()
+        if permit is None:
+            metrics.increment('glpi.circuit_rejected')
+            raise GLPICircuitOpenError(retry_after_sec=glpi_breaker.retry_after_sec())
+        outcome = None
+        t0 = time.perf_counter()
+        try:
+            response = call()
+            outcome = (response.status_code < 500, (time.perf_counter() - t0) * 1000)
+        except requests.exceptions.RequestException:
+            outcome = (False, 0.0)
+            raise
+        finally:
+            # Qualquer outra exceção (cancelamento, erro local) devolve a vaga de prova sem contar
+            if outcome is None:
+                glpi_breaker.release(permit)
+            else:
+                glpi_breaker.record(permit, *outcome)
+    return response
+
+
+class _SessionSlot:
+    """Uma sessão GLPI do pool: headers prontos, idade e requisições em andamento."""
+
+    __slots__ = ('headers', 'created', 'inflight', 'refreshing', 'retired')
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+        self.created = time.time()
+        self.inflight = 0
+        self.refreshing = False
+        # Substituída por uma sessão nova: encerrada (`killSession`) quando as requisições em andamento terminam
+        self.retired = False
+
+    @property
+    def token(self) -> Optional[str]:
+        return self.headers.get('Session-Token')
+
+
+class SessionPool:
+    """
+    Pool de sessões GLPI independentes (`GLPI_SESSION_POOL_SIZE`, padrão 1).
+
+    O GLPI (PHP) serializa requisições concorrentes que compartilham a mesma
+    sessão; com N sessões, requisições paralelas deixam de enfileirar no
+    servidor. Cada sessão passa por `initSession` + `changeActiveEntities`.
+
+    - `acquire` devolve a sessão menos ocupada (empate => round-robin).
+    - Sessões com idade acima de `GLPI_SESSION_REFRESH_AHEAD * TTL` são
+      renovadas em background enquanto a atual continua servindo; a antiga
+      recebe `killSession` (melhor esforço) assim que suas requisições terminam.
+    - `invalidate` descarta apenas o token que recebeu 401 e `reauthenticate`
+      abre uma substituta uma única vez para todos os que falharam juntos.
+    """
+
+    def __init__(self):
+        self._slots: List[_SessionSlot] = []
+        self._lock = threading.Lock()
+        self._reauth_lock = threading.Lock()
+        self._rr = 0
+        self._filling = False
+        self._auth_args: Optional[tuple] = None
+        self.ttl = SESSION_TTL_SEC
+
+    def _live(self) -> List[_SessionSlot]:
+        now = time.time()
+        return [s for s in self._slots if (now - s.created) < self.ttl]
+
+    def _pick(self, live: List[_SessionSlot]) -> _SessionSlot:
+        self._rr = (self._rr + 1) % len(live)
+        rotated = live[self._rr:] + live[:self._rr]
+        return min(rotated, key=lambda s: s.inflight)
+
+    def configure(self, auth_args: tuple, ttl: int) -> None:
+        with self._lock:
+            self._auth_args = auth_args
+            self.ttl = ttl
+
+    def acquire(self) -> Optional[_SessionSlot]:
+        """Sessão viva menos ocupada (ou None); agenda renovação/preenchimento em background."""
+        with self._lock:
+            live = self._live()
+            self._slots = live
+            if not live:
+                return None
+            slot = self._pick(live)
+            ahead = self.ttl * session_refresh_ahead()
+            stale = [s for s in live if not s.refreshing and (time.time() - s.created) >= ahead]
+            for s in stale:
+                s.refreshing = True
+            fill = len(live) < session_pool_size() and not self._filling
+            if fill:
+                self._filling = True
+        for s in stale:
+            self._background(self._refresh_slot, s)
+        if fill:
+            self._background(self._fill)
+        return slot
+
+    def add(self, headers: Dict[str, str]) -> _SessionSlot:
+        slot = _SessionSlot(headers)
+        with self._lock:
+            self._slots.append(slot)
+            dropped = self._slots[:-session_pool_size()]
+            del self._slots[:-session_pool_size()]
+            drained = [s for s in dropped if self._retire(s)]
+        for s in drained:
+            self._background(self._kill, s.headers)
+        return slot
+
+    def invalidate(self, token: Optional[str]) -> None:
+        """Remove só a sessão do token informado (ex.: 401); as demais seguem válidas."""
+        if not token:
+            return
+        with self._lock:
+            self._slots = [s for s in self._slots if s.token != token]
+
+    def reauthenticate(self, failed_token: Optional[str]) -> bool:
+        """
+        Abre uma nova sessão após 401 (single-flight): quem chega enquanto outra
+        thread reautentica espera e reaproveita a sessão nova.
+        """
+        with self._reauth_lock:
+            with self._lock:
+                if any(s.token != failed_token for s in self._live()):
+                    return True
+            if self._auth_args is None:
+                return False
+            try:
+                headers = _init_session(*self._auth_args)
+            except Exception as e:
+                logger.warning("Falha ao reautenticar no GLPI: %s", e)
+                return False
+            self.add(headers)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots = []
+
+    @contextmanager
+    def lease(self, headers: Dict[str, str]) -> Iterator[Dict[str, str]]:
+        """
+        Headers a usar numa requisição: a sessão menos ocupada do pool,
+        ou os próprios `headers` quando o pool está vazio.
+        """
+        slot = None
+        with self._lock:
+            live = self._live()
+            if live:
+                slot = self._pick(live)
+                slot.inflight += 1
+        if slot is None:
+            yield headers
+            return
+        try:
+            yield slot.headers
+        finally:
+            with self._lock:
+                slot.inflight -= 1
+                drained = slot.retired and slot.inflight == 0
+            if drained:
+                self._background(self._kill, slot.headers)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return [
+                {'age_sec': round(now - s.created, 1), 'inflight': s.inflight, 'refreshing': s.refreshing}
+                for s in self._slots
+            ]
+
+    def _background(self, fn, *args) -> None:
+        def _run() -> None:
+            with traffic_class(BACKGROUND):
+                fn(*args)
+        threading.Thread(target=_run, name="glpi-session", daemon=True).start()
+
+    def _new_headers(self) -> Optional[Dict[str, str]]:
+        if self._auth_args is None:
+            return None
+        try:
+            return _init_session(*self._auth_args)
+        except Exception as e:
+            logger.warning("Falha ao abrir sessão GLPI em background: %s", e)
+            return None
+
+    def _retire(self, slot: _SessionSlot) -> bool:
+        """Marca a sessão como substituída (com `_lock`); True se já pode ser encerrada."""
+        slot.retired = True
+        return slot.inflight == 0
+
+    def _kill(self, headers: Dict[str, str]) -> None:
+        """
+        Encerra uma sessão substituída no GLPI, como tráfego de background sob o governador
+        e o breaker; falhas (inclusive fila cheia/circuito aberto) só são registradas (ela expira sozinha).
+        """
+        if self._auth_args is None:
+            return
+        url = f"{self._auth_args[0]}/killSession"
+        try:
+            with traffic_class(BACKGROUND):
+                _guarded(lambda: requests.get(url, headers=headers, timeout=timeouts_sec()))
+        except (requests.exceptions.RequestException, GLPINetworkError) as e:
+            logger.debug("Falha ao encerrar sessão GLPI substituída: %s", e)
+
+    def _refresh_slot(self, slot: _SessionSlot) -> None:
+        headers = self._new_headers()
+        if headers is None:
+            with self._lock:
+                slot.refreshing = False
+            return
+        with self._lock:
+            slot.refreshing = False
+            replaced = slot in self._slots
+            if replaced:
+                # Slot novo no lugar do antigo: requisições em andamento terminam com o token anterior
+                self._slots[self._slots.index(slot)] = _SessionSlot(headers)
+                drained = self._retire(slot)
+        if not replaced:
+            # O slot já saiu do pool (401/expirado): a sessão nova entra como mais uma
+            self.add(headers)
+        elif drained:
+            self._kill(slot.headers)
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    missing = session_pool_size() - len(self._live())
+                if missing <= 0:
+                    return
+                headers = self._new_headers()
+                if headers is None:
+                    return
+                self.add(headers)
+        finally:
+            with self._lock:
+                self._filling = False
+
+
+session_pool = SessionPool()
 
+
+def _init_session(api_url: str, app_token: str, user_token: str, change_entity: Optional[bool]) -> Dict[str, str]:
+    """Abre uma sessão (`initSession`) e configura a entidade ativa; devolve os headers."""
     # Endpoint de autenticação
     auth_url = f"{api_url}/initSession"
     
@@ -69,39 +323,35 @@ def authenticate(
     }
     
     try:
-        response = requests.get(auth_url, headers=headers, timeout=timeouts_sec())
-        response.raise_for_status()
-        
-        auth_data = response.json()
-        session_token = auth_data.get('session_token')
+        with tracing.span('glpi.auth'):
+            response = _guarded(lambda: requests.get(auth_url, headers=headers, timeout=timeouts_sec()))
+            response.raise_for_status()
         
-        if not session_token:
-            raise GLPIAuthError("Token de sessão não encontrado", status_code=401)
+            auth_data = response.json()
+            session_token = auth_data.get('session_token')
         
-        # Headers para próximas requisições
-        session_headers = {
-            'Content-Type': 'application/json',
-            'Session-Token': session_token,
-            'App-Token': app_token
-        }
+            if not session_token:
+                raise GLPIAuthError("Token de sessão não encontrado", status_code=401)
         
-        # Determinar se deve trocar entidade ativa
-        # change_entity=None => usa env GLPI_CHANGE_ENTITY (default habilitado)
-        change_enabled = (change_entity if change_entity is not None else should_change_entity())
-
-        if change_enabled:
-            change_entity_url = f"{api_url}/changeActiveEntities"
-            entity_data = {
-                'entities_id': 1,
-                'is_recursive': True
+            # Headers para próximas requisições
+            session_headers = {
+                'Content-Type': 'application/json',
+                'Session-Token': session_token,
+                'App-Token': app_token
             }
-            entity_response = requests.post(change_entity_url, headers=session_headers, json=entity_data, timeout=timeouts_sec())
-            entity_response.raise_for_status()
-
-        # Atualiza cache de sessão com lock
-        with _SESSION_LOCK:
-            _SESSION_HEADERS = session_headers
-            _SESSION_TS = time.time()
+        
+            # Determinar se deve trocar entidade ativa
+            # change_entity=None => usa env GLPI_CHANGE_ENTITY (default habilitado)
+            change_enabled = (change_entity if change_entity is not None else should_change_entity())
+
+            if change_enabled:
+                change_entity_url = f"{api_url}/changeActiveEntities"
+                entity_data = {
+                    'entities_id': 1,
+                    'is_recursive': True
+                }
+                entity_response = _guarded(lambda: requests.post(change_entity_url, headers=session_headers, json=entity_data, timeout=timeouts_sec()))
+                entity_response.raise_for_status()
 
         return session_headers
         
@@ -111,13 +361,6 @@ def authenticate(
     except requests.exceptions.HTTPError as e:
         status = getattr(e.response, 'status_code', None)
         if status in (401, 403):
-            # Invalida sessão em falha de autenticação
-            try:
-                with _SESSION_LOCK:
-                    _SESSION_HEADERS = None
-                    _SESSION_TS = 0.0
-            except Exception:
-                pass
             raise GLPIAuthError("Falha de autenticação GLPI", status_code=status)
         # Demais erros HTTP na autenticação ou troca de entidade
         raise GLPISearchError(f"Erro HTTP na autenticação/configuração (status={status})", status_code=status)
@@ -125,6 +368,107 @@ def authenticate(
         # Falhas de rede genéricas
         raise GLPINetworkError("Falha de rede na autenticação/configuração de entidade")
 
+
+def authenticate(
+    api_url: str,
+    app_token: str,
+    user_token: str,
+    session_ttl_sec: Optional[int] = None,
+    change_entity: Optional[bool] = None,
+) -> Dict[str, str]:
+    """
+    Autentica no GLPI e configura entidade ativa.
+    
+    Args:
+        api_url: URL da API GLPI (já incluindo /apirest.php)
+        app_token: Token da aplicação
+        user_token: Token do usuário
+        
+    Returns:
+        Headers com session-token para uso nas próximas requisições
+    """
+    # Cache de sessão: reutiliza uma sessão viva do pool (com proteção de lock)
+    ttl = SESSION_TTL_SEC if session_ttl_sec is None else int(session_ttl_sec)
+    session_pool.configure((api_url, app_token, user_token, change_entity), ttl)
+    slot = session_pool.acquire()
+    if slot is not None:
+        return slot.headers
+
+    session_headers = _init_session(api_url, app_token, user_token, change_entity)
+    session_pool.add(session_headers)
+    # Demais sessões do pool são abertas em background
+    session_pool.acquire()
+    return session_headers
+
+
+def _backoff(attempt: int) -> None:
+    base_ms, max_ms = retry_backoff_ms()
+    delay = min(max_ms, base_ms * (2 ** attempt)) / 1000.0
+    # Jitter: metade fixa + metade aleatória, para não sincronizar as tentativas
+    time.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+
+def get(
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[tuple] = None,
+) -> requests.Response:
+    """
+    GET na API GLPI usando a sessão menos ocupada do pool.
+
+    - 401: invalida só o token usado, reautentica (single-flight) e repete uma vez.
+    - 5xx e falhas de conexão: novas tentativas com backoff exponencial limitado
+      (`GLPI_RETRY_ATTEMPTS`, `GLPI_RETRY_BACKOFF_MS`, `GLPI_RETRY_BACKOFF_MAX_MS`).
+    Timeouts de leitura não são repetidos. Com o circuit breaker aberto, levanta
+    `GLPICircuitOpenError`. O chamador trata o status via `raise_for_status`.
+    """
+    attempts = retry_attempts()
+    reauthed = False
+    attempt = 0
+    while True:
+        with session_pool.lease(headers) as session_headers:
+            try:
+                response = _guarded(lambda: requests.get(url, headers=session_headers, params=params, timeout=timeout or timeouts_sec()))
+            except requests.exceptions.ConnectionError:
+                if attempt >= attempts:
+                    raise
+                metrics.increment('glpi.retry', tags={'reason': 'connection'})
+                _backoff(attempt)
+                attempt += 1
+                continue
+        if response.status_code == 401:
+            token = session_headers.get('Session-Token')
+            session_pool.invalidate(token)
+            if not reauthed and session_pool.reauthenticate(token):
+                reauthed = True
+                metrics.increment('glpi.retry', tags={'reason': 'reauth'})
+                continue
+        elif response.status_code >= 500 and attempt < attempts:
+            metrics.increment('glpi.retry', tags={'reason': str(response.status_code)})
+            _backoff(attempt)
+            attempt += 1
+            continue
+        return response
+
+
+def _get_json(url: str, headers: Dict[str, str], params: Dict[str, Any], timeout: Optional[tuple]) -> Tuple[Any, int]:
+    """GET + `raise_for_status` + JSON; devolve (dados, bytes da resposta)."""
+    response = get(url, headers, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json(), len(response.content)
+
+
+def _hedge_delay(shape: str) -> Optional[float]:
+    """Espera (s) antes de duplicar uma página: p95 do formato de consulta; None => sem hedge."""
+    if not hedge_enabled():
+        return None
+    p95 = latency_tracker.latency(shape, 0.95)
+    if p95 is None:
+        return None
+    return max(p95, hedge_min_delay_ms()) / 1000.0
+
+
 def search_paginated(
     headers: Dict[str, str], 
     api_url: str, 
@@ -150,69 +494,62 @@ def search_paginated(
     Returns:
         Lista completa de registros encontrados
     """
-    search_url = f"{api_url}/search/{itemtype}"
     all_results: List[Dict[str, Any]] = []
-    start = 0
-
-    # Parâmetros base via helper reutilizável
-    params = build_search_params(
-        uid_cols=uid_cols,
-        forcedisplay=forcedisplay,
+    for page in search_paginated_pages(
+        headers=headers,
+        api_url=api_url,
+        itemtype=itemtype,
         criteria=criteria,
+        forcedisplay=forcedisplay,
+        uid_cols=uid_cols,
+        range_step=range_step,
         extra_params=extra_params,
-    )
-    
-    try:
-        while True:
-            # Configurar range para paginação
-            current_params = params.copy()
-            current_params['range'] = f"{start}-{start + range_step - 1}"
-
-            # Log detalhado sem expor valores sensíveis
-            logger.debug(
-                "GLPI search GET %s itemtype=%s params=%s",
-                search_url,
-                itemtype,
-                mask_sensitive_keys(current_params),
-            )
-
-            response = requests.get(search_url, headers=headers, params=current_params, timeout=timeouts_sec())
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Verificar se há dados
-            rows = data.get('data') if isinstance(data, dict) else None
-            if not rows:
-                break
+    ):
+        all_results.extend(page)
+    return all_results
 
-            all_results.extend(rows)
 
-            # Verificar se chegou ao fim
-            totalcount = int(data.get('totalcount', 0) or 0)
-            if (totalcount > 0 and len(all_results) >= totalcount) or (len(rows) < range_step):
-                break
+def search_top_k(
+    headers: Dict[str, str],
+    api_url: str,
+    itemtype: str,
+    sort_field: int,
+    k: Optional[int],
+    order: str = 'DESC',
+    criteria: Optional[List[Dict]] = None,
+    forcedisplay: Optional[List[str]] = None,
+    uid_cols: bool = True,
+    extra_params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[tuple] = None,
+) -> List[Dict[str, Any]]:
+    """
+    "Top K por campo" com ordenação e limite feitos pelo GLPI (`sort`, `order`, `range`).
 
-            start += range_step
-            
-        return all_results
-        
-    except requests.exceptions.Timeout:
-        raise GLPINetworkError(f"Timeout na busca paginada de {itemtype}", timeout=True)
-    except requests.exceptions.HTTPError as e:
-        status = getattr(e.response, 'status_code', None)
-        body = ''
-        try:
-            body = getattr(e.response, 'text', '')
-        except Exception:
-            body = ''
-        # Log detalhado do erro HTTP retornado pelo GLPI
-        logger.error("GLPI HTTP error itemtype=%s status=%s body=%s", itemtype, status, body)
-        if status in (401, 403):
-            raise GLPIAuthError("Falha de autenticação GLPI", status_code=status)
-        raise GLPISearchError(f"Erro HTTP na busca paginada de {itemtype} (status={status})", status_code=status)
-    except requests.exceptions.RequestException:
-        raise GLPINetworkError(f"Falha de rede na busca paginada de {itemtype}")
+    Lê só as primeiras `k` linhas (normalmente uma requisição) em vez de varrer
+    tudo e ordenar em Python: custo O(k), não O(total). `k=None` devolve todas as
+    linhas, já ordenadas pelo GLPI.
+    """
+    params = dict(extra_params or {})
+    params['sort'] = str(sort_field)
+    params['order'] = 'DESC' if str(order).upper() == 'DESC' else 'ASC'
+    rows: List[Dict[str, Any]] = []
+    for page in search_paginated_pages(
+        headers=headers,
+        api_url=api_url,
+        itemtype=itemtype,
+        criteria=criteria,
+        forcedisplay=forcedisplay,
+        uid_cols=uid_cols,
+        range_step=k if k else 1000,
+        extra_params=params,
+        timeout=timeout,
+        # O passo é o limite (`range=0-(k-1)`): o ajuste adaptativo o alargaria para >= 100 linhas
+        adaptive=False,
+    ):
+        rows.extend(page)
+        if k and len(rows) >= k:
+            break
+    return rows[:k] if k else rows
 
 
 def get_user_names_in_batch_with_fallback(headers: Dict[str, str], api_url: str, requester_ids: List[int]) -> Dict[int, str]:
@@ -240,9 +577,10 @@ def get_user_names_in_batch_with_fallback(headers: Dict[str, str], api_url: str,
     for user_id in unique_ids:
         try:
             user_url = f"{api_url}/User/{user_id}"
-            response = _requests.get(user_url, headers=headers, timeout=(1, 2.5))
-            response.raise_for_status()
-            user_data = response.json()
+            with tracing.span('glpi.item', itemtype='User', id=user_id):
+                response = get(user_url, headers, timeout=(1, 2.5))
+                response.raise_for_status()
+                user_data = response.json()
 
             # A API pode retornar uma lista mesmo para um único ID
             if isinstance(user_data, list) and user_data:
@@ -286,8 +624,45 @@ def search_paginated_iter(
     Variante geradora de busca paginada que emite cada linha conforme carregada.
     Útil para reduzir latência percebida em chamadas que processam muitos dados.
     """
+    for page in search_paginated_pages(
+        headers=headers,
+        api_url=api_url,
+        itemtype=itemtype,
+        criteria=criteria,
+        forcedisplay=forcedisplay,
+        uid_cols=uid_cols,
+        range_step=range_step,
+        extra_params=extra_params,
+        timeout=timeout,
+    ):
+        yield from page
+
+
+def search_paginated_pages(
+    headers: Dict[str, str],
+    api_url: str,
+    itemtype: str,
+    criteria: Optional[List[Dict]] = None,
+    forcedisplay: Optional[List[str]] = None,
+    uid_cols: bool = True,
+    range_step: int = 1000,
+    extra_params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[tuple] = None,
+    adaptive: bool = True,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Variante geradora que emite cada página inteira (lista de linhas).
+    Permite que agregações processem a página de uma vez (extração em lote por coluna).
+    Com `GLPI_ADAPTIVE=1`, o passo e o timeout de leitura seguem `utils/glpi_stats.py`
+    (`range_step` vira apenas o passo inicial); `adaptive=False` mantém passo e
+    timeout fixos para consultas cujo `range` é o próprio limite (top-K). Com `GLPI_HEDGE=1`, páginas que
+    passam do p95 observado recebem uma requisição duplicada (`utils/hedging.py`).
+    Com prazo na requisição (`utils/deadline.py`), para antes da próxima página quando
+    o prazo estoura; a primeira página sempre é lida (traz o `totalcount` da cobertura).
+    """
     search_url = f"{api_url}/search/{itemtype}"
     start = 0
+    budget = deadline.current()
 
     params = build_search_params(
         uid_cols=uid_cols,
@@ -296,9 +671,18 @@ def search_paginated_iter(
         extra_params=extra_params,
     )
 
+    # Estatísticas por formato de consulta (alimentam timeouts/passo adaptativos)
+    shape = query_shape(itemtype, params)
+    adaptive = adaptive and adaptive_enabled()
+
     while True:
+        if start > 0 and budget is not None and budget.expired():
+            budget.truncate()
+            metrics.increment('deadline.scan_truncated', tags={'itemtype': itemtype})
+            break
+        step = latency_tracker.page_size(shape, range_step) if adaptive else range_step
         current_params = params.copy()
-        current_params['range'] = f"{start}-{start + range_step - 1}"
+        current_params['range'] = f"{start}-{start + step - 1}"
 
         logger.debug(
             "GLPI search GET %s itemtype=%s params=%s",
@@ -310,21 +694,30 @@ def search_paginated_iter(
         try:
             # Usar timeout customizado se fornecido, senão usar padrão
             request_timeout = timeout if timeout is not None else timeouts_sec()
-            response = requests.get(search_url, headers=headers, params=current_params, timeout=request_timeout)
-            response.raise_for_status()
-            data = response.json()
-            rows = data.get('data') if isinstance(data, dict) else None
+            if adaptive:
+                request_timeout = (request_timeout[0], latency_tracker.read_timeout(shape, request_timeout[1]))
+            t0 = time.perf_counter()
+            with tracing.span('glpi.page', itemtype=itemtype, range=current_params['range']) as sp:
+                fetch = partial(_get_json, search_url, headers, current_params, request_timeout)
+                hedge_delay = _hedge_delay(shape)
+                data, nbytes = fetch() if hedge_delay is None else hedged_call(fetch, hedge_delay)
+                rows = data.get('data') if isinstance(data, dict) else None
+                sp.set(rows=len(rows or []), bytes=nbytes)
+            latency_tracker.record(shape, (time.perf_counter() - t0) * 1000, len(rows or []), nbytes)
+            totalcount = int(data.get('totalcount', 0) or 0)
+            if budget is not None:
+                if start == 0:
+                    budget.add_scan(totalcount)
+                budget.add_rows(len(rows or []))
             if not rows:
                 break
 
-            for row in rows:
-                yield row
+            yield rows
 
-            totalcount = int(data.get('totalcount', 0) or 0)
-            if (totalcount > 0 and (start + range_step) >= totalcount) or (len(rows) < range_step):
+            if (totalcount > 0 and (start + step) >= totalcount) or (len(rows) < step):
                 break
 
-            start += range_step
+            start += step
         except requests.exceptions.Timeout:
             raise GLPINetworkError(f"Timeout na busca paginada de {itemtype}", timeout=True)
         except requests.exceptions.HTTPError as e:
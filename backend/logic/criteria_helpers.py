@@ -14,11 +14,22 @@ Observações sobre indexação de critérios:
 - O cliente (`glpi_client.search_paginated`) indexa cada critério na ordem do array
   como `criteria[{i}][...]`. Manter a ordem garante consistência da query.
 """
+from datetime import date
 from typing import Any, Dict, List, Tuple
 
 from .glpi_constants import FIELD_CREATED, FIELD_STATUS
 
 
+def parse_day(value: str) -> date:
+    """
+    Data estrita `YYYY-MM-DD`; ValueError para qualquer outro formato
+    (o `date.fromisoformat` do Python 3.11 também aceita `YYYYMMDD`, `2024-W05-1` etc.).
+    """
+    if not isinstance(value, str) or len(value) != 10 or value[4] != "-" or value[7] != "-":
+        raise ValueError(f"data inválida: {value!r}")
+    return date.fromisoformat(value)
+
+
 def normalize_date_range(inicio: str, fim: str) -> Tuple[str, str]:
     """
     Normaliza datas para incluir limites de dia.
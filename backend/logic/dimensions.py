@@ -0,0 +1,88 @@
+"""
+Dimensões de contagem de tickets: entidade, categoria, técnico e status.
+
+Cada dimensão sabe qual campo (`glpi_constants`) pedir ao GLPI, como extrair as
+chaves de uma página em lote, qual coluna do snapshot colunar responde por ela e
+como transformar chaves em rótulos. Usada pelas consultas que cruzam períodos ou
+dimensões (`comparativo`, `pivot`), com as mesmas regras dos rankings.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from ..utils.convert import column_ids, column_values
+from ..utils.user_names import resolve_user_names_fast
+from .glpi_constants import FIELD_CATEGORY, FIELD_ENTITY, FIELD_STATUS, FIELD_TECH, STATUS_LABELS
+from .maintenance_ranking_logic import (
+    _resolve_category_name,
+    _resolve_entity_name,
+    id_keys,
+    is_invalid_label,
+    tech_ids,
+)
+
+
+class Dimension:
+    def __init__(
+        self,
+        name: str,
+        field: int,
+        snapshot_column: str,
+        keys: Callable[[List[Dict[str, Any]]], List[Any]],
+        labels: Callable[[Dict[str, str], str, List[Any]], Dict[Any, str]],
+        drop: FrozenSet[Any] = frozenset(),
+    ):
+        self.name = name
+        self.field = field
+        self.snapshot_column = snapshot_column
+        self.keys = keys
+        self._labels = labels
+        # Chaves fora da contagem (ex.: técnico 0 = não atribuído, como no ranking)
+        self.drop = drop
+
+    def labels(self, headers: Dict[str, str], api_url: str, keys: List[Any]) -> Dict[Any, Optional[str]]:
+        """Rótulo por chave; None para rótulos inválidos (a linha sai do resultado, como nos rankings)."""
+        out = self._labels(headers, api_url, keys)
+        return {k: (None if is_invalid_label(v) else v) for k, v in out.items()}
+
+
+def _entity_labels(headers: Dict[str, str], api_url: str, keys: List[Any]) -> Dict[Any, str]:
+    return {k: _resolve_entity_name(headers, api_url, str(k)) for k in keys}
+
+
+def _category_labels(headers: Dict[str, str], api_url: str, keys: List[Any]) -> Dict[Any, str]:
+    return {k: _resolve_category_name(headers, api_url, str(k)) for k in keys}
+
+
+def _tech_labels(headers: Dict[str, str], api_url: str, keys: List[Any]) -> Dict[Any, str]:
+    names = resolve_user_names_fast(headers, api_url, [k for k in keys if isinstance(k, int) and k > 0])
+    return {k: names.get(k) or f"Usuário ID {k}" for k in keys}
+
+
+def _status_labels(headers: Dict[str, str], api_url: str, keys: List[Any]) -> Dict[Any, str]:
+    return {k: STATUS_LABELS.get(k, f"Status {k}") for k in keys}
+
+
+DIMENSIONS: Dict[str, Dimension] = {
+    'entidade': Dimension(
+        'entidade', FIELD_ENTITY, 'entity',
+        lambda page: id_keys(column_values(page, str(FIELD_ENTITY), 'entities_id')),
+        _entity_labels,
+    ),
+    'categoria': Dimension(
+        'categoria', FIELD_CATEGORY, 'category',
+        lambda page: id_keys(column_values(page, str(FIELD_CATEGORY), 'itilcategories_id')),
+        _category_labels,
+    ),
+    'tecnico': Dimension(
+        'tecnico', FIELD_TECH, 'tech',
+        lambda page: tech_ids(column_values(page, str(FIELD_TECH), 'users_id_assign')),
+        _tech_labels,
+        drop=frozenset({0}),
+    ),
+    'status': Dimension(
+        'status', FIELD_STATUS, 'status',
+        lambda page: [s or 0 for s in column_ids(column_values(page, str(FIELD_STATUS)))],
+        _status_labels,
+    ),
+}
@@ -4,6 +4,7 @@ Exceções específicas da integração GLPI.
 - GLPIAuthError: falhas de autenticação/autorização (401/403).
 - GLPISearchError: erros HTTP/semânticos ao consultar a API GLPI.
 - GLPINetworkError: falhas de rede/timeout na comunicação com GLPI.
+- GLPICircuitOpenError: circuito aberto (GLPI indisponível); falha imediata, sem chamada.
 
 Cada exceção carrega atributos padronizados para facilitar logging e mapeamento:
 - code: string curta identificando a classe do erro.
@@ -44,4 +45,15 @@ class GLPINetworkError(Exception):
         super().__init__(message)
         self.code = "GLPI_NETWORK"
         self.timeout = timeout
-        self.status_code = status_code
\ No newline at end of file
+        self.status_code = status_code
+
+
+class GLPICircuitOpenError(GLPINetworkError):
+    def __init__(
+        self,
+        message: str = "Circuito GLPI aberto",
+        retry_after_sec: float = 0.0,
+    ):
+        super().__init__(message, status_code=503)
+        self.code = "GLPI_CIRCUIT_OPEN"
+        self.retry_after_sec = retry_after_sec
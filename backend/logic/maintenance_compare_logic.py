@@ -0,0 +1,139 @@
+"""
+Comparação de períodos (mês atual x anterior, semana x mesma semana do ano passado)
+para uma dimensão, numa única passada.
+
+Em vez de uma varredura por período, os períodos viram a união de intervalos de
+dias (períodos sobrepostos ou vizinhos se fundem) e cada intervalo é varrido uma
+vez contando por (dia, chave). Cada período soma os dias que contém: uma linha
+lida conta para todos os períodos a que pertence. Intervalos longos passam pelas
+fatias com cache de `logic/sharding.py` (escopo `daily_<dimensão>`), então
+comparações que repetem meses reaproveitam a contagem diária.
+
+Com o snapshot colunar disponível, cada período é um group-by no snapshot.
+Períodos são de dias inteiros (`YYYY-MM-DD`), como no snapshot.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import glpi_client
+from ..config import range_step_tickets, ranking_timeouts_sec
+from ..utils import tracing
+from ..utils.convert import column_values
+from . import ticket_snapshot
+from .criteria_helpers import add_date_range
+from .dimensions import DIMENSIONS, Dimension
+from .glpi_constants import FIELD_CREATED
+from .sharding import sharded_scan
+
+
+def merge_periods(periods: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """União dos períodos em intervalos de dias disjuntos (sobrepostos ou vizinhos se fundem)."""
+    spans = sorted((date.fromisoformat(a), date.fromisoformat(b)) for a, b in periods)
+    merged: List[List[date]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(a.isoformat(), b.isoformat()) for a, b in merged]
+
+
+def daily_counts(api_url: str, session_headers: Dict[str, str], dim: Dimension, inicio: str, fim: str) -> Counter:
+    """Contagem por (dia `YYYY-MM-DD`, chave da dimensão) no intervalo."""
+
+    def _scan(lo: str, hi: str) -> Counter:
+        criteria = add_date_range([], lo, hi, field=FIELD_CREATED)
+        counts: Counter = Counter()
+        with tracing.span('logic.scan', compare=dim.name):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=criteria,
+                forcedisplay=[str(dim.field), str(FIELD_CREATED)],
+                uid_cols=False,
+                range_step=range_step_tickets(),
+                extra_params={'display_type': '2', 'is_recursive': '1'},
+                timeout=ranking_timeouts_sec(),
+            ):
+                days = [str(v or '')[:10] for v in column_values(page, str(FIELD_CREATED))]
+                counts.update(zip(days, dim.keys(page)))
+        return counts
+
+    return sharded_scan(f"daily_{dim.name}", inicio, fim, _scan)
+
+
+def _pct(delta: int, base: int) -> Optional[float]:
+    return round(delta * 100.0 / base, 1) if base else None
+
+
+def generate_period_comparison(
+    api_url: str,
+    session_headers: Dict[str, str],
+    dimensao: str,
+    periodos: List[Tuple[str, str]],
+    top_n: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Contagem por `dimensao` em cada período, com deltas em relação ao primeiro
+    (referência): `delta = referência - período`, `delta_pct` sobre o período.
+
+    Returns:
+        {dimensao, periodos: [{inicio, fim, total, delta, delta_pct}],
+         itens: [{nome, valores, deltas, deltas_pct}]} (itens ordenados pela referência)
+    """
+    dim = DIMENSIONS[dimensao]
+    per_period: List[Optional[Counter]] = [
+        ticket_snapshot.count_by(dim.snapshot_column, inicio, fim) for inicio, fim in periodos
+    ]
+    if any(c is None for c in per_period):
+        daily: Counter = Counter()
+        for inicio, fim in merge_periods(periodos):
+            daily.update(daily_counts(api_url, session_headers, dim, inicio, fim))
+        per_period = [Counter() for _ in periodos]
+        for (day, key), n in daily.items():
+            for i, (inicio, fim) in enumerate(periodos):
+                if inicio <= day <= fim:
+                    per_period[i][key] += n
+
+    for counts in per_period:
+        for key in dim.drop:
+            counts.pop(key, None)
+
+    keys = list(dict.fromkeys(k for counts in per_period for k in counts))
+    ordered = sorted(keys, key=lambda k: (per_period[0].get(k, 0), sum(c.get(k, 0) for c in per_period)), reverse=True)
+    if top_n and top_n > 0:
+        ordered = ordered[:top_n]
+
+    totals = [sum(c.values()) for c in per_period]
+    periods_out = []
+    for i, (inicio, fim) in enumerate(periodos):
+        delta = None if i == 0 else totals[0] - totals[i]
+        periods_out.append({
+            'inicio': inicio,
+            'fim': fim,
+            'total': totals[i],
+            'delta': delta,
+            'delta_pct': None if delta is None else _pct(delta, totals[i]),
+        })
+
+    items = []
+    with tracing.span('logic.resolve_names', compare=dim.name, count=len(ordered)):
+        labels = dim.labels(session_headers, api_url, ordered)
+    for key in ordered:
+        nome = labels.get(key)
+        if nome is None:
+            continue
+        values = [c.get(key, 0) for c in per_period]
+        deltas = [None] + [values[0] - v for v in values[1:]]
+        items.append({
+            'nome': nome,
+            'valores': values,
+            'deltas': deltas,
+            'deltas_pct': [None] + [_pct(values[0] - v, v) for v in values[1:]],
+        })
+
+    return {'dimensao': dimensao, 'periodos': periods_out, 'itens': items}
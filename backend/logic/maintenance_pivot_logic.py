@@ -0,0 +1,124 @@
+"""
+Tabela cruzada (pivot) de tickets por 2 ou 3 dimensões (ex.: entidade x status,
+técnico x categoria) num período, numa única passada.
+
+A varredura pede ao GLPI só os campos das dimensões e conta, página a página,
+a tupla de chaves de cada linha num `Counter` esparso: a memória é proporcional
+às células não vazias (no máximo o número de tickets do período), nunca às
+linhas lidas nem ao produto das cardinalidades. Períodos longos passam pelas
+fatias com cache de `logic/sharding.py` (escopo `pivot_<dimensões>`). Com o
+snapshot colunar disponível, a contagem é um group-by por tupla de colunas.
+
+O top-K por eixo usa os totais marginais: cada eixo fica com as K chaves de
+maior total, e só as células cujas chaves estão todas nos eixos são devolvidas.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .. import glpi_client
+from ..config import range_step_tickets, ranking_timeouts_sec
+from ..utils import tracing
+from . import ticket_snapshot
+from .criteria_helpers import add_date_range
+from .dimensions import DIMENSIONS, Dimension
+from .glpi_constants import FIELD_CREATED
+from .sharding import sharded_scan
+
+
+def pivot_counts(
+    api_url: str,
+    session_headers: Dict[str, str],
+    dims: List[Dimension],
+    inicio: str,
+    fim: str,
+) -> Counter:
+    """Contagem por tupla de chaves (uma por dimensão, na ordem de `dims`) no período."""
+    counts = ticket_snapshot.cross_count([d.snapshot_column for d in dims], inicio, fim)
+    if counts is not None:
+        return counts
+
+    fields = [str(d.field) for d in dims]
+
+    def _scan(lo: str, hi: str) -> Counter:
+        criteria = add_date_range([], lo, hi, field=FIELD_CREATED)
+        cells: Counter = Counter()
+        with tracing.span('logic.scan', pivot='x'.join(d.name for d in dims)):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=criteria,
+                forcedisplay=fields,
+                uid_cols=False,
+                range_step=range_step_tickets(),
+                extra_params={'display_type': '2', 'is_recursive': '1'},
+                timeout=ranking_timeouts_sec(),
+            ):
+                cells.update(zip(*(d.keys(page) for d in dims)))
+        return cells
+
+    return sharded_scan(f"pivot_{'_'.join(d.name for d in dims)}", inicio, fim, _scan)
+
+
+def generate_pivot(
+    api_url: str,
+    session_headers: Dict[str, str],
+    dimensoes: List[str],
+    inicio: str,
+    fim: str,
+    top: Optional[List[Optional[int]]] = None,
+) -> Dict[str, Any]:
+    """
+    Tabela cruzada esparsa de `dimensoes` no período.
+
+    Args:
+        top: K por eixo (mesma ordem de `dimensoes`); None/0 mantém o eixo inteiro
+
+    Returns:
+        {dimensoes, inicio, fim, total,
+         eixos: [{dimensao, itens: [{nome, total}]}],
+         celulas: [{chaves: [nome por dimensão], total}]} (itens e células por total desc)
+    """
+    dims = [DIMENSIONS[name] for name in dimensoes]
+    cells = pivot_counts(api_url, session_headers, dims, inicio, fim)
+
+    # Mesmas exclusões dos rankings (ex.: técnico 0 = não atribuído)
+    for cell in [c for c in cells if any(c[i] in d.drop for i, d in enumerate(dims))]:
+        del cells[cell]
+
+    top = list(top or [])
+    axes_out = []
+    kept: List[Dict[Any, str]] = []
+    for i, dim in enumerate(dims):
+        marginal: Counter = Counter()
+        for cell, n in cells.items():
+            marginal[cell[i]] += n
+        ordered = [k for k, _ in marginal.most_common()]
+        k = top[i] if i < len(top) else None
+        if k and k > 0:
+            ordered = ordered[:k]
+        with tracing.span('logic.resolve_names', pivot=dim.name, count=len(ordered)):
+            labels = dim.labels(session_headers, api_url, ordered)
+        axis = {key: labels[key] for key in ordered if labels.get(key) is not None}
+        kept.append(axis)
+        axes_out.append({
+            'dimensao': dim.name,
+            'itens': [{'nome': nome, 'total': marginal[key]} for key, nome in axis.items()],
+        })
+
+    cells_out = [
+        {'chaves': [kept[i][key] for i, key in enumerate(cell)], 'total': n}
+        for cell, n in cells.most_common()
+        if all(key in kept[i] for i, key in enumerate(cell))
+    ]
+
+    return {
+        'dimensoes': list(dimensoes),
+        'inicio': inicio,
+        'fim': fim,
+        'total': sum(cells.values()),
+        'eixos': axes_out,
+        'celulas': cells_out,
+    }
@@ -7,19 +7,21 @@ import os
 import html
 from collections import Counter
 from .. import glpi_client
-import requests
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..utils.glpi_params import build_search_params, mask_sensitive_keys
 from ..utils.user_names import resolve_user_names_fast
-from ..utils.convert import first_numeric_id
+from ..utils.convert import first_numeric_id, column_values, column_ids
 from ..utils import metrics
+from ..utils import tracing
 from ..utils.cache import cache
 from .glpi_constants import (
     FIELD_CREATED, FIELD_ENTITY, FIELD_CATEGORY, FIELD_TECH, FIELD_STATUS,
     STATUS_NEW,
 )
 from .criteria_helpers import add_date_range, add_status
+from . import ticket_snapshot
+from .sharding import sharded_scan
 from ..config import ranking_timeouts_sec
 
 # Helpers globais de sanitização e validação de rótulos
@@ -82,6 +84,39 @@ def safe_int_id(s: Any) -> int:
         return 0
 
 
+def extract_tech_id(raw: Any) -> int:
+    """ID numérico do técnico (> 0) ou 0 quando não atribuído, com o mesmo fallback de `normalize_tech_key`."""
+    num = first_numeric_id(raw)
+    if isinstance(num, int) and num > 0:
+        return num
+    return int(normalize_tech_key(raw))
+
+
+def tech_ids(values: List[Any]) -> List[int]:
+    """Versão em lote de `extract_tech_id` para a coluna de técnicos de uma página."""
+    if set(map(type, values)) <= {int, type(None)}:
+        # Caminho rápido (display_type=2): IDs inteiros ou nulos
+        return [v if (v is not None and v > 0) else 0 for v in values]
+    return [extract_tech_id(v) for v in values]
+
+
+def id_keys(values: List[Any]) -> List[Any]:
+    """
+    Chaves de contagem por ID para uma coluna de página: inteiro quando numérico,
+    senão o rótulo bruto como string (valores vazios caem no bucket 0).
+    """
+    ids = column_ids(values)
+    if None not in ids:
+        return ids
+    return [n if n is not None else (str(v) if v else 0) for n, v in zip(ids, values)]
+
+
+def item_label(data: Dict[str, Any], item_id: str) -> str:
+    """Rótulo de uma Entity/ITILCategory do GLPI (`completename` > `name` > ID)."""
+    label = sanitize_label(data.get('completename') or data.get('name') or item_id)
+    return item_id if is_invalid_label(label) else label
+
+
 def _resolve_entity_name(headers: Dict[str, str], api_url: str, eid: str) -> str:
     # Se não houver ID, retorna rótulo padrão
     if not eid or eid == '0':
@@ -98,16 +133,13 @@ def _resolve_entity_name(headers: Dict[str, str], api_url: str, eid: str) -> str
             cache.set(key, label)
             return label
         url = f"{api_url}/Entity/{eid}"
-        resp = requests.get(url, headers=headers, timeout=(1, 2.5))
-        resp.raise_for_status()
-        data = resp.json()
+        with tracing.span('glpi.item', itemtype='Entity', id=eid):
+            resp = glpi_client.get(url, headers, timeout=(1, 2.5))
+            resp.raise_for_status()
+            data = resp.json()
         if isinstance(data, list) and data:
             data = data[0]
-        comp = data.get('completename')
-        nm = data.get('name')
-        label = sanitize_label(comp or nm or eid)
-        if is_invalid_label(label):
-            label = eid
+        label = item_label(data, eid)
         cache.set(key, label)
         return label
     except Exception:
@@ -130,16 +162,13 @@ def _resolve_category_name(headers: Dict[str, str], api_url: str, cid: str) -> s
             cache.set(key, label)
             return label
         url = f"{api_url}/ITILCategory/{cid}"
-        resp = requests.get(url, headers=headers, timeout=(1, 2.5))
-        resp.raise_for_status()
-        data = resp.json()
+        with tracing.span('glpi.item', itemtype='ITILCategory', id=cid):
+            resp = glpi_client.get(url, headers, timeout=(1, 2.5))
+            resp.raise_for_status()
+            data = resp.json()
         if isinstance(data, list) and data:
             data = data[0]
-        comp = data.get('completename')
-        nm = data.get('name')
-        label = sanitize_label(comp or nm or cid)
-        if is_invalid_label(label):
-            label = cid
+        label = item_label(data, cid)
         cache.set(key, label)
         return label
     except Exception:
@@ -164,25 +193,30 @@ def generate_entity_ranking(
     Returns:
         Lista de {entity_name, ticket_count} ordenada por count
     """
-    # Critérios com link correto entre condições
-    criteria = add_date_range([], inicio, fim, field=FIELD_CREATED)
-
-    id_counts: Dict[str, int] = {}
-    for row in glpi_client.search_paginated_iter(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=criteria,
-        forcedisplay=[str(FIELD_ENTITY)],
-        uid_cols=False,
-        range_step=range_step_tickets,
-        extra_params={'display_type': display_type, 'is_recursive': is_recursive}
-    ):
-        # Extrai ID de forma robusta; tenta alternativas quando o campo não vem
-        raw_e = row.get(str(FIELD_ENTITY)) or row.get('entities_id')
-        num = first_numeric_id(raw_e)
-        eid = str(num) if isinstance(num, int) else str(raw_e or '0')
-        id_counts[eid] = id_counts.get(eid, 0) + 1
+    def _scan(lo: str, hi: str) -> Counter:
+        # Critérios com link correto entre condições
+        criteria = add_date_range([], lo, hi, field=FIELD_CREATED)
+        counts: Counter = Counter()
+        with tracing.span('logic.scan', ranking='entity'):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=criteria,
+                forcedisplay=[str(FIELD_ENTITY)],
+                uid_cols=False,
+                range_step=range_step_tickets,
+                extra_params={'display_type': display_type, 'is_recursive': is_recursive}
+            ):
+                # Extrai IDs da página em lote; tenta alternativas quando o campo não vem
+                counts.update(id_keys(column_values(page, str(FIELD_ENTITY), 'entities_id')))
+        return counts
+
+    # Snapshot colunar (TICKET_SNAPSHOT=1) responde sem varrer o GLPI
+    id_counts = ticket_snapshot.count_by('entity', inicio, fim, display_type=display_type, is_recursive=is_recursive)
+    if id_counts is None:
+        # Períodos longos: fatias de data em paralelo, com cache por fatia
+        id_counts = sharded_scan(f"entity_{display_type}_{is_recursive}", inicio, fim, _scan)
 
     if not id_counts:
         return []
@@ -191,11 +225,12 @@ def generate_entity_ranking(
     limit = top_n if (top_n and top_n > 0) else None
     sorted_items = sorted_pairs if limit is None else sorted_pairs[:limit]
     result: List[Dict[str, Any]] = []
-    for eid, count in sorted_items:
-        nm = _resolve_entity_name(session_headers, api_url, eid)
-        if is_invalid_label(nm):
-            continue
-        result.append({'entity_name': nm, 'ticket_count': count})
+    with tracing.span('logic.resolve_names', ranking='entity', count=len(sorted_items)):
+        for eid, count in sorted_items:
+            nm = _resolve_entity_name(session_headers, api_url, str(eid))
+            if is_invalid_label(nm):
+                continue
+            result.append({'entity_name': nm, 'ticket_count': count})
 
     return result
 
@@ -213,21 +248,23 @@ def generate_entity_top_all(
     espelhando o script PowerShell top_entities.ps1.
     """
     # Contagem eficiente de entidades via streaming
-    id_counts = Counter()
-    for row in glpi_client.search_paginated_iter(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=[],
-        forcedisplay=[str(FIELD_ENTITY)],
-        uid_cols=False,
-        range_step=range_step_tickets,
-        extra_params={'display_type': display_type, 'is_recursive': is_recursive}
-    ):
-        raw_e = row.get(str(FIELD_ENTITY)) or row.get('entities_id')
-        num = first_numeric_id(raw_e)
-        eid = str(num) if isinstance(num, int) else str(raw_e or '0')
-        id_counts.update([eid])
+    # Snapshot colunar (TICKET_SNAPSHOT=1) responde sem varrer o GLPI
+    id_counts = ticket_snapshot.count_by('entity', display_type=display_type, is_recursive=is_recursive)
+    if id_counts is None:
+        id_counts = Counter()
+        with tracing.span('logic.scan', ranking='entity_top_all'):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=[],
+                forcedisplay=[str(FIELD_ENTITY)],
+                uid_cols=False,
+                range_step=range_step_tickets,
+                extra_params={'display_type': display_type, 'is_recursive': is_recursive}
+            ):
+                # Extrai IDs da página em lote; tenta alternativas quando o campo não vem
+                id_counts.update(id_keys(column_values(page, str(FIELD_ENTITY), 'entities_id')))
 
     if not id_counts:
         return []
@@ -236,11 +273,12 @@ def generate_entity_top_all(
     limit = top_n if (top_n and top_n > 0) else None
     sorted_items = sorted_pairs if limit is None else sorted_pairs[:limit]
     result: List[Dict[str, Any]] = []
-    for eid, count in sorted_items:
-        nm = _resolve_entity_name(session_headers, api_url, eid)
-        if is_invalid_label(nm):
-            continue
-        result.append({'entity_name': nm, 'ticket_count': count})
+    with tracing.span('logic.resolve_names', ranking='entity_top_all', count=len(sorted_items)):
+        for eid, count in sorted_items:
+            nm = _resolve_entity_name(session_headers, api_url, str(eid))
+            if is_invalid_label(nm):
+                continue
+            result.append({'entity_name': nm, 'ticket_count': count})
 
     return result
 
@@ -260,25 +298,31 @@ def generate_category_ranking(
     Returns:
         Lista de {category_name, ticket_count} ordenada por count
     """
-    criteria = add_date_range([], inicio, fim, field=FIELD_CREATED)
-
     # Buscar IDs brutos de categoria no Ticket para contagem confiável
     # Contagem eficiente de categorias via streaming
-    id_counts = Counter()
-    for row in glpi_client.search_paginated_iter(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=criteria,
-        forcedisplay=[str(FIELD_CATEGORY)],
-        uid_cols=False,
-        range_step=range_step_tickets,
-        extra_params={'display_type': display_type, 'is_recursive': is_recursive}
-    ):
-        raw_c = row.get(str(FIELD_CATEGORY)) or row.get('itilcategories_id')
-        num = first_numeric_id(raw_c)
-        cid = str(num) if isinstance(num, int) else str(raw_c or '0')
-        id_counts.update([cid])
+    def _scan(lo: str, hi: str) -> Counter:
+        criteria = add_date_range([], lo, hi, field=FIELD_CREATED)
+        counts: Counter = Counter()
+        with tracing.span('logic.scan', ranking='category'):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=criteria,
+                forcedisplay=[str(FIELD_CATEGORY)],
+                uid_cols=False,
+                range_step=range_step_tickets,
+                extra_params={'display_type': display_type, 'is_recursive': is_recursive}
+            ):
+                # Extrai IDs da página em lote; tenta alternativas quando o campo não vem
+                counts.update(id_keys(column_values(page, str(FIELD_CATEGORY), 'itilcategories_id')))
+        return counts
+
+    # Snapshot colunar (TICKET_SNAPSHOT=1) responde sem varrer o GLPI
+    id_counts = ticket_snapshot.count_by('category', inicio, fim, display_type=display_type, is_recursive=is_recursive)
+    if id_counts is None:
+        # Períodos longos: fatias de data em paralelo, com cache por fatia
+        id_counts = sharded_scan(f"category_{display_type}_{is_recursive}", inicio, fim, _scan)
 
     if not id_counts:
         return []
@@ -287,11 +331,12 @@ def generate_category_ranking(
     limit = top_n if (top_n and top_n > 0) else None
     sorted_items = sorted_pairs if limit is None else sorted_pairs[:limit]
     result: List[Dict[str, Any]] = []
-    for cid, count in sorted_items:
-        nm = _resolve_category_name(session_headers, api_url, cid)
-        if is_invalid_label(nm):
-            continue
-        result.append({'category_name': nm, 'ticket_count': count})
+    with tracing.span('logic.resolve_names', ranking='category', count=len(sorted_items)):
+        for cid, count in sorted_items:
+            nm = _resolve_category_name(session_headers, api_url, str(cid))
+            if is_invalid_label(nm):
+                continue
+            result.append({'category_name': nm, 'ticket_count': count})
     
     return result
 
@@ -309,21 +354,23 @@ def generate_category_top_all(
     espelhando o script PowerShell top_categories.ps1.
     """
     # Contagem eficiente de categorias via streaming
-    id_counts = Counter()
-    for row in glpi_client.search_paginated_iter(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=[],
-        forcedisplay=[str(FIELD_CATEGORY)],
-        uid_cols=False,
-        range_step=range_step_tickets,
-        extra_params={'display_type': display_type, 'is_recursive': is_recursive}
-    ):
-        raw_c = row.get(str(FIELD_CATEGORY)) or row.get('itilcategories_id')
-        num = first_numeric_id(raw_c)
-        cid = str(num) if isinstance(num, int) else str(raw_c or '0')
-        id_counts.update([cid])
+    # Snapshot colunar (TICKET_SNAPSHOT=1) responde sem varrer o GLPI
+    id_counts = ticket_snapshot.count_by('category', display_type=display_type, is_recursive=is_recursive)
+    if id_counts is None:
+        id_counts = Counter()
+        with tracing.span('logic.scan', ranking='category_top_all'):
+            for page in glpi_client.search_paginated_pages(
+                headers=session_headers,
+                api_url=api_url,
+                itemtype='Ticket',
+                criteria=[],
+                forcedisplay=[str(FIELD_CATEGORY)],
+                uid_cols=False,
+                range_step=range_step_tickets,
+                extra_params={'display_type': display_type, 'is_recursive': is_recursive}
+            ):
+                # Extrai IDs da página em lote; tenta alternativas quando o campo não vem
+                id_counts.update(id_keys(column_values(page, str(FIELD_CATEGORY), 'itilcategories_id')))
 
     if not id_counts:
         return []
@@ -334,11 +381,12 @@ def generate_category_top_all(
     limit = top_n if (top_n and top_n > 0) else None
     sorted_items = sorted_pairs if limit is None else sorted_pairs[:limit]
     result: List[Dict[str, Any]] = []
-    for cid, count in sorted_items:
-        nm = _resolve_category_name(session_headers, api_url, cid)
-        if is_invalid_label(nm):
-            continue
-        result.append({'category_name': nm, 'ticket_count': count})
+    with tracing.span('logic.resolve_names', ranking='category_top_all', count=len(sorted_items)):
+        for cid, count in sorted_items:
+            nm = _resolve_category_name(session_headers, api_url, str(cid))
+            if is_invalid_label(nm):
+                continue
+            result.append({'category_name': nm, 'ticket_count': count})
 
     return result
 
@@ -361,9 +409,6 @@ def generate_technician_ranking(
     Returns:
         Lista de {tecnico, tickets} ordenada por count
     """
-    # Critério de intervalo de datas consistente com os demais rankings
-    criteria = add_date_range([], inicio, fim, field=FIELD_CREATED)
-
     # Flag de exclusão de STATUS_NEW controlada via ambiente
     exclude_new = True
     try:
@@ -385,31 +430,43 @@ def generate_technician_ranking(
             range_step_tickets = max(1, int(env_step_raw))
     except Exception:
         pass
-    id_counts = Counter()
-    # Usar timeouts específicos para operação de ranking (mais generosos)
-    ranking_timeout = ranking_timeouts_sec()
-    for row in glpi_client.search_paginated_iter(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=criteria,
-        forcedisplay=[FIELD_TECH, FIELD_STATUS],
-        uid_cols=False,
-        range_step=range_step_tickets,
-        extra_params={'display_type': display_type, 'is_recursive': is_recursive, 'expand_dropdowns': '0'},
-        timeout=ranking_timeout
-    ):
-        # Extrai ID do técnico de forma robusta: tenta campo numérico forçado e fallback
-        raw_t = row.get(str(FIELD_TECH)) or row.get('users_id_assign')
-        num_id = first_numeric_id(raw_t)
-        tech_key = str(num_id) if isinstance(num_id, int) and num_id > 0 else normalize_tech_key(raw_t)
-        # Se solicitada a exclusão de "Novo", pule apenas tickets novos não atribuídos
-        if exclude_new:
-            raw_status = row.get(str(FIELD_STATUS))
-            status_num = first_numeric_id(raw_status)
-            if isinstance(status_num, int) and status_num == STATUS_NEW and tech_key == '0':
-                continue
-        id_counts.update([tech_key])
+    # Snapshot colunar (TICKET_SNAPSHOT=1) responde sem varrer o GLPI
+    id_counts = ticket_snapshot.count_by(
+        'tech', inicio, fim, exclude_new_unassigned=exclude_new,
+        display_type=display_type, is_recursive=is_recursive,
+    )
+    if id_counts is None:
+        # Usar timeouts específicos para operação de ranking (mais generosos)
+        ranking_timeout = ranking_timeouts_sec()
+
+        def _scan(lo: str, hi: str) -> Counter:
+            # Critério de intervalo de datas consistente com os demais rankings
+            criteria = add_date_range([], lo, hi, field=FIELD_CREATED)
+            counts: Counter = Counter()
+            with tracing.span('logic.scan', ranking='technician'):
+                for page in glpi_client.search_paginated_pages(
+                    headers=session_headers,
+                    api_url=api_url,
+                    itemtype='Ticket',
+                    criteria=criteria,
+                    forcedisplay=[FIELD_TECH, FIELD_STATUS],
+                    uid_cols=False,
+                    range_step=range_step_tickets,
+                    extra_params={'display_type': display_type, 'is_recursive': is_recursive, 'expand_dropdowns': '0'},
+                    timeout=ranking_timeout
+                ):
+                    # Extrai IDs do técnico em lote: campo numérico forçado com fallback
+                    techs = tech_ids(column_values(page, str(FIELD_TECH), 'users_id_assign'))
+                    # Se solicitada a exclusão de "Novo", pule apenas tickets novos não atribuídos
+                    if exclude_new:
+                        statuses = column_ids(column_values(page, str(FIELD_STATUS)))
+                        techs = [t for t, st in zip(techs, statuses) if t or st != STATUS_NEW]
+                    counts.update(techs)
+            return counts
+
+        # Períodos longos: fatias de data em paralelo, com cache por fatia
+        scope = f"tech_{display_type}_{is_recursive}_{int(exclude_new)}"
+        id_counts = sharded_scan(scope, inicio, fim, _scan)
 
     _t1 = _time.perf_counter()
     try:
@@ -417,9 +474,9 @@ def generate_technician_ranking(
     except Exception:
         pass
 
-    # Excluir do ranking o bucket de não atribuídos ('0' => "Sem técnico")
+    # Excluir do ranking o bucket de não atribuídos (0 => "Sem técnico")
     if not include_unassigned:
-        id_counts.pop('0', None)
+        id_counts.pop(0, None)
 
     if not id_counts:
         return []
@@ -431,7 +488,8 @@ def generate_technician_ranking(
 
     # Resolver nomes somente para IDs presentes no top-N
     top_ids = [safe_int_id(k) for k, _ in sorted_items if safe_int_id(k) > 0]
-    names_map = resolve_user_names_fast(session_headers, api_url, top_ids)
+    with tracing.span('logic.resolve_names', ranking='technician', count=len(top_ids)):
+        names_map = resolve_user_names_fast(session_headers, api_url, top_ids)
 
     result: List[Dict[str, Any]] = []
     for tech_id_str, count in sorted_items:
@@ -2,13 +2,17 @@
 Lógica de métricas e totais de status para o Dashboard de Manutenção
 Separada por responsabilidade (stats)
 """
+from collections import Counter
 from typing import Dict
 from .. import glpi_client
+from ..utils import tracing
 from .glpi_constants import (
     FIELD_STATUS, FIELD_CREATED, FIELD_ID,
     STATUS_NEW, STATUS_ASSIGNED, STATUS_PLANNED, STATUS_PENDING, STATUS_SOLVED, STATUS_CLOSED,
 )
 from .criteria_helpers import add_date_range, add_status
+from . import ticket_snapshot
+from .sharding import sharded_scan
 from ..config import range_step_tickets
 
 
@@ -24,26 +28,37 @@ def generate_maintenance_stats(
     Returns:
         Dict com novos, pendentes, planejados, resolvidos
     """
+    # Snapshot colunar (TICKET_SNAPSHOT=1): um único group-by por status no período
+    by_status = ticket_snapshot.count_by('status', inicio, fim)
+
     # Helpers internos para reduzir repetição e manter código limpo
     def _count_by_status_in_range(status: int | str) -> int:
-        criteria = add_date_range(
-            add_status([], status),
-            inicio,
-            fim,
-            field=FIELD_CREATED,
-        )
-        count = 0
-        for _row in glpi_client.search_paginated_iter(
-            headers=session_headers,
-            api_url=api_url,
-            itemtype='Ticket',
-            criteria=criteria,
-            forcedisplay=[FIELD_ID],
-            uid_cols=False,
-            range_step=range_step_tickets(),
-        ):
-            count += 1
-        return count
+        if by_status is not None:
+            return by_status.get(int(status), 0)
+
+        def _scan(lo: str, hi: str) -> Counter:
+            criteria = add_date_range(
+                add_status([], status),
+                lo,
+                hi,
+                field=FIELD_CREATED,
+            )
+            count = 0
+            with tracing.span('logic.scan', stats='status', status=str(status)):
+                for page in glpi_client.search_paginated_pages(
+                    headers=session_headers,
+                    api_url=api_url,
+                    itemtype='Ticket',
+                    criteria=criteria,
+                    forcedisplay=[FIELD_ID],
+                    uid_cols=False,
+                    range_step=range_step_tickets(),
+                ):
+                    count += len(page)
+            return Counter({'tickets': count})
+
+        # Períodos longos: fatias de data em paralelo, com cache por fatia
+        return sharded_scan(f"status_{status}", inicio, fim, _scan)['tickets']
 
 
     # Em atendimento (status 2 - Atribuído/Em progresso)
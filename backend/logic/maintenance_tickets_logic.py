@@ -4,6 +4,7 @@ Separada por responsabilidade (tickets)
 """
 from typing import Dict, List, Any
 from .. import glpi_client
+from ..utils import tracing
 from .glpi_constants import (
     FIELD_STATUS, FIELD_CREATED, FIELD_ID, FIELD_NAME,
     FIELD_ENTITY, FIELD_REQUESTER,
@@ -24,38 +25,38 @@ def get_maintenance_new_tickets(
     Returns:
         Lista de tickets novos com id, titulo, solicitante, data, entidade
     """
+    if limit is not None and limit <= 0:
+        return []
     criteria = add_status([], STATUS_NEW)
 
     # Campos forçados: título, id, solicitante, data, entidade
     forced = [str(FIELD_NAME), str(FIELD_ID), str(FIELD_REQUESTER), str(FIELD_CREATED), str(FIELD_ENTITY)]
-    tickets_data = glpi_client.search_paginated(
-        headers=session_headers,
-        api_url=api_url,
-        itemtype='Ticket',
-        criteria=criteria,
-        forcedisplay=forced,
-        uid_cols=False,
-        range_step=100,
-        extra_params={'expand_dropdowns': '1', 'is_recursive': '1'}
-    )
+    # Ordenação por ID desc e limite feitos pelo GLPI: lê só `limit` linhas, não o backlog inteiro
+    with tracing.span('logic.scan', tickets='new', limit=limit):
+        sorted_tickets = glpi_client.search_top_k(
+            headers=session_headers,
+            api_url=api_url,
+            itemtype='Ticket',
+            sort_field=FIELD_ID,
+            k=limit,
+            order='DESC',
+            criteria=criteria,
+            forcedisplay=forced,
+            uid_cols=False,
+            extra_params={'expand_dropdowns': '1', 'is_recursive': '1'}
+        )
 
-    if not tickets_data:
+    if not sorted_tickets:
         return []
 
-    # Ordenação por ID desc e aplicação do limite
-    sorted_tickets = sorted(
-        tickets_data,
-        key=lambda x: to_int_zero(x.get(str(FIELD_ID))),
-        reverse=True
-    )[:limit]
-
     requester_ids = []
     for t in sorted_tickets:
         rid = first_numeric_id(t.get('4'))
         if isinstance(rid, int):
             requester_ids.append(rid)
 
-    names_map = glpi_client.get_user_names_in_batch_with_fallback(session_headers, api_url, requester_ids)
+    with tracing.span('logic.resolve_names', tickets='new', count=len(requester_ids)):
+        names_map = glpi_client.get_user_names_in_batch_with_fallback(session_headers, api_url, requester_ids)
 
     result: List[Dict[str, Any]] = []
     for t in sorted_tickets:
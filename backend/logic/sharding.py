@@ -0,0 +1,114 @@
+"""
+Varreduras por fatias de data (shards) com cache por fatia.
+
+Um período longo (`inicio`..`fim` com mais de `SCAN_SHARD_MIN_DAYS` dias) é
+dividido em fatias por mês ou semana (`SCAN_SHARD`). Cada fatia é uma varredura
+própria no GLPI, rodando em paralelo no bulkhead `shards`, e os contadores são
+somados em ordem cronológica. O contador de cada fatia vai para o cache com a
+chave `scan_shard_<escopo>_<limites>`: períodos sobrepostos reaproveitam as
+fatias que compartilham (meses inteiros no meio do período). Fatias que terminam
+antes de hoje ficam `SCAN_SHARD_TTL_SEC` no cache; a que contém hoje usa o TTL padrão.
+
+Limites: o GLPI compara datas com `>`/`<` estritos. As bordas externas são as
+mesmas da varredura única (`inicio 00:00:00`, `fim 23:59:59`); entre fatias, a
+anterior vai até `< D 00:00:00` e a seguinte começa em `> D-1 23:59:59`, então a
+soma das fatias é exatamente a varredura única.
+
+Sem fatiar (desligado, período curto, datas com hora): `scan(inicio, fim)` direto.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import scan_shard_settings
+from ..utils import deadline, metrics, tracing
+from ..utils.bulkhead import BulkheadFullError, shard_bulkhead
+from ..utils.cache import cache
+from .criteria_helpers import normalize_date_range
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_day(value: str) -> Optional[date]:
+    if not isinstance(value, str) or len(value) != 10:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _next_boundary(day: date, unit: str) -> date:
+    if unit == 'week':
+        return day + timedelta(days=7 - day.weekday())
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def shard_bounds(inicio: str, fim: str, unit: str) -> List[Tuple[str, str, date]]:
+    """Fatias de `inicio`..`fim` (dias inteiros): lista de (> limite inferior, < limite superior, último dia)."""
+    first, last = _parse_day(inicio), _parse_day(fim)
+    outer_lo, outer_hi = normalize_date_range(inicio, fim)
+    shards: List[Tuple[str, str, date]] = []
+    day = first
+    while day <= last:
+        end = min(last, _next_boundary(day, unit) - timedelta(days=1))
+        lo = outer_lo if day == first else f"{day - timedelta(days=1)} 23:59:59"
+        hi = outer_hi if end == last else f"{end + timedelta(days=1)} 00:00:00"
+        shards.append((lo, hi, end))
+        day = end + timedelta(days=1)
+    return shards
+
+
+def sharded_scan(scope: str, inicio: str, fim: str, scan: Callable[[str, str], Counter]) -> Counter:
+    """
+    Contagem de `scan(limite_inferior, limite_superior)` no período, fatiada quando compensa.
+    `scope` identifica a varredura (campos, filtros) na chave de cache das fatias.
+    """
+    cfg = scan_shard_settings()
+    first, last = _parse_day(inicio), _parse_day(fim)
+    if (
+        cfg['unit'] == 'none'
+        or first is None or last is None or last < first
+        or (last - first).days + 1 <= cfg['min_days']
+    ):
+        return scan(inicio, fim)
+
+    shards = shard_bounds(inicio, fim, cfg['unit'])
+    today = datetime.now(timezone.utc).date()
+    keys = [f"scan_shard_{scope}_{lo}_{hi}" for lo, hi, _ in shards]
+    counts: List[Optional[Counter]] = [cache.get(key) for key in keys]
+    pending = [i for i, c in enumerate(counts) if c is None]
+    metrics.increment('scan_shard.hit', value=len(shards) - len(pending), tags={'scope': scope})
+    metrics.increment('scan_shard.miss', value=len(pending), tags={'scope': scope})
+
+    def _run(i: int) -> Counter:
+        lo, hi, end = shards[i]
+        with tracing.span('logic.shard', scope=scope, lo=lo, hi=hi):
+            result = scan(lo, hi)
+        budget = deadline.current()
+        # Fatia cortada pelo prazo (ou cancelada) não vai para o cache
+        if budget is None or not budget.truncated:
+            cache.set(keys[i], result, ttl=cfg['ttl_sec'] if end < today else None)
+        return result
+
+    # A primeira fatia pendente roda nesta thread; as demais em paralelo (fila cheia: aqui também)
+    futures: Dict[int, "Future[Counter]"] = {}
+    for i in pending[1:]:
+        try:
+            futures[i] = shard_bulkhead.submit(_run, i)
+        except BulkheadFullError:
+            pass
+    for i in pending:
+        if i not in futures:
+            counts[i] = _run(i)
+    for i, fut in futures.items():
+        counts[i] = fut.result()
+
+    merged: Counter = Counter()
+    for c in counts:
+        merged.update(c or {})
+    return merged
@@ -0,0 +1,375 @@
+"""
+Snapshot colunar em memória dos tickets usados pelo dashboard.
+
+Em vez de listas de dicts por linha, cada campo vira um `array` compacto:
+
+- `id`, `entity`, `category`, `tech`: inteiros sem sinal de 32 bits (`'I'`);
+- `status`: 1 byte (`'B'`);
+- `day`: dia de criação em dias desde 1970-01-01 (`'H'`).
+
+São ~19 bytes por ticket. As colunas ficam ordenadas por `day`, então o filtro
+por período é um par de `bisect` e o group-by é um `Counter` sobre a fatia da
+coluna (contagem feita em C, sem objetos por linha).
+
+O snapshot é opcional (`TICKET_SNAPSHOT=1`): uma thread daemon reconstrói a
+partir do GLPI a cada `TICKET_SNAPSHOT_REFRESH_SEC`; a lógica de rankings/stats
+consulta `count_by(...)` e, se o snapshot não estiver disponível (ou estiver
+mais velho que `TICKET_SNAPSHOT_MAX_AGE_SEC`), continua varrendo o GLPI.
+
+Com `TICKET_SNAPSHOT_DIR`, as colunas são gravadas como arquivos de largura
+fixa (`utils/column_files.py`) e mapeadas em memória somente leitura: todos os
+workers do Uvicorn compartilham as mesmas páginas do page cache, um único
+processo (o líder, `utils/leader.py`) reconstrói, e os demais passam a
+usar a nova geração assim que `CURRENT` é trocado, sem copiar nada.
+
+Limitações conhecidas:
+- Períodos são tratados por dia inteiro (`inicio`/`fim` no formato `YYYY-MM-DD`);
+  intervalos com hora caem no caminho normal.
+- IDs não numéricos (rótulos devolvidos no lugar do ID) são contados no bucket 0.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import operator
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import compress, islice
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .. import glpi_client
+from ..config import (
+    get_api_url, get_app_token, get_user_token,
+    range_step_tickets, ticket_snapshot_refresh_sec, ticket_snapshot_max_age_sec,
+    ticket_snapshot_dir,
+)
+from ..utils import column_files
+from ..utils import metrics
+from ..utils import tracing
+from ..utils.convert import column_ids, column_values
+from ..utils.governor import BACKGROUND, traffic_class
+from ..utils.leader import leader
+from .glpi_constants import (
+    FIELD_ID, FIELD_STATUS, FIELD_CREATED, FIELD_ENTITY, FIELD_CATEGORY, FIELD_TECH,
+    STATUS_NEW,
+)
+
+logger = logging.getLogger(__name__)
+
+# Typecodes de cada coluna (ordem fixa; reaproveitada na serialização)
+COLUMNS: Dict[str, str] = {
+    'id': 'I',
+    'status': 'B',
+    'entity': 'I',
+    'category': 'I',
+    'tech': 'I',
+    'day': 'H',
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Parâmetros de busca com que o snapshot é montado; só consultas com os mesmos podem usá-lo
+SNAPSHOT_DISPLAY_TYPE = '2'
+SNAPSHOT_IS_RECURSIVE = '1'
+
+
+def epoch_day(value: Any) -> Optional[int]:
+    """Converte `YYYY-MM-DD[ HH:MM:SS]` em dias desde 1970-01-01 (None se inválido)."""
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+
+def day_range(inicio: Optional[str], fim: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Converte um período de dias inteiros em (dia_inicial, dia_final), inclusivo."""
+    if inicio is None and fim is None:
+        return (0, 0xFFFF)
+    if not inicio or not fim or len(inicio) != 10 or len(fim) != 10:
+        return None
+    lo, hi = epoch_day(inicio), epoch_day(fim)
+    if lo is None or hi is None:
+        return None
+    return (lo, hi)
+
+
+class TicketSnapshot:
+    """
+    Colunas de tickets ordenadas por dia de criação.
+    `columns` mapeia nome -> sequência de inteiros (`array` ou `memoryview`).
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Sequence[int]],
+        built_at: float,
+        build_ms: float = 0.0,
+        generation: Optional[str] = None,
+    ):
+        self.columns = columns
+        self.built_at = built_at
+        self.build_ms = build_ms
+        self.generation = generation
+
+    def __len__(self) -> int:
+        return len(self.columns['day'])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(col) * array(COLUMNS[name]).itemsize for name, col in self.columns.items())
+
+    def age_sec(self) -> float:
+        return time.time() - self.built_at
+
+    def bounds(self, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Índices [lo, hi) das linhas com `first_day <= day <= last_day`."""
+        days = self.columns['day']
+        return bisect.bisect_left(days, first_day), bisect.bisect_right(days, last_day)
+
+    def group_count(self, column: str, first_day: int, last_day: int) -> Counter:
+        lo, hi = self.bounds(first_day, last_day)
+        return Counter(self.columns[column][lo:hi])
+
+    def cross_count(self, columns: Sequence[str], first_day: int, last_day: int) -> Counter:
+        """Contagem por tupla de valores das `columns` (tabela cruzada esparsa)."""
+        lo, hi = self.bounds(first_day, last_day)
+        return Counter(zip(*(self.columns[c][lo:hi] for c in columns)))
+
+    def count_unassigned(self, first_day: int, last_day: int, status: int) -> int:
+        """Tickets sem técnico (tech == 0) com o `status` dado, no período."""
+        lo, hi = self.bounds(first_day, last_day)
+        unassigned = map(operator.not_, self.columns['tech'][lo:hi])
+        return bytes(compress(self.columns['status'][lo:hi], unassigned)).count(status)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'tickets': len(self),
+            'bytes': self.nbytes,
+            'age_sec': round(self.age_sec(), 1),
+            'build_ms': round(self.build_ms, 1),
+            'generation': self.generation,
+        }
+
+
+def build_ticket_snapshot(
+    session_headers: Dict[str, str],
+    api_url: str,
+    range_step: int = 1000,
+) -> TicketSnapshot:
+    """Varre todos os tickets (display_type=2) e monta as colunas ordenadas por dia."""
+    # Import tardio: a lógica de ranking importa este módulo
+    from .maintenance_ranking_logic import tech_ids
+
+    t0 = time.perf_counter()
+    cols = {name: array(code) for name, code in COLUMNS.items()}
+    day_cache: Dict[Any, int] = {}
+
+    def _day(v: Any) -> int:
+        d = day_cache.get(v)
+        if d is None:
+            # Dias fora da faixa de 'H' (ou datas ausentes) vão para o dia 0
+            d = epoch_day(v)
+            d = d if d is not None and 0 <= d <= 0xFFFF else 0
+            day_cache[v] = d
+        return d
+
+    with tracing.span('logic.scan', snapshot='tickets'):
+        for page in glpi_client.search_paginated_pages(
+            headers=session_headers,
+            api_url=api_url,
+            itemtype='Ticket',
+            criteria=[],
+            forcedisplay=[FIELD_ID, FIELD_STATUS, FIELD_CREATED, FIELD_ENTITY, FIELD_CATEGORY, FIELD_TECH],
+            uid_cols=False,
+            range_step=range_step,
+            extra_params={
+                'display_type': SNAPSHOT_DISPLAY_TYPE,
+                'is_recursive': SNAPSHOT_IS_RECURSIVE,
+                'expand_dropdowns': '0',
+            },
+        ):
+            cols['id'].extend(n or 0 for n in column_ids(column_values(page, str(FIELD_ID), 'id')))
+            cols['status'].extend(n if n is not None and n < 256 else 0 for n in column_ids(column_values(page, str(FIELD_STATUS))))
+            cols['entity'].extend(n or 0 for n in column_ids(column_values(page, str(FIELD_ENTITY), 'entities_id')))
+            cols['category'].extend(n or 0 for n in column_ids(column_values(page, str(FIELD_CATEGORY), 'itilcategories_id')))
+            cols['tech'].extend(tech_ids(column_values(page, str(FIELD_TECH), 'users_id_assign')))
+            cols['day'].extend(map(_day, column_values(page, str(FIELD_CREATED), 'date')))
+
+    days = cols['day']
+    if not all(map(operator.le, days, islice(days, 1, None))):
+        order = sorted(range(len(days)), key=days.__getitem__)
+        cols = {name: array(col.typecode, map(col.__getitem__, order)) for name, col in cols.items()}
+
+    build_ms = (time.perf_counter() - t0) * 1000
+    return TicketSnapshot(cols, built_at=time.time(), build_ms=build_ms)
+
+
+class SnapshotStore:
+    """
+    Guarda o snapshot publicado; a troca é uma atribuição (leitores nunca veem estado parcial).
+
+    Com `TICKET_SNAPSHOT_DIR`, o snapshot vem das colunas mapeadas em memória:
+    `current()` compara a identidade de `CURRENT` e remapeia quando outro
+    processo publica uma nova geração.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[TicketSnapshot] = None
+        self._loaded_key: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: TicketSnapshot) -> None:
+        directory = ticket_snapshot_dir()
+        if directory:
+            column_files.write_generation(
+                directory,
+                snapshot.columns,
+                meta={'built_at': snapshot.built_at, 'build_ms': snapshot.build_ms},
+            )
+            self._reload(directory)
+            return
+        self._snapshot = snapshot
+
+    def _reload(self, directory: str) -> None:
+        key = column_files.current_key(directory)
+        if key is None or key == self._loaded_key:
+            return
+        with self._lock:
+            if key == self._loaded_key:
+                return
+            opened = column_files.open_current(directory)
+            if opened is None:
+                return
+            name, columns, meta = opened
+            self._snapshot = TicketSnapshot(
+                columns,
+                built_at=float(meta.get('built_at', 0.0)),
+                build_ms=float(meta.get('build_ms', 0.0)),
+                generation=name,
+            )
+            self._loaded_key = key
+        logger.info("snapshot.mapped generation=%s tickets=%d", name, len(self._snapshot))
+
+    def current(self) -> Optional[TicketSnapshot]:
+        directory = ticket_snapshot_dir()
+        if directory:
+            self._reload(directory)
+        snap = self._snapshot
+        if snap is None or snap.age_sec() > ticket_snapshot_max_age_sec():
+            return None
+        return snap
+
+    def clear(self) -> None:
+        self._snapshot = None
+        self._loaded_key = None
+
+
+snapshot_store = SnapshotStore()
+
+
+def _snapshot_for(display_type: str, is_recursive: str) -> Optional[TicketSnapshot]:
+    if str(display_type) != SNAPSHOT_DISPLAY_TYPE or str(is_recursive) != SNAPSHOT_IS_RECURSIVE:
+        return None
+    return snapshot_store.current()
+
+
+def count_by(
+    column: str,
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+    exclude_new_unassigned: bool = False,
+    display_type: str = SNAPSHOT_DISPLAY_TYPE,
+    is_recursive: str = SNAPSHOT_IS_RECURSIVE,
+) -> Optional[Counter]:
+    """
+    Contagem por valor de `column` no período (sem período => todos os tickets).
+    Devolve None quando o snapshot não pode responder (inclusive com `display_type`/
+    `is_recursive` diferentes dos usados na montagem); o chamador varre o GLPI.
+    """
+    snap = _snapshot_for(display_type, is_recursive)
+    if snap is None:
+        return None
+    days = day_range(inicio, fim)
+    if days is None:
+        return None
+    with tracing.span('logic.snapshot', column=column):
+        counts = snap.group_count(column, *days)
+        if exclude_new_unassigned and counts.get(0):
+            counts[0] -= snap.count_unassigned(*days, status=STATUS_NEW)
+            if counts[0] <= 0:
+                del counts[0]
+    metrics.increment('snapshot.query', tags={'column': column})
+    return counts
+
+
+def cross_count(
+    columns: Sequence[str],
+    inicio: Optional[str],
+    fim: Optional[str],
+    display_type: str = SNAPSHOT_DISPLAY_TYPE,
+    is_recursive: str = SNAPSHOT_IS_RECURSIVE,
+) -> Optional[Counter]:
+    """Como `count_by`, mas por tupla de colunas; None quando o snapshot não pode responder."""
+    snap = _snapshot_for(display_type, is_recursive)
+    if snap is None:
+        return None
+    days = day_range(inicio, fim)
+    if days is None:
+        return None
+    with tracing.span('logic.snapshot', column='x'.join(columns)):
+        counts = snap.cross_count(columns, *days)
+    metrics.increment('snapshot.query', tags={'column': 'x'.join(columns)})
+    return counts
+
+
+def refresh_snapshot() -> Optional[TicketSnapshot]:
+    """Reconstrói e publica o snapshot; falhas mantêm o snapshot anterior."""
+    api_url, app_token, user_token = get_api_url(), get_app_token(), get_user_token()
+    if not all([api_url, app_token, user_token]):
+        logger.warning("snapshot.refresh ignorado: variáveis de ambiente da API não configuradas")
+        return None
+    try:
+        headers = glpi_client.authenticate(api_url, app_token, user_token)
+        snap = build_ticket_snapshot(headers, api_url, range_step=range_step_tickets())
+    except Exception:
+        logger.exception("Falha ao reconstruir snapshot de tickets")
+        return None
+    snapshot_store.publish(snap)
+    logger.info("snapshot.refresh tickets=%d bytes=%d build_ms=%.1f", len(snap), snap.nbytes, snap.build_ms)
+    return snap
+
+
+_refresher: Optional[threading.Thread] = None
+
+
+def _is_writer() -> bool:
+    """
+    Sem `TICKET_SNAPSHOT_DIR` todo processo constrói o próprio snapshot.
+    Com diretório compartilhado, apenas o líder reconstrói; os demais só
+    mapeiam a geração publicada.
+    """
+    return not ticket_snapshot_dir() or leader.is_leader()
+
+
+def start_refresher() -> None:
+    """Inicia a thread que reconstrói o snapshot periodicamente (primeira carga imediata)."""
+    global _refresher
+    if _refresher is not None:
+        return
+
+    def _loop() -> None:
+        while True:
+            if _is_writer():
+                # Reconstrução periódica usa a fatia background do governador
+                with traffic_class(BACKGROUND):
+                    refresh_snapshot()
+            time.sleep(ticket_snapshot_refresh_sec())
+
+    _refresher = threading.Thread(target=_loop, name="ticket-snapshot", daemon=True)
+    _refresher.start()
+    logger.info("Snapshot colunar de tickets habilitado (refresh a cada %ds)", ticket_snapshot_refresh_sec())
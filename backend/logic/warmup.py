@@ -0,0 +1,224 @@
+"""
+Aquecimento na subida do app e prontidão (`GET /ready`).
+
+O lifespan de `main.py` chama `start(...)`, que roda numa thread daemon:
+
+1. autentica no GLPI (`initSession` + `changeActiveEntities`) e abre o pool de
+   sessões, com novas tentativas até `WARMUP_TIMEOUT_SEC`;
+2. pré-carrega os dicionários de nomes (`WARMUP_DICTIONARIES`: Entity,
+   ITILCategory, User) no cache, com as mesmas chaves e rótulos da resolução
+   sob demanda, por `WARMUP_DICTIONARY_TTL_SEC`;
+3. opcionalmente aquece os períodos quentes (`WARMUP_RANGES_DAYS`, ex.: `30` =
+   últimos 30 dias, o padrão do dashboard) das rotas em `WARMUP_KINDS`, pelos
+   jobs assíncronos (`utils/jobs.py`). Só o líder (`utils/leader.py`) faz esse
+   passo; com `SHARED_CACHE_DIR` os demais leem o resultado dele.
+
+`/health` continua sendo só liveness; `/ready` responde 503 até o fim do
+aquecimento. Falhas (GLPI fora, prazo estourado) não travam a prontidão: o
+aquecimento termina como `degraded` e a instância entra mesmo assim, já que o
+resto da pilha (cache stale, breaker) lida com o GLPI indisponível.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from .. import glpi_client
+from ..config import get_api_url, get_app_token, get_user_token, timeouts_sec, warmup_settings
+from ..utils import metrics
+from ..utils.cache import cache
+from ..utils.governor import BACKGROUND, traffic_class
+from ..utils.jobs import job_store
+from ..utils.leader import leader
+from ..utils.user_names import user_label
+from .errors import GLPIAuthError
+from .maintenance_ranking_logic import item_label
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+DEGRADED = "degraded"
+
+_PAGE_SIZE = 1000
+
+# itemtype -> (prefixo da chave de cache, rótulo); mesmas chaves de `_resolve_*_name` e `resolve_user_names_fast`
+DICTIONARIES: Dict[str, tuple] = {
+    'Entity': ("entity_name_", lambda rec, item_id: item_label(rec, str(item_id))),
+    'ITILCategory': ("category_name_", lambda rec, item_id: item_label(rec, str(item_id))),
+    'User': ("user_name_", user_label),
+}
+
+
+class WarmupState:
+    def __init__(self):
+        self.status = PENDING
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in (READY, DEGRADED)
+
+    def record(self, step: str, t0: float, **info: Any) -> None:
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.steps[step] = {'ms': round(elapsed_ms, 1), **info}
+        metrics.record_timing('warmup.step_ms', elapsed_ms, tags={'step': step})
+        if info.get('error'):
+            metrics.increment('warmup.failed', tags={'step': step})
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'status': self.status,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'steps': dict(self.steps),
+            }
+
+
+warmup_state = WarmupState()
+
+
+def _authenticate(until: float) -> Dict[str, str]:
+    """Autentica (e abre o pool de sessões), tentando de novo enquanto houver prazo."""
+    attempt = 0
+    while True:
+        try:
+            return glpi_client.authenticate(get_api_url(), get_app_token(), get_user_token())
+        except GLPIAuthError:
+            raise
+        except Exception as e:
+            delay = min(5.0, 0.5 * (2 ** attempt))
+            if time.monotonic() + delay >= until:
+                raise
+            logger.warning("warmup.auth tentativa=%d falhou: %s", attempt + 1, e)
+            time.sleep(delay)
+            attempt += 1
+
+
+def preload_dictionary(headers: Dict[str, str], api_url: str, itemtype: str, ttl: int, until: float) -> int:
+    """Lista `itemtype` em páginas de `_PAGE_SIZE` e grava os rótulos no cache; devolve quantos."""
+    prefix, label = DICTIONARIES[itemtype]
+    url = f"{api_url}/{itemtype}"
+    loaded = 0
+    start = 0
+    while time.monotonic() < until:
+        resp = glpi_client.get(url, headers, params={'range': f"{start}-{start + _PAGE_SIZE - 1}"}, timeout=timeouts_sec())
+        if resp.status_code == 400 and start > 0:
+            # ERROR_RANGE_EXCEED_TOTAL: a página anterior era a última
+            break
+        resp.raise_for_status()
+        rows = resp.json()
+        if not isinstance(rows, list) or not rows:
+            break
+        for rec in rows:
+            item_id = rec.get('id') if isinstance(rec, dict) else None
+            if not isinstance(item_id, int) or item_id <= 0:
+                continue
+            cache.set(f"{prefix}{item_id}", label(rec, item_id), ttl=ttl)
+            loaded += 1
+        total = None
+        content_range = resp.headers.get('Content-Range') or ''
+        if '/' in content_range:
+            try:
+                total = int(content_range.rsplit('/', 1)[1])
+            except ValueError:
+                total = None
+        start += len(rows)
+        if len(rows) < _PAGE_SIZE or (total is not None and start >= total):
+            break
+    return loaded
+
+
+def _warm_ranges(routes: Dict[str, Any], days: list, kinds: list, until: float) -> Dict[str, int]:
+    """Agenda um job por (rota, período quente) e espera todos (ou o prazo)."""
+    today = datetime.now(timezone.utc).date()
+    jobs = []
+    for n in days:
+        params = {'inicio': (today - timedelta(days=n)).isoformat(), 'fim': today.isoformat()}
+        for kind in kinds:
+            route = routes.get(kind)
+            if route is None:
+                logger.warning("warmup.ranges tipo desconhecido: %s", kind)
+                continue
+            jobs.append(job_store.submit(kind, route.__wrapped__, route.cache_key(**params), dict(params)))
+    while time.monotonic() < until and not all(job.finished for job in jobs):
+        time.sleep(0.2)
+    return {
+        'jobs': len(jobs),
+        'done': sum(1 for job in jobs if job.status == 'done'),
+    }
+
+
+def run_warmup(routes: Dict[str, Any]) -> None:
+    cfg = warmup_settings()
+    until = time.monotonic() + cfg['timeout_sec']
+    warmup_state.status = WARMING
+    warmup_state.started_at = time.time()
+    t_all = time.perf_counter()
+    degraded = False
+
+    def _step(name: str, fn: Callable[[], Any], **info: Any) -> Any:
+        nonlocal degraded
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            degraded = True
+            logger.warning("warmup.%s falhou: %s", name, e)
+            warmup_state.record(name, t0, error=str(e) or e.__class__.__name__, **info)
+            return None
+        warmup_state.record(name, t0, result=result, **info)
+        return result
+
+    api_url = get_api_url()
+    headers: Optional[Dict[str, str]] = None
+    t0 = time.perf_counter()
+    if not all([api_url, get_app_token(), get_user_token()]):
+        degraded = True
+        warmup_state.record('auth', t0, error="Variáveis de ambiente da API não configuradas.")
+    else:
+        try:
+            headers = _authenticate(until)
+            warmup_state.record('auth', t0, sessions=len(glpi_client.session_pool.stats()))
+        except Exception as e:
+            degraded = True
+            logger.warning("warmup.auth falhou: %s", e)
+            warmup_state.record('auth', t0, error=str(e) or e.__class__.__name__)
+
+    if headers:
+        with traffic_class(BACKGROUND):
+            for itemtype in cfg['dictionaries']:
+                if itemtype not in DICTIONARIES:
+                    logger.warning("warmup.dictionaries itemtype desconhecido: %s", itemtype)
+                    continue
+                _step(f"dictionary.{itemtype}", lambda: preload_dictionary(
+                    headers, api_url, itemtype, cfg['dictionary_ttl_sec'], until,
+                ))
+        if cfg['ranges_days'] and leader.is_leader():
+            _step('ranges', lambda: _warm_ranges(routes, cfg['ranges_days'], cfg['kinds'], until),
+                  days=cfg['ranges_days'])
+
+    if time.monotonic() >= until:
+        degraded = True
+    warmup_state.finished_at = time.time()
+    warmup_state.status = DEGRADED if degraded else READY
+    elapsed_ms = (time.perf_counter() - t_all) * 1000
+    metrics.record_timing('warmup.duration_ms', elapsed_ms)
+    logger.info("warmup.%s ms=%.1f steps=%s", warmup_state.status, elapsed_ms, sorted(warmup_state.steps))
+
+
+def start(routes: Dict[str, Any]) -> None:
+    """Roda o aquecimento numa thread daemon (sem bloquear a subida do servidor)."""
+    if not warmup_settings()['enabled']:
+        warmup_state.status = READY
+        return
+    threading.Thread(target=run_warmup, args=(routes,), name="warmup", daemon=True).start()
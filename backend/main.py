@@ -2,12 +2,16 @@
 Aplicação FastAPI do backend de Manutenção.
 Monta o maintenance_router sob o prefixo já definido no router.
 """
+import hmac
 import logging
 import os
+import threading
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import RedirectResponse
+from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -46,8 +50,32 @@ from .api import (
     maintenance_stats_router,
     maintenance_ranking_router,
     maintenance_tickets_router,
+    maintenance_jobs_router,
+    maintenance_compare_router,
+    maintenance_pivot_router,
+    debug_router,
 )
-app = FastAPI(title="DTIC Dashboard - Manutenção")
+from .config import (
+    debug_endpoints_enabled,
+    trace_enabled,
+    profile_token,
+    profile_sampling_enabled,
+    ticket_snapshot_enabled,
+    request_deadline_ms,
+)
+from .utils import deadline, metrics, tracing, profiling
+from .logic import ticket_snapshot, warmup
+from . import glpi_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Aquecimento em background: o servidor já responde `/health`, e `/ready` só fica verde no fim
+    warmup.start(maintenance_jobs_router.JOB_KINDS)
+    yield
+
+
+app = FastAPI(title="DTIC Dashboard - Manutenção", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -61,15 +89,104 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Metadados de degradação lidos pelo frontend (cache stale e resultado parcial)
+    expose_headers=["Age", "X-Cache", "X-Partial", "X-Coverage"],
 )
 app.include_router(maintenance_stats_router.router)
 app.include_router(maintenance_ranking_router.router)
 app.include_router(maintenance_tickets_router.router)
+app.include_router(maintenance_compare_router.router)
+app.include_router(maintenance_pivot_router.router)
+app.include_router(maintenance_jobs_router.router)
+if debug_endpoints_enabled():
+    app.include_router(debug_router.router)
+
+
+# Registrado antes do middleware de trace para rodar dentro dele (e enxergar a trace ativa).
+# Sem PROFILE_TOKEN o middleware nem é instalado: custo zero.
+if profile_token():
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        """Amostra as stacks de uma requisição quando o token de profiling confere."""
+        token = request.headers.get("X-Profile") or request.query_params.get("__profile")
+        if not token or not hmac.compare_digest(token, profile_token() or ""):
+            return await call_next(request)
+        trace = tracing.current_trace()
+        if trace is not None:
+            trace.bind_thread(threading.get_ident())
+        sampler = profiling.request_sampler(trace.threads if trace is not None else None)
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+        stacks = sampler.drain()
+        if request.headers.get("X-Profile-Output", "").lower() == "inline":
+            return PlainTextResponse(profiling.format_collapsed(stacks), status_code=response.status_code)
+        name = trace.request_id if trace is not None else uuid.uuid4().hex[:16]
+        path = profiling.write_profile(f"request-{name}", stacks)
+        response.headers["X-Profile-Id"] = os.path.basename(path)
+        return response
+
+if profile_sampling_enabled():
+    profiling.start_process_sampler()
+
+if ticket_snapshot_enabled():
+    ticket_snapshot.start_refresher()
+
+
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """
+    Abre o orçamento de tempo das rotas do dashboard (`X-Deadline-Ms` ou `REQUEST_DEADLINE_MS`)
+    e marca respostas com varredura interrompida pelo prazo (`X-Partial`, `X-Coverage`).
+    """
+    if not request.url.path.startswith("/api/v1/manutencao"):
+        return await call_next(request)
+    try:
+        budget_ms = int(request.headers.get("X-Deadline-Ms") or request_deadline_ms())
+    except ValueError:
+        budget_ms = request_deadline_ms()
+    budget = deadline.start(budget_ms / 1000.0 if budget_ms > 0 else None)
+    response = await call_next(request)
+    if budget.truncated:
+        coverage = budget.coverage()
+        response.headers["X-Partial"] = "true"
+        response.headers["X-Coverage"] = f"{coverage:.3f}"
+        metrics.increment('deadline.partial', tags={'path': request.url.path})
+    return response
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Abre uma trace por requisição e devolve `X-Request-ID` e `Server-Timing`."""
+    if not trace_enabled():
+        return await call_next(request)
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    trace = tracing.start_trace(request_id, request.url.path)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        trace.finish(status_code)
+        tracing.trace_store.record(trace)
+    response.headers["X-Request-ID"] = request_id
+    response.headers["Server-Timing"] = trace.server_timing()
+    return response
 
 
 @app.get("/health")
-def health() -> dict:
-    return {"status": "ok"}
+async def health() -> dict:
+    # Liveness: o processo responde mesmo com o GLPI fora; o estado do upstream vai em `glpi`.
+    # `async` para rodar direto no event loop, sem disputar thread com as rotas pesadas.
+    return {"status": "ok", "glpi": glpi_client.glpi_breaker.snapshot()}
+
+
+@app.get("/ready")
+async def ready():
+    # Readiness: 503 até o aquecimento da subida terminar (`logic/warmup.py`)
+    state = warmup.warmup_state.to_dict()
+    return JSONResponse(state, status_code=200 if warmup.warmup_state.ready else 503)
 
 # Servir frontend estático em /dashboard e redirecionar raiz
 try:
@@ -2,6 +2,8 @@
 Schemas Pydantic para o Dashboard de Manutenção
 Define modelos de resposta da API específicos para métricas de manutenção.
 """
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -38,4 +40,84 @@ class MaintenanceNewTicketItem(BaseModel):
     titulo: str = Field(..., description="Título do ticket")
     solicitante: str = Field(..., description="Nome do solicitante (resolvido quando possível)")
     data: str = Field(..., description="Data de criação formatada (dd/MM/yyyy HH:mm)")
-    entidade: str = Field(..., description="Nome da entidade associada ao ticket")
\ No newline at end of file
+    entidade: str = Field(..., description="Nome da entidade associada ao ticket")
+
+
+class MaintenanceJobRequest(BaseModel):
+    """Pedido de job assíncrono (mesmos parâmetros da rota síncrona correspondente)."""
+    tipo: str = Field(..., description="Rota a calcular: ranking-entidades, ranking-categorias, ranking-tecnicos, stats-gerais, top-atribuicao-entidades ou top-atribuicao-categorias")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parâmetros da rota (ex.: inicio, fim, top)")
+
+
+class MaintenanceJobProgress(BaseModel):
+    """Progresso de um job."""
+    pages: int = Field(..., description="Páginas do GLPI lidas até agora")
+    rows: int = Field(..., description="Linhas lidas até agora")
+    rows_total: int = Field(..., description="Total de linhas das varreduras já iniciadas")
+    coverage: Optional[float] = Field(None, description="rows / rows_total (null antes da primeira página)")
+
+
+class MaintenanceJobStatus(BaseModel):
+    """Estado de um job assíncrono."""
+    id: str = Field(..., description="ID do job")
+    tipo: str = Field(..., description="Rota calculada")
+    params: Dict[str, Any] = Field(..., description="Parâmetros da rota")
+    status: str = Field(..., description="queued, running, done ou failed")
+    progress: MaintenanceJobProgress
+    created_at: float = Field(..., description="Criação (epoch, segundos)")
+    started_at: Optional[float] = Field(None, description="Início da execução (epoch, segundos)")
+    finished_at: Optional[float] = Field(None, description="Fim da execução (epoch, segundos)")
+    error: Optional[str] = Field(None, description="Mensagem de erro quando status=failed")
+    result: Optional[Any] = Field(None, description="Mesmo corpo da rota síncrona quando status=done")
+
+
+class ComparisonPeriod(BaseModel):
+    """Período de uma comparação, com total e delta em relação à referência (primeiro período)."""
+    inicio: str = Field(..., description="Início do período (YYYY-MM-DD)")
+    fim: str = Field(..., description="Fim do período (YYYY-MM-DD)")
+    total: int = Field(..., description="Total de tickets no período")
+    delta: Optional[int] = Field(None, description="Referência - período (null na referência)")
+    delta_pct: Optional[float] = Field(None, description="delta / total do período, em % (null na referência ou com total 0)")
+
+
+class ComparisonItem(BaseModel):
+    """Valor de um item da dimensão em cada período (mesma ordem de `periodos`)."""
+    nome: str = Field(..., description="Rótulo do item (entidade, categoria, técnico ou status)")
+    valores: List[int] = Field(..., description="Tickets em cada período")
+    deltas: List[Optional[int]] = Field(..., description="Referência - período (null na referência)")
+    deltas_pct: List[Optional[float]] = Field(..., description="delta / valor do período, em %")
+
+
+class MaintenanceComparison(BaseModel):
+    """Comparação de períodos para uma dimensão."""
+    dimensao: str = Field(..., description="entidade, categoria, tecnico ou status")
+    periodos: List[ComparisonPeriod]
+    itens: List[ComparisonItem]
+
+
+class PivotAxisItem(BaseModel):
+    """Item de um eixo da tabela cruzada, com o total marginal."""
+    nome: str = Field(..., description="Rótulo do item (entidade, categoria, técnico ou status)")
+    total: int = Field(..., description="Tickets do item somando todas as células")
+
+
+class PivotAxis(BaseModel):
+    """Eixo da tabela cruzada (top-K por total marginal)."""
+    dimensao: str = Field(..., description="entidade, categoria, tecnico ou status")
+    itens: List[PivotAxisItem]
+
+
+class PivotCell(BaseModel):
+    """Célula não vazia da tabela cruzada."""
+    chaves: List[str] = Field(..., description="Rótulo em cada dimensão (mesma ordem de `dimensoes`)")
+    total: int = Field(..., description="Tickets na célula")
+
+
+class MaintenancePivot(BaseModel):
+    """Tabela cruzada esparsa de tickets por 2 ou 3 dimensões no período."""
+    dimensoes: List[str] = Field(..., description="Dimensões na ordem dos eixos")
+    inicio: str = Field(..., description="Início do período (YYYY-MM-DD)")
+    fim: str = Field(..., description="Fim do período (YYYY-MM-DD)")
+    total: int = Field(..., description="Total de tickets contados (antes do top-K)")
+    eixos: List[PivotAxis]
+    celulas: List[PivotCell] = Field(..., description="Células com chaves dentro dos eixos, por total desc")
@@ -0,0 +1 @@
+# Package marker for maintenance backend tools
\ No newline at end of file
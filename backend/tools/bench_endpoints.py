@@ -0,0 +1,304 @@
+"""
+Benchmark dos endpoints do dashboard contra o GLPI stand-in.
+
+Para cada combinação de tamanho de dataset e passo de paginação
+(`GLPI_RANGE_STEP_TICKETS`), sobe um stand-in em subprocesso, serve o app
+FastAPI via Uvicorn neste processo e mede por rota:
+
+- `cold_ms`: primeira chamada (cache do app e sessão GLPI zerados);
+- `warm_ms`: segunda chamada (deve vir do cache);
+- `upstream_cold` / `upstream_warm`: requisições recebidas pelo stand-in;
+- `rows_per_sec`: linhas servidas pelo stand-in / tempo da chamada fria;
+- `peak_rss_mb`: pico de RSS deste processo (app + harness) após a rota.
+
+Os resultados são comparados a um baseline versionado em
+`backend/tools/baselines/endpoints.json`. Contagens de upstream são
+determinísticas e comparadas de forma exata; tempos usam tolerância relativa.
+
+Uso:
+    python -m backend.tools.bench_endpoints                      # compara com o baseline
+    python -m backend.tools.bench_endpoints --update-baseline    # regrava o baseline
+    python -m backend.tools.bench_endpoints --sizes 1000000 --steps 1000 --output resultado.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "endpoints.json"
+PREFIX = "/api/v1/manutencao"
+
+# Intervalo padrão: último trimestre do dataset sintético (2024-01-01..2025-12-31)
+DEFAULT_INICIO = "2025-10-01"
+DEFAULT_FIM = "2025-12-31"
+
+
+def bench_routes(inicio: str, fim: str) -> List[Tuple[str, str]]:
+    periodo = f"inicio={inicio}&fim={fim}"
+    return [
+        ("stats-gerais", f"{PREFIX}/stats-gerais?{periodo}"),
+        ("ranking-entidades", f"{PREFIX}/ranking-entidades?{periodo}&top=10"),
+        ("ranking-categorias", f"{PREFIX}/ranking-categorias?{periodo}&top=10"),
+        ("ranking-tecnicos", f"{PREFIX}/ranking-tecnicos?{periodo}"),
+        ("top-atribuicao-entidades", f"{PREFIX}/top-atribuicao-entidades?top=10"),
+        ("top-atribuicao-categorias", f"{PREFIX}/top-atribuicao-categorias?top=10"),
+        ("tickets-novos", f"{PREFIX}/tickets-novos"),
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_http(url: str, timeout_sec: float = 120.0, expect_ok: bool = False) -> None:
+    deadline = time.time() + timeout_sec
+    while time.time() < deadline:
+        try:
+            resp = requests.get(url, timeout=1)
+            if not expect_ok or resp.ok:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Serviço não respondeu a tempo: {url}")
+
+
+def peak_rss_mb() -> float:
+    # Linux reporta ru_maxrss em KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class StandinProcess:
+    """GLPI stand-in em subprocesso, para não contaminar o RSS medido."""
+
+    def __init__(self, tickets: int, latency_ms: float, extra_args: Optional[List[str]] = None):
+        self.port = free_port()
+        cmd = [
+            sys.executable, "-m", "backend.tools.glpi_standin",
+            "--port", str(self.port),
+            "--tickets", str(tickets),
+            "--latency-ms", str(latency_ms),
+        ] + list(extra_args or [])
+        root = Path(__file__).resolve().parents[2]
+        self.proc = subprocess.Popen(cmd, cwd=str(root), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.api_url = f"{self.base_url}/apirest.php"
+        wait_http(f"{self.base_url}/_standin/stats")
+
+    def stats(self) -> Dict[str, Any]:
+        return requests.get(f"{self.base_url}/_standin/stats", timeout=5).json()
+
+    def reset(self) -> None:
+        requests.post(f"{self.base_url}/_standin/reset", timeout=5)
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class AppServer:
+    """App FastAPI servido por Uvicorn numa thread deste processo."""
+
+    def __init__(self) -> None:
+        import uvicorn
+        from ..main import app
+
+        self.port = free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="bench-uvicorn", daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        # Espera o aquecimento da subida para não misturar as chamadas dele com as medidas
+        wait_http(f"{self.base_url}/ready", expect_ok=True)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def reset_app_state() -> None:
+    """Zera caches do app, sessões GLPI e o circuit breaker para medir a chamada fria."""
+    from .. import glpi_client
+    from ..utils.cache import cache
+
+    cache.clear()
+    glpi_client.session_pool.clear()
+    glpi_client.glpi_breaker.reset()
+
+
+def measure_route(app: AppServer, standin: StandinProcess, path: str) -> Dict[str, Any]:
+    reset_app_state()
+    standin.reset()
+    t0 = time.perf_counter()
+    resp = requests.get(app.base_url + path, timeout=600)
+    cold_ms = (time.perf_counter() - t0) * 1000
+    cold_stats = standin.stats()
+
+    standin.reset()
+    t0 = time.perf_counter()
+    requests.get(app.base_url + path, timeout=600)
+    warm_ms = (time.perf_counter() - t0) * 1000
+    warm_stats = standin.stats()
+
+    rows = cold_stats["rows_served"]
+    return {
+        "status": resp.status_code,
+        "cold_ms": round(cold_ms, 1),
+        "warm_ms": round(warm_ms, 1),
+        "upstream_cold": cold_stats["requests"].get("total", 0),
+        "upstream_warm": warm_stats["requests"].get("total", 0),
+        "rows_upstream": rows,
+        "rows_per_sec": round(rows / (cold_ms / 1000.0), 1) if cold_ms > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    steps: List[int],
+    latency_ms: float,
+    inicio: str,
+    fim: str,
+    routes: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        standin = StandinProcess(size, latency_ms)
+        try:
+            os.environ["API_URL"] = standin.api_url
+            os.environ.setdefault("APP_TOKEN", "bench")
+            os.environ.setdefault("USER_TOKEN", "bench")
+            app = AppServer()
+            try:
+                for step in steps:
+                    # Passo global e override usado pelo ranking de técnicos
+                    os.environ["GLPI_RANGE_STEP_TICKETS"] = str(step)
+                    os.environ["RANGE_STEP_TICKETS"] = str(step)
+                    for name, path in bench_routes(inicio, fim):
+                        if routes and name not in routes:
+                            continue
+                        key = f"{size}/{step}/{name}"
+                        results[key] = measure_route(app, standin, path)
+                        logger.info("bench %s %s", key, results[key])
+            finally:
+                app.stop()
+        finally:
+            standin.stop()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    time_tolerance: float,
+) -> List[str]:
+    """Devolve a lista de regressões encontradas (vazia quando tudo ok)."""
+    problems: List[str] = []
+    for key, cur in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ("upstream_cold", "upstream_warm"):
+            if cur[metric] > base[metric]:
+                problems.append(f"{key}: {metric} {base[metric]} -> {cur[metric]}")
+        for metric in ("cold_ms", "warm_ms"):
+            # Piso absoluto evita falsos positivos em chamadas de poucos ms
+            limit = base[metric] * (1 + time_tolerance) + 20.0
+            if cur[metric] > limit:
+                problems.append(f"{key}: {metric} {base[metric]:.1f} -> {cur[metric]:.1f} (limite {limit:.1f})")
+        if cur["status"] != base["status"]:
+            problems.append(f"{key}: status {base['status']} -> {cur['status']}")
+    return problems
+
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    header = f"{'cenário':<44} {'st':>3} {'frio ms':>9} {'quente ms':>9} {'up frio':>7} {'up qte':>6} {'linhas/s':>10} {'rss MB':>7} {'base frio':>9}"
+    print(header)
+    print("-" * len(header))
+    for key, r in sorted(results.items()):
+        base = baseline.get(key, {})
+        base_cold = f"{base['cold_ms']:.1f}" if base else "-"
+        print(
+            f"{key:<44} {r['status']:>3} {r['cold_ms']:>9.1f} {r['warm_ms']:>9.1f} {r['upstream_cold']:>7} "
+            f"{r['upstream_warm']:>6} {r['rows_per_sec']:>10.0f} {r['peak_rss_mb']:>7.1f} {base_cold:>9}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    p = argparse.ArgumentParser(description="Benchmark dos endpoints contra o GLPI stand-in")
+    p.add_argument("--sizes", default="20000,100000", help="Tamanhos de dataset separados por vírgula")
+    p.add_argument("--steps", default="300,1000", help="Valores de GLPI_RANGE_STEP_TICKETS")
+    p.add_argument("--latency-ms", type=float, default=2.0, help="Latência injetada por requisição no stand-in")
+    p.add_argument("--inicio", default=DEFAULT_INICIO)
+    p.add_argument("--fim", default=DEFAULT_FIM)
+    p.add_argument("--routes", default="", help="Filtra rotas (nomes separados por vírgula)")
+    p.add_argument("--baseline", default=str(BASELINE_PATH))
+    p.add_argument("--update-baseline", action="store_true")
+    p.add_argument("--time-tolerance", type=float, default=0.5, help="Tolerância relativa para tempos (0.5 = +50%%)")
+    p.add_argument("--output", default=None, help="Grava os resultados em JSON")
+    args = p.parse_args(argv)
+
+    # Métricas por requisição poluem a saída do benchmark
+    logging.getLogger("backend").setLevel(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    steps = [int(s) for s in args.steps.split(",") if s.strip()]
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()] or None
+    results = run_suite(sizes, steps, args.latency_ms, args.inicio, args.fim, routes)
+
+    baseline_path = Path(args.baseline)
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+
+    print_table(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"results": results}, indent=2, sort_keys=True), encoding="utf-8")
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        merged = dict(baseline)
+        merged.update(results)
+        doc = {
+            "latency_ms": args.latency_ms,
+            "inicio": args.inicio,
+            "fim": args.fim,
+            "results": merged,
+        }
+        baseline_path.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline atualizado: {baseline_path}")
+        return 0
+
+    problems = compare(results, baseline, args.time_tolerance)
+    if problems:
+        print("\nRegressões:")
+        for prob in problems:
+            print(f"  - {prob}")
+        return 1
+    print("\nSem regressões em relação ao baseline." if baseline else "\nSem baseline para comparar.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
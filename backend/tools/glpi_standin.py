@@ -0,0 +1,788 @@
+"""
+Servidor GLPI local (stand-in) para benchmarks e testes de regressão.
+
+Implementa o subconjunto da API REST do GLPI usado pelo backend:
+- `GET  /apirest.php/initSession` e `GET /apirest.php/killSession`
+- `POST /apirest.php/changeActiveEntities`
+- `GET  /apirest.php/search/{itemtype}` com `criteria`, `forcedisplay`, `range`,
+  `sort`/`order`, `display_type`, `expand_dropdowns` e `totalcount`
+- `GET  /apirest.php/{User|Entity|ITILCategory}/{id}` e listagem com `range`
+
+Recursos para medição reprodutível:
+- Dataset sintético determinístico (seed) com distribuição enviesada (Zipf)
+  para entidades, categorias e técnicos; 1M de tickets cabem em poucos MB.
+- Latência injetada (base, jitter, por linha e páginas lentas ocasionais),
+  taxa de erros 5xx e serialização por sessão (como o lock de sessão do PHP).
+- Expiração de sessão para exercitar reautenticação.
+- Modo gravação (proxy para um GLPI real, salvando JSONL) e modo replay.
+- Contadores em `GET /_standin/stats` e reset em `POST /_standin/reset`.
+- Lease de liderança (`POST /_standin/lease/<nome>` e `.../release`) para emular
+  a eleição entre réplicas do backend (`utils/leader.py`, `LEADER_BACKEND=http`).
+
+Uso:
+    python -m backend.tools.glpi_standin --tickets 1000000 --port 8089 --latency-ms 20
+    python -m backend.tools.glpi_standin --record-upstream https://glpi/apirest.php --record-file trafego.jsonl
+    python -m backend.tools.glpi_standin --replay trafego.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import calendar
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/apirest.php"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+# Mesmos IDs de search options usados em logic/glpi_constants.py
+F_NAME, F_ID, F_REQUESTER, F_TECH, F_CATEGORY, F_STATUS, F_CREATED, F_ENTITY = 1, 2, 4, 5, 7, 12, 15, 80
+
+
+def _parse_date(value: str) -> int:
+    value = value.strip()
+    fmt = DATE_FMT if " " in value else "%Y-%m-%d"
+    return calendar.timegm(time.strptime(value, fmt))
+
+
+def _format_date(epoch: int) -> str:
+    return time.strftime(DATE_FMT, time.gmtime(epoch))
+
+
+def _zipf_weights(n: int, s: float) -> List[float]:
+    return [1.0 / ((i + 1) ** s) for i in range(n)]
+
+
+class SyntheticDataset:
+    """
+    Tickets sintéticos em colunas compactas (`array`), ordenados por data de criação.
+    O ID do ticket cresce com a data, como num GLPI real.
+    """
+
+    def __init__(
+        self,
+        tickets: int = 50_000,
+        entities: int = 60,
+        categories: int = 120,
+        technicians: int = 80,
+        users: int = 3_000,
+        start: str = "2024-01-01",
+        end: str = "2025-12-31",
+        skew: float = 1.1,
+        seed: int = 42,
+    ):
+        rnd = random.Random(seed)
+        self.entities = entities
+        self.categories = categories
+        self.technicians = technicians
+        self.users = max(users, technicians)
+        t_start = _parse_date(start)
+        t_end = _parse_date(end) + 86399
+        recent_cut = t_end - 30 * 86400
+
+        created = sorted(rnd.randint(t_start, t_end) for _ in range(tickets))
+        ent_w = _zipf_weights(entities, skew)
+        cat_w = _zipf_weights(categories, skew)
+        tech_w = _zipf_weights(technicians, skew)
+        self.created = array("q", created)
+        self.ids = array("l", range(1, tickets + 1))
+        self.entity = array("l", rnd.choices(range(1, entities + 1), weights=ent_w, k=tickets))
+        self.category = array("l", rnd.choices(range(1, categories + 1), weights=cat_w, k=tickets))
+        self.requester = array("l", (rnd.randint(1, self.users) for _ in range(tickets)))
+        self.status = array("b", bytes(tickets))
+        self.tech = array("l", bytes(8 * tickets))
+        techs = rnd.choices(range(1, technicians + 1), weights=tech_w, k=tickets)
+        for i, ts in enumerate(created):
+            r = rnd.random()
+            if ts >= recent_cut:
+                # Tickets recentes: backlog de novos/em atendimento/pendentes
+                st = 1 if r < 0.25 else 2 if r < 0.55 else 4 if r < 0.65 else 3 if r < 0.70 else 5 if r < 0.85 else 6
+            else:
+                st = 1 if r < 0.01 else 2 if r < 0.04 else 4 if r < 0.06 else 3 if r < 0.07 else 5 if r < 0.25 else 6
+            self.status[i] = st
+            # Novos em geral não têm técnico; 5% dos demais também ficam sem atribuição
+            unassigned = (st == 1 and rnd.random() < 0.9) or rnd.random() < 0.05
+            self.tech[i] = 0 if unassigned else techs[i]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # Dicionários (nomes) determinísticos a partir do ID
+    def entity_record(self, eid: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= eid <= self.entities:
+            return None
+        if eid == 0:
+            return {"id": 0, "name": "Entidade raiz", "completename": "Entidade raiz"}
+        parent = f"Secretaria {((eid - 1) // 10) + 1:02d}"
+        return {"id": eid, "name": f"Setor {eid:03d}", "completename": f"Entidade raiz > {parent} > Setor {eid:03d}"}
+
+    def category_record(self, cid: int) -> Optional[Dict[str, Any]]:
+        if not 1 <= cid <= self.categories:
+            return None
+        groups = ("Elétrica", "Hidráulica", "Civil", "Climatização", "Marcenaria", "Jardinagem")
+        group = groups[(cid - 1) % len(groups)]
+        return {"id": cid, "name": f"Serviço {cid:03d}", "completename": f"Manutenção > {group} > Serviço {cid:03d}"}
+
+    def user_record(self, uid: int) -> Optional[Dict[str, Any]]:
+        if not 1 <= uid <= self.users:
+            return None
+        kind = "Técnico" if uid <= self.technicians else "Usuário"
+        return {"id": uid, "name": f"user{uid}", "firstname": kind, "realname": f"{uid:05d}"}
+
+    def record(self, itemtype: str, item_id: int) -> Optional[Dict[str, Any]]:
+        if itemtype == "Entity":
+            return self.entity_record(item_id)
+        if itemtype == "ITILCategory":
+            return self.category_record(item_id)
+        if itemtype == "User":
+            return self.user_record(item_id)
+        return None
+
+    def count(self, itemtype: str) -> int:
+        return {"Entity": self.entities + 1, "ITILCategory": self.categories, "User": self.users}.get(itemtype, 0)
+
+    def first_id(self, itemtype: str) -> int:
+        return 0 if itemtype == "Entity" else 1
+
+    # Avaliação de critérios
+    def select(self, criteria: List[Dict[str, str]]) -> List[int]:
+        """Devolve os índices (ordem de criação) que satisfazem os critérios."""
+        lo, hi = 0, len(self.ids)
+        predicates = []
+        for c in criteria:
+            fld = int(c.get("field", 0) or 0)
+            st = c.get("searchtype", "equals")
+            val = c.get("value", "")
+            link = (c.get("link") or "AND").upper()
+            if link != "AND":
+                raise ValueError(f"link não suportado pelo stand-in: {link}")
+            if fld == F_CREATED and st in ("morethan", "lessthan"):
+                # Dataset ordenado por data: intervalo vira bisect
+                ts = _parse_date(val)
+                if st == "morethan":
+                    lo = max(lo, bisect.bisect_right(self.created, ts))
+                else:
+                    hi = min(hi, bisect.bisect_left(self.created, ts))
+                continue
+            column = {F_STATUS: self.status, F_ENTITY: self.entity, F_CATEGORY: self.category,
+                      F_TECH: self.tech, F_ID: self.ids, F_REQUESTER: self.requester}.get(fld)
+            if column is None:
+                raise ValueError(f"campo não suportado pelo stand-in: {fld}")
+            if st in ("equals", "contains"):
+                predicates.append((column, int(val), False))
+            elif st == "notequals":
+                predicates.append((column, int(val), True))
+            else:
+                raise ValueError(f"searchtype não suportado pelo stand-in: {st}")
+        if hi <= lo:
+            return []
+        idx = range(lo, hi)
+        for column, value, negate in predicates:
+            idx = [i for i in idx if (column[i] == value) != negate]
+        return list(idx)
+
+    def render(self, i: int, fields: List[int], raw_ids: bool, expand: bool) -> Dict[str, Any]:
+        row: Dict[str, Any] = {}
+        for f in fields:
+            key = str(f)
+            if f == F_ID:
+                row[key] = self.ids[i]
+            elif f == F_NAME:
+                row[key] = f"Chamado sintético {self.ids[i]}"
+            elif f == F_STATUS:
+                row[key] = self.status[i]
+            elif f == F_CREATED:
+                row[key] = _format_date(self.created[i])
+            elif f == F_ENTITY:
+                eid = self.entity[i]
+                row[key] = eid if raw_ids else self.entity_record(eid)["completename"]
+            elif f == F_CATEGORY:
+                cid = self.category[i]
+                row[key] = cid if raw_ids else self.category_record(cid)["completename"]
+            elif f == F_TECH:
+                tid = self.tech[i]
+                row[key] = (tid or None) if raw_ids else (self.user_record(tid)["name"] if tid else None)
+            elif f == F_REQUESTER:
+                uid = self.requester[i]
+                row[key] = uid if (raw_ids or not expand) else self.user_record(uid)["name"]
+        return row
+
+    def sort_key(self, field_id: int):
+        column = {F_ID: self.ids, F_CREATED: self.created, F_STATUS: self.status, F_ENTITY: self.entity,
+                  F_CATEGORY: self.category, F_TECH: self.tech}.get(field_id, self.ids)
+        return column.__getitem__
+
+
+@dataclass
+class StandinConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    per_row_us: float = 0.0
+    slow_page_rate: float = 0.0
+    slow_page_ms: float = 0.0
+    error_rate: float = 0.0
+    serialize_sessions: bool = True
+    session_ttl_sec: float = 0.0
+    app_token: Optional[str] = None
+    user_token: Optional[str] = None
+    record_upstream: Optional[str] = None
+    record_file: Optional[str] = None
+    replay_file: Optional[str] = None
+    seed: int = 42
+
+
+@dataclass
+class _Session:
+    token: str
+    created: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class StandinState:
+    """Estado compartilhado entre as threads do servidor."""
+
+    def __init__(self, dataset: Optional[SyntheticDataset], config: StandinConfig):
+        self.dataset = dataset
+        self.config = config
+        self.sessions: Dict[str, _Session] = {}
+        self.counters: Counter = Counter()
+        self.rows_served = 0
+        self.bytes_served = 0
+        self.lock = threading.Lock()
+        self.rnd = random.Random(config.seed)
+        self._selection_cache: "OrderedDict[Tuple, List[int]]" = OrderedDict()
+        self.replay: Dict[str, List[Dict[str, Any]]] = {}
+        self._replay_pos: Counter = Counter()
+        self._record_lock = threading.Lock()
+        # nome -> (holder, expira_em)
+        self.leases: Dict[str, Tuple[str, float]] = {}
+        if config.replay_file:
+            self._load_replay(config.replay_file)
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] += 1
+            self.counters["total"] += 1
+
+    def served(self, rows: int, nbytes: int) -> None:
+        with self.lock:
+            self.rows_served += rows
+            self.bytes_served += nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "requests": dict(self.counters),
+                "rows_served": self.rows_served,
+                "bytes_served": self.bytes_served,
+                "sessions": len(self.sessions),
+                "tickets": len(self.dataset) if self.dataset is not None else 0,
+            }
+
+    def lease(self, name: str, holder: str, ttl_sec: float) -> Dict[str, Any]:
+        """Concede/renova o lease se livre, expirado ou já do mesmo holder."""
+        now = time.time()
+        with self.lock:
+            current = self.leases.get(name)
+            if current is None or current[1] <= now or current[0] == holder:
+                current = self.leases[name] = (holder, now + ttl_sec)
+            return {"holder": current[0], "expires_in": round(current[1] - now, 3), "granted": current[0] == holder}
+
+    def release(self, name: str, holder: str) -> None:
+        with self.lock:
+            if self.leases.get(name, ("", 0.0))[0] == holder:
+                del self.leases[name]
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters.clear()
+            self.rows_served = 0
+            self.bytes_served = 0
+
+    def selection(self, criteria: List[Dict[str, str]]) -> List[int]:
+        key = tuple(tuple(sorted(c.items())) for c in criteria)
+        with self.lock:
+            hit = self._selection_cache.get(key)
+            if hit is not None:
+                self._selection_cache.move_to_end(key)
+                return hit
+        result = self.dataset.select(criteria)
+        with self.lock:
+            self._selection_cache[key] = result
+            while len(self._selection_cache) > 64:
+                self._selection_cache.popitem(last=False)
+        return result
+
+    def new_session(self) -> str:
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[token] = _Session(token, time.time())
+        return token
+
+    def get_session(self, token: Optional[str]) -> Optional[_Session]:
+        if not token:
+            return None
+        with self.lock:
+            sess = self.sessions.get(token)
+            if sess is None:
+                return None
+            ttl = self.config.session_ttl_sec
+            if ttl and (time.time() - sess.created) > ttl:
+                del self.sessions[token]
+                return None
+            return sess
+
+    def kill_session(self, token: Optional[str]) -> None:
+        with self.lock:
+            self.sessions.pop(token or "", None)
+
+    def injected_delay(self, rows: int = 0) -> float:
+        cfg = self.config
+        with self.lock:
+            jitter = self.rnd.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0
+            slow = cfg.slow_page_ms if (cfg.slow_page_rate and self.rnd.random() < cfg.slow_page_rate) else 0.0
+        return (cfg.latency_ms + jitter + slow) / 1000.0 + rows * cfg.per_row_us / 1_000_000.0
+
+    def should_fail(self) -> bool:
+        if not self.config.error_rate:
+            return False
+        with self.lock:
+            return self.rnd.random() < self.config.error_rate
+
+    # Gravação / replay
+    @staticmethod
+    def replay_key(method: str, path: str, query: List[Tuple[str, str]]) -> str:
+        clean = sorted((k, v) for k, v in query if "token" not in k.lower())
+        return f"{method} {path}?{urlencode(clean)}"
+
+    def _load_replay(self, path: str) -> None:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self.replay.setdefault(entry["key"], []).append(entry)
+        logger.info("Replay carregado: %d chaves de %s", len(self.replay), path)
+
+    def replay_lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entries = self.replay.get(key)
+        if not entries:
+            return None
+        with self.lock:
+            pos = self._replay_pos[key]
+            self._replay_pos[key] = pos + 1
+        # Repete a última resposta quando o tráfego atual tem mais chamadas que o gravado
+        return entries[min(pos, len(entries) - 1)]
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        if not self.config.record_file:
+            return
+        with self._record_lock:
+            with open(self.config.record_file, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "GLPI-standin/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StandinState:
+        return self.server.state  # type: ignore[attr-defined]
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        logger.debug("standin %s", fmt % args)
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> int:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def _error(self, status: int, code: str, message: str) -> None:
+        self._send_json(status, [code, message])
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        body = self._read_body() if method == "POST" else b""
+
+        if path == "/_standin/stats":
+            self._send_json(200, self.state.stats())
+            return
+        if path == "/_standin/reset":
+            self.state.reset()
+            self._send_json(200, {"reset": True})
+            return
+        if path.startswith("/_standin/lease/") and method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+                holder = str(payload["holder"])
+            except (ValueError, KeyError):
+                self._error(400, "ERROR_BAD_ARRAY", "Informe holder")
+                return
+            name = path[len("/_standin/lease/"):]
+            if name.endswith("/release"):
+                self.state.release(name[:-len("/release")], holder)
+                self._send_json(200, {"released": True})
+            else:
+                self._send_json(200, self.state.lease(name, holder, float(payload.get("ttl_sec", 30))))
+            return
+        if not path.startswith(API_PREFIX):
+            self._error(404, "ERROR_RESOURCE_NOT_FOUND_NOR_COMMONDBTM", "Rota desconhecida")
+            return
+        rel = path[len(API_PREFIX):] or "/"
+
+        cfg = self.state.config
+        if cfg.record_upstream:
+            self._proxy(method, rel, query, body)
+            return
+        if cfg.replay_file:
+            self._replay(method, rel, query)
+            return
+        self._serve(method, rel, query, body)
+
+    # Modo sintético
+    def _serve(self, method: str, rel: str, query: List[Tuple[str, str]], body: bytes) -> None:
+        state = self.state
+        cfg = state.config
+        if rel == "/initSession":
+            state.count("initSession")
+            if cfg.app_token and self.headers.get("App-Token") != cfg.app_token:
+                self._error(400, "ERROR_WRONG_APP_TOKEN_PARAMETER", "App-Token inválido")
+                return
+            auth = self.headers.get("Authorization", "")
+            if cfg.user_token and auth != f"user_token {cfg.user_token}":
+                self._error(401, "ERROR_GLPI_LOGIN_USER_TOKEN", "user_token inválido")
+                return
+            time.sleep(state.injected_delay())
+            self._send_json(200, {"session_token": state.new_session()})
+            return
+
+        session = state.get_session(self.headers.get("Session-Token"))
+        if session is None:
+            state.count("unauthorized")
+            self._error(401, "ERROR_SESSION_TOKEN_INVALID", "session_token inválido")
+            return
+
+        # Sessões PHP são travadas por requisição: chamadas concorrentes na mesma sessão enfileiram
+        lock = session.lock if cfg.serialize_sessions else None
+        if lock is not None:
+            lock.acquire()
+        try:
+            self._serve_authenticated(method, rel, query, session)
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def _serve_authenticated(self, method: str, rel: str, query: List[Tuple[str, str]], session: _Session) -> None:
+        state = self.state
+        if rel == "/killSession":
+            state.count("killSession")
+            state.kill_session(session.token)
+            self._send_json(200, [])
+            return
+        if rel == "/changeActiveEntities" and method == "POST":
+            state.count("changeActiveEntities")
+            time.sleep(state.injected_delay())
+            self._send_json(200, [])
+            return
+        if state.should_fail():
+            state.count("injected_error")
+            time.sleep(state.injected_delay())
+            self._error(503, "ERROR", "Falha injetada pelo stand-in")
+            return
+
+        m = re.fullmatch(r"/search/(\w+)", rel)
+        if m and method == "GET":
+            self._search(m.group(1), query)
+            return
+        m = re.fullmatch(r"/(User|Entity|ITILCategory)/(\d+)", rel)
+        if m and method == "GET":
+            itemtype, item_id = m.group(1), int(m.group(2))
+            state.count(f"item.{itemtype}")
+            time.sleep(state.injected_delay())
+            rec = state.dataset.record(itemtype, item_id)
+            if rec is None:
+                self._error(404, "ERROR_ITEM_NOT_FOUND", "Item não encontrado")
+                return
+            state.served(0, self._send_json(200, rec))
+            return
+        m = re.fullmatch(r"/(User|Entity|ITILCategory)/?", rel)
+        if m and method == "GET":
+            self._list(m.group(1), query)
+            return
+        state.count("not_found")
+        self._error(404, "ERROR_RESOURCE_NOT_FOUND_NOR_COMMONDBTM", f"Recurso desconhecido: {rel}")
+
+    @staticmethod
+    def _parse_range(raw: Optional[str], default_end: int) -> Tuple[int, int]:
+        if not raw:
+            return 0, default_end
+        a, _, b = raw.partition("-")
+        return max(0, int(a)), max(0, int(b or a))
+
+    def _list(self, itemtype: str, query: List[Tuple[str, str]]) -> None:
+        state = self.state
+        state.count(f"list.{itemtype}")
+        params = dict(query)
+        total = state.dataset.count(itemtype)
+        start, end = self._parse_range(params.get("range"), 49)
+        first = state.dataset.first_id(itemtype)
+        ids = range(first + start, min(first + end + 1, first + total))
+        rows = [state.dataset.record(itemtype, i) for i in ids]
+        time.sleep(state.injected_delay(len(rows)))
+        headers = {"Content-Range": f"{start}-{start + max(0, len(rows) - 1)}/{total}"}
+        status = 200 if len(rows) >= total else 206
+        state.served(len(rows), self._send_json(status, rows, headers))
+
+    def _search(self, itemtype: str, query: List[Tuple[str, str]]) -> None:
+        state = self.state
+        state.count(f"search.{itemtype}")
+        if itemtype != "Ticket":
+            self._error(400, "ERROR_ITEMTYPE_NOT_SUPPORTED", f"Itemtype não suportado: {itemtype}")
+            return
+        params = dict(query)
+        criteria_map: Dict[int, Dict[str, str]] = {}
+        forced: Dict[int, int] = {}
+        for k, v in query:
+            cm = re.fullmatch(r"criteria\[(\d+)\]\[(\w+)\]", k)
+            if cm:
+                criteria_map.setdefault(int(cm.group(1)), {})[cm.group(2)] = v
+                continue
+            fm = re.fullmatch(r"forcedisplay\[(\d+)\]", k)
+            if fm:
+                forced[int(fm.group(1))] = int(v)
+        criteria = [criteria_map[i] for i in sorted(criteria_map)]
+        fields = [F_ID] + [f for _, f in sorted(forced.items()) if f != F_ID]
+
+        try:
+            selected = state.selection(criteria)
+        except ValueError as e:
+            self._error(400, "ERROR_BAD_ARRAY", str(e))
+            return
+
+        sort_field = int(params.get("sort") or F_ID)
+        descending = (params.get("order") or "ASC").upper() == "DESC"
+        if sort_field in (F_ID, F_CREATED):
+            # ID e data crescem juntos com o índice: basta inverter a seleção
+            ordered = selected[::-1] if descending else selected
+        else:
+            ordered = sorted(selected, key=state.dataset.sort_key(sort_field), reverse=descending)
+
+        total = len(ordered)
+        start, end = self._parse_range(params.get("range"), 49)
+        page = ordered[start:end + 1]
+        raw_ids = params.get("display_type") == "2"
+        expand = params.get("expand_dropdowns") == "1"
+        data = [state.dataset.render(i, fields, raw_ids, expand) for i in page]
+        time.sleep(state.injected_delay(len(data)))
+        payload = {
+            "totalcount": total,
+            "count": len(data),
+            "sort": [sort_field],
+            "order": ["DESC" if descending else "ASC"],
+            "data": data,
+            "content-range": f"{start}-{start + max(0, len(data) - 1)}/{total}",
+        }
+        headers = {"Content-Range": payload["content-range"]}
+        status = 200 if (start == 0 and len(data) >= total) else 206
+        state.served(len(data), self._send_json(status, payload, headers))
+
+    # Gravação (proxy para GLPI real)
+    def _proxy(self, method: str, rel: str, query: List[Tuple[str, str]], body: bytes) -> None:
+        import requests
+
+        state = self.state
+        state.count("proxy")
+        url = state.config.record_upstream.rstrip("/") + rel
+        fwd_headers = {k: v for k, v in self.headers.items()
+                       if k.lower() in ("app-token", "session-token", "authorization", "content-type")}
+        try:
+            resp = requests.request(method, url, params=query, data=body or None, headers=fwd_headers, timeout=(5, 60))
+        except requests.exceptions.RequestException as e:
+            self._error(502, "ERROR_STANDIN_UPSTREAM", str(e))
+            return
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = resp.text
+        state.record({
+            "key": state.replay_key(method, rel, query),
+            "status": resp.status_code,
+            "content_range": resp.headers.get("Content-Range"),
+            "body": payload,
+        })
+        headers = {"Content-Range": resp.headers["Content-Range"]} if resp.headers.get("Content-Range") else None
+        self._send_json(resp.status_code, payload, headers)
+
+    def _replay(self, method: str, rel: str, query: List[Tuple[str, str]]) -> None:
+        state = self.state
+        key = state.replay_key(method, rel, query)
+        entry = state.replay_lookup(key)
+        if entry is None:
+            state.count("replay_miss")
+            self._error(404, "ERROR_STANDIN_REPLAY_MISS", f"Requisição não gravada: {key}")
+            return
+        state.count("replay_hit")
+        time.sleep(state.injected_delay())
+        headers = {"Content-Range": entry["content_range"]} if entry.get("content_range") else None
+        self._send_json(int(entry["status"]), entry["body"], headers)
+
+
+class StandinServer:
+    """Servidor stand-in controlável em processo (para benchmarks e testes)."""
+
+    def __init__(
+        self,
+        dataset: Optional[SyntheticDataset] = None,
+        config: Optional[StandinConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or StandinConfig()
+        needs_dataset = not (self.config.record_upstream or self.config.replay_file)
+        self.state = StandinState(dataset or (SyntheticDataset() if needs_dataset else None), self.config)
+        self.httpd = ThreadingHTTPServer((host, port), StandinHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url + API_PREFIX
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="glpi-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="GLPI REST stand-in com dados sintéticos e gravação/replay")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8089)
+    p.add_argument("--tickets", type=int, default=50_000)
+    p.add_argument("--entities", type=int, default=60)
+    p.add_argument("--categories", type=int, default=120)
+    p.add_argument("--technicians", type=int, default=80)
+    p.add_argument("--users", type=int, default=3_000)
+    p.add_argument("--start", default="2024-01-01", help="Data inicial do dataset (YYYY-MM-DD)")
+    p.add_argument("--end", default="2025-12-31", help="Data final do dataset (YYYY-MM-DD)")
+    p.add_argument("--skew", type=float, default=1.1, help="Expoente Zipf para entidades/categorias/técnicos")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--per-row-us", type=float, default=0.0, help="Latência adicional por linha devolvida")
+    p.add_argument("--slow-page-rate", type=float, default=0.0, help="Fração de respostas com atraso extra")
+    p.add_argument("--slow-page-ms", type=float, default=0.0)
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503 injetadas")
+    p.add_argument("--no-serialize-sessions", action="store_true", help="Permite concorrência na mesma sessão")
+    p.add_argument("--session-ttl-sec", type=float, default=0.0, help="Expira sessões após N segundos (0 = nunca)")
+    p.add_argument("--app-token", default=None, help="Exige este App-Token (opcional)")
+    p.add_argument("--user-token", default=None, help="Exige este user_token (opcional)")
+    p.add_argument("--record-upstream", default=None, help="URL do GLPI real (com /apirest.php) para gravar")
+    p.add_argument("--record-file", default="glpi_traffic.jsonl")
+    p.add_argument("--replay", dest="replay_file", default=None, help="Arquivo JSONL gravado para replay")
+    return p
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    return StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        per_row_us=args.per_row_us,
+        slow_page_rate=args.slow_page_rate,
+        slow_page_ms=args.slow_page_ms,
+        error_rate=args.error_rate,
+        serialize_sessions=not args.no_serialize_sessions,
+        session_ttl_sec=args.session_ttl_sec,
+        app_token=args.app_token,
+        user_token=args.user_token,
+        record_upstream=args.record_upstream,
+        record_file=args.record_file if args.record_upstream else None,
+        replay_file=args.replay_file,
+        seed=args.seed,
+    )
+
+
+def dataset_from_args(args: argparse.Namespace) -> SyntheticDataset:
+    return SyntheticDataset(
+        tickets=args.tickets,
+        entities=args.entities,
+        categories=args.categories,
+        technicians=args.technicians,
+        users=args.users,
+        start=args.start,
+        end=args.end,
+        skew=args.skew,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = build_arg_parser().parse_args(argv)
+    config = config_from_args(args)
+    dataset = None
+    if not (config.record_upstream or config.replay_file):
+        t0 = time.perf_counter()
+        dataset = dataset_from_args(args)
+        logger.info("Dataset sintético: %d tickets gerados em %.1fs", len(dataset), time.perf_counter() - t0)
+    server = StandinServer(dataset, config, host=args.host, port=args.port)
+    logger.info("GLPI stand-in ouvindo em %s", server.api_url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
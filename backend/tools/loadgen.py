@@ -0,0 +1,389 @@
+"""
+Gerador de carga que simula telas do dashboard fazendo polling.
+
+Cada cliente reproduz o comportamento do frontend:
+- a cada `--interval` segundos (15s no dashboard), dispara em paralelo
+  `stats-gerais`, `ranking-entidades`, `ranking-categorias` e `tickets-novos`
+  (`useDashboardData`) e, num laço próprio, `ranking-tecnicos`
+  (`useTechnicianRanking`); um ciclo não começa se o anterior não terminou;
+- os inícios são escalonados uniformemente dentro do intervalo;
+- a maioria das telas usa o mesmo período (`--shared-ratio`) e, a cada ciclo,
+  há chance `--adhoc-rate` de trocar para um período ad-hoc aleatório.
+
+Relatório: vazão, latência p50/p95/p99/máx por rota, erros, chamadas ao GLPI
+por requisição do cliente e saturação do threadpool e dos bulkheads (amostrada em `/debug/runtime`).
+
+Uso:
+    python -m backend.tools.loadgen --clients 20 --duration 120              # app + stand-in locais
+    python -m backend.tools.loadgen --target http://localhost:8000 --clients 10
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .bench_endpoints import AppServer, StandinProcess
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "/api/v1/manutencao"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.skipped_cycles = 0
+
+    def add(self, route: str, elapsed_ms: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[route].append(elapsed_ms)
+            if not ok:
+                self.errors[route] += 1
+
+    def skip(self) -> None:
+        with self.lock:
+            self.skipped_cycles += 1
+
+
+class RuntimeSampler(threading.Thread):
+    """Amostra `/debug/runtime` para medir saturação do threadpool e dos bulkheads."""
+
+    def __init__(self, base_url: str, every_sec: float = 0.5):
+        super().__init__(name="runtime-sampler", daemon=True)
+        self.base_url = base_url
+        self.every_sec = every_sec
+        self.samples: List[Dict[str, int]] = []
+        self.bulkhead_samples: List[Dict[str, Dict[str, int]]] = []
+        self.available = True
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop.wait(self.every_sec):
+            try:
+                resp = requests.get(f"{self.base_url}/debug/runtime", timeout=2)
+                if resp.status_code == 404:
+                    self.available = False
+                    return
+                body = resp.json()
+                self.samples.append(body["threadpool"])
+                if "bulkheads" in body:
+                    self.bulkhead_samples.append(body["bulkheads"])
+            except requests.exceptions.RequestException:
+                continue
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"available": self.available}
+        borrowed = [s["borrowed_tokens"] for s in self.samples]
+        waiting = [s["tasks_waiting"] for s in self.samples]
+        total = self.samples[-1]["total_tokens"]
+        saturated = sum(1 for s in self.samples if s["borrowed_tokens"] >= s["total_tokens"])
+        return {
+            "available": True,
+            "total_tokens": total,
+            "max_borrowed": max(borrowed),
+            "mean_borrowed": round(sum(borrowed) / len(borrowed), 1),
+            "max_waiting": max(waiting),
+            "saturated_pct": round(100.0 * saturated / len(self.samples), 1),
+            "bulkheads": self._bulkhead_summary(),
+        }
+
+    def _bulkhead_summary(self) -> Dict[str, Dict[str, int]]:
+        if not self.bulkhead_samples:
+            return {}
+        last = self.bulkhead_samples[-1]
+        return {
+            name: {
+                "workers": last[name]["workers"],
+                "max_active": max(s[name]["active"] for s in self.bulkhead_samples),
+                "max_waiting": max(s[name]["waiting"] for s in self.bulkhead_samples),
+                "rejected": last[name]["rejected"],
+            }
+            for name in last
+        }
+
+
+class ScreenClient(threading.Thread):
+    def __init__(
+        self,
+        idx: int,
+        base_url: str,
+        recorder: Recorder,
+        interval: float,
+        offset: float,
+        stop_at: float,
+        shared_range: Tuple[str, str],
+        shared: bool,
+        adhoc_rate: float,
+        window: Tuple[dt.date, dt.date],
+        seed: int,
+    ):
+        super().__init__(name=f"screen-{idx}", daemon=True)
+        self.base_url = base_url
+        self.recorder = recorder
+        self.interval = interval
+        self.offset = offset
+        self.stop_at = stop_at
+        self.shared_range = shared_range
+        self.range = shared_range if shared else self._random_range(random.Random(seed), window)
+        self.adhoc_rate = adhoc_rate
+        self.window = window
+        self.rnd = random.Random(seed)
+        self.session = requests.Session()
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.tech_pool = ThreadPoolExecutor(max_workers=1)
+        self.tech_future = None
+
+    @staticmethod
+    def _random_range(rnd: random.Random, window: Tuple[dt.date, dt.date]) -> Tuple[str, str]:
+        span_days = (window[1] - window[0]).days
+        length = rnd.choice((7, 14, 30, 90, 180, 365))
+        start = window[0] + dt.timedelta(days=rnd.randint(0, max(0, span_days - length)))
+        end = min(window[1], start + dt.timedelta(days=length))
+        return start.isoformat(), end.isoformat()
+
+    def _get(self, route: str, path: str) -> None:
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            resp = self.session.get(self.base_url + path, timeout=120)
+            ok = resp.status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        self.recorder.add(route, (time.perf_counter() - t0) * 1000, ok)
+
+    def _cycle(self) -> None:
+        inicio, fim = self.range
+        periodo = f"inicio={inicio}&fim={fim}"
+        calls = [
+            ("stats-gerais", f"{PREFIX}/stats-gerais?{periodo}"),
+            ("ranking-entidades", f"{PREFIX}/ranking-entidades?{periodo}"),
+            ("ranking-categorias", f"{PREFIX}/ranking-categorias?{periodo}"),
+            ("tickets-novos", f"{PREFIX}/tickets-novos?limit=8"),
+        ]
+        futures = [self.pool.submit(self._get, route, path) for route, path in calls]
+        if self.tech_future is None or self.tech_future.done():
+            self.tech_future = self.tech_pool.submit(
+                self._get, "ranking-tecnicos", f"{PREFIX}/ranking-tecnicos?{periodo}"
+            )
+        for fut in futures:
+            fut.result()
+
+    def run(self) -> None:
+        time.sleep(self.offset)
+        next_at = time.time()
+        while time.time() < self.stop_at:
+            if self.rnd.random() < self.adhoc_rate:
+                self.range = self._random_range(self.rnd, self.window)
+            started = time.time()
+            self._cycle()
+            next_at += self.interval
+            if time.time() > next_at:
+                # Ciclo mais longo que o intervalo: o frontend pula o tick seguinte
+                self.recorder.skip()
+                next_at = time.time() + self.interval
+            time.sleep(max(0.0, min(next_at, self.stop_at) - time.time()))
+            logger.debug("cliente %s ciclo %.1fs", self.name, time.time() - started)
+        if self.tech_future is not None:
+            self.tech_future.result()
+        self.pool.shutdown()
+        self.tech_pool.shutdown()
+
+
+def run_load(
+    base_url: str,
+    clients: int,
+    interval: float,
+    duration: float,
+    shared_ratio: float,
+    adhoc_rate: float,
+    shared_range: Tuple[str, str],
+    window: Tuple[dt.date, dt.date],
+    standin_url: Optional[str] = None,
+    seed: int = 7,
+) -> Dict[str, Any]:
+    recorder = Recorder()
+    sampler = RuntimeSampler(base_url)
+    sampler.start()
+    if standin_url:
+        requests.post(f"{standin_url}/_standin/reset", timeout=5)
+
+    t0 = time.time()
+    stop_at = t0 + duration
+    threads = []
+    rnd = random.Random(seed)
+    shared_count = int(round(clients * shared_ratio))
+    for i in range(clients):
+        th = ScreenClient(
+            idx=i,
+            base_url=base_url,
+            recorder=recorder,
+            interval=interval,
+            offset=interval * i / max(1, clients),
+            stop_at=stop_at,
+            shared_range=shared_range,
+            shared=i < shared_count,
+            adhoc_rate=adhoc_rate,
+            window=window,
+            seed=rnd.randint(0, 1 << 30),
+        )
+        th.start()
+        threads.append(th)
+    for th in threads:
+        th.join()
+    elapsed = time.time() - t0
+    sampler.stop()
+
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    all_lat = [x for v in recorder.latencies.values() for x in v]
+    report: Dict[str, Any] = {
+        "clients": clients,
+        "interval_sec": interval,
+        "duration_sec": round(elapsed, 1),
+        "requests": total_requests,
+        "throughput_rps": round(total_requests / elapsed, 2) if elapsed > 0 else 0.0,
+        "errors": sum(recorder.errors.values()),
+        "skipped_cycles": recorder.skipped_cycles,
+        "latency_ms": {
+            "p50": round(percentile(all_lat, 50), 1),
+            "p95": round(percentile(all_lat, 95), 1),
+            "p99": round(percentile(all_lat, 99), 1),
+            "max": round(max(all_lat), 1) if all_lat else 0.0,
+        },
+        "routes": {
+            route: {
+                "requests": len(lat),
+                "errors": recorder.errors.get(route, 0),
+                "p50": round(percentile(lat, 50), 1),
+                "p95": round(percentile(lat, 95), 1),
+                "p99": round(percentile(lat, 99), 1),
+                "max": round(max(lat), 1),
+            }
+            for route, lat in sorted(recorder.latencies.items())
+        },
+        "threadpool": sampler.summary(),
+    }
+    if standin_url:
+        upstream = requests.get(f"{standin_url}/_standin/stats", timeout=5).json()
+        up_total = upstream["requests"].get("total", 0)
+        report["upstream"] = {
+            "requests": up_total,
+            "per_client_request": round(up_total / total_requests, 2) if total_requests else 0.0,
+            "rows_served": upstream["rows_served"],
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    lat = report["latency_ms"]
+    print(f"clientes={report['clients']} intervalo={report['interval_sec']}s duração={report['duration_sec']}s")
+    print(f"requisições={report['requests']} vazão={report['throughput_rps']} req/s erros={report['errors']} "
+          f"ciclos_pulados={report['skipped_cycles']}")
+    print(f"latência ms: p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} máx={lat['max']}")
+    print(f"{'rota':<22} {'req':>6} {'erros':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:<22} {r['requests']:>6} {r['errors']:>6} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f}")
+    if "upstream" in report:
+        up = report["upstream"]
+        print(f"upstream: requisições={up['requests']} por_requisição_cliente={up['per_client_request']} "
+              f"linhas={up['rows_served']}")
+    tp = report["threadpool"]
+    if tp.get("available") and "total_tokens" in tp:
+        print(f"threadpool: tokens={tp['total_tokens']} máx_ocupados={tp['max_borrowed']} "
+              f"média_ocupados={tp['mean_borrowed']} máx_fila={tp['max_waiting']} saturado={tp['saturated_pct']}%")
+        for name, b in tp.get("bulkheads", {}).items():
+            print(f"bulkhead {name}: workers={b['workers']} máx_ativos={b['max_active']} "
+                  f"máx_fila={b['max_waiting']} recusadas={b['rejected']}")
+    else:
+        print("threadpool: indisponível (habilite DEBUG_ENDPOINTS=1 no alvo)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    p = argparse.ArgumentParser(description="Carga simulando telas do dashboard em polling")
+    p.add_argument("--target", default=None, help="URL do backend já em execução; omita para subir app + stand-in")
+    p.add_argument("--standin-url", default=None, help="URL base do stand-in (para contar chamadas upstream)")
+    p.add_argument("--clients", type=int, default=10)
+    p.add_argument("--interval", type=float, default=15.0)
+    p.add_argument("--duration", type=float, default=60.0)
+    p.add_argument("--shared-ratio", type=float, default=0.8, help="Fração de telas no período compartilhado")
+    p.add_argument("--adhoc-rate", type=float, default=0.02, help="Chance por ciclo de trocar para período ad-hoc")
+    p.add_argument("--inicio", default="2025-12-01")
+    p.add_argument("--fim", default="2025-12-31")
+    p.add_argument("--window-start", default="2024-01-01", help="Início da janela de períodos ad-hoc")
+    p.add_argument("--window-end", default="2025-12-31")
+    p.add_argument("--tickets", type=int, default=100_000, help="Tamanho do dataset do stand-in local")
+    p.add_argument("--latency-ms", type=float, default=5.0, help="Latência injetada no stand-in local")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = p.parse_args(argv)
+
+    logging.getLogger("backend").setLevel(logging.WARNING)
+    window = (dt.date.fromisoformat(args.window_start), dt.date.fromisoformat(args.window_end))
+
+    standin: Optional[StandinProcess] = None
+    app: Optional[AppServer] = None
+    base_url = args.target
+    standin_url = args.standin_url
+    try:
+        if base_url is None:
+            standin = StandinProcess(args.tickets, args.latency_ms)
+            standin_url = standin.base_url
+            os.environ["API_URL"] = standin.api_url
+            os.environ.setdefault("APP_TOKEN", "loadgen")
+            os.environ.setdefault("USER_TOKEN", "loadgen")
+            os.environ["DEBUG_ENDPOINTS"] = "1"
+            app = AppServer()
+            base_url = app.base_url
+        report = run_load(
+            base_url=base_url,
+            clients=args.clients,
+            interval=args.interval,
+            duration=args.duration,
+            shared_ratio=args.shared_ratio,
+            adhoc_rate=args.adhoc_rate,
+            shared_range=(args.inicio, args.fim),
+            window=window,
+            standin_url=standin_url,
+            seed=args.seed,
+        )
+    finally:
+        if app is not None:
+            app.stop()
+        if standin is not None:
+            standin.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Microbenchmarks do caminho quente de extração/contagem por página.
+
+Compara o processamento linha a linha (como era feito nos loops de ranking)
+com as versões em lote por página (`column_values` + `column_ids` /
+`tech_ids` / `id_keys` + um único `Counter.update`), e mede o custo de
+`sanitize_label`. Usa páginas sintéticas com os formatos que o GLPI devolve:
+inteiros (`display_type=2`), strings numéricas, listas e colunas mistas.
+
+Uso:
+    python -m backend.tools.microbench
+    python -m backend.tools.microbench --rows 1000 --pages 50 --repeat 7
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from ..logic.maintenance_ranking_logic import (
+    FIELD_ENTITY,
+    FIELD_TECH,
+    id_keys,
+    normalize_tech_key,
+    sanitize_label,
+    tech_ids,
+)
+from ..utils.convert import column_ids, column_values, first_numeric_id
+
+Page = List[Dict[str, Any]]
+
+
+def make_pages(kind: str, rows: int, pages: int, seed: int = 7) -> List[Page]:
+    """Gera páginas com a coluna de entidade e de técnico no formato `kind`."""
+    rng = random.Random(seed)
+
+    def value() -> Any:
+        n = rng.randint(0, 400)
+        if kind == "int":
+            return n
+        if kind == "str":
+            return str(n)
+        if kind == "list":
+            return [n, rng.randint(1, 400)]
+        # mixed: o que aparece quando o GLPI devolve rótulos em vez de IDs
+        return rng.choice([n, str(n), None, f"Entidade {n}", [n]])
+
+    return [
+        [{str(FIELD_ENTITY): value(), str(FIELD_TECH): value()} for _ in range(rows)]
+        for _ in range(pages)
+    ]
+
+
+def per_row_entity(pages: List[Page]) -> Counter:
+    counts: Counter = Counter()
+    for page in pages:
+        for row in page:
+            raw = row.get(str(FIELD_ENTITY)) or row.get('entities_id')
+            num = first_numeric_id(raw)
+            eid = str(num) if isinstance(num, int) else str(raw or '0')
+            counts.update([eid])
+    return counts
+
+
+def batch_entity(pages: List[Page]) -> Counter:
+    counts: Counter = Counter()
+    for page in pages:
+        counts.update(id_keys(column_values(page, str(FIELD_ENTITY), 'entities_id')))
+    return counts
+
+
+def per_row_tech(pages: List[Page]) -> Counter:
+    counts: Counter = Counter()
+    for page in pages:
+        for row in page:
+            raw = row.get(str(FIELD_TECH)) or row.get('users_id_assign')
+            num = first_numeric_id(raw)
+            key = str(num) if isinstance(num, int) and num > 0 else normalize_tech_key(raw)
+            counts.update([key])
+    return counts
+
+
+def batch_tech(pages: List[Page]) -> Counter:
+    counts: Counter = Counter()
+    for page in pages:
+        counts.update(tech_ids(column_values(page, str(FIELD_TECH), 'users_id_assign')))
+    return counts
+
+
+def per_row_ids(pages: List[Page]) -> int:
+    return sum(1 for page in pages for row in page if first_numeric_id(row.get(str(FIELD_ENTITY))) is not None)
+
+
+def batch_ids(pages: List[Page]) -> int:
+    return sum(len(page) - column_ids(column_values(page, str(FIELD_ENTITY))).count(None) for page in pages)
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def run(rows: int, pages: int, repeat: int) -> List[Tuple[str, str, float, float]]:
+    """Retorna (caso, formato, ns/linha linha-a-linha, ns/linha em lote)."""
+    cases = [
+        ("ids", per_row_ids, batch_ids),
+        ("entity_count", per_row_entity, batch_entity),
+        ("tech_count", per_row_tech, batch_tech),
+    ]
+    total = rows * pages
+    results = []
+    for kind in ("int", "str", "list", "mixed"):
+        data = make_pages(kind, rows, pages)
+        for name, slow, fast in cases:
+            t_slow = _best(lambda: slow(data), repeat)
+            t_fast = _best(lambda: fast(data), repeat)
+            results.append((name, kind, t_slow * 1e9 / total, t_fast * 1e9 / total))
+    return results
+
+
+def bench_sanitize(n: int, repeat: int) -> float:
+    labels = [f"Manutenção > Elétrica > Setor {i} <b>" for i in range(n)]
+    return _best(lambda: [sanitize_label(s) for s in labels], repeat) * 1e9 / n
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Microbenchmarks da extração por página")
+    p.add_argument("--rows", type=int, default=1000, help="Linhas por página (GLPI_RANGE_STEP_TICKETS)")
+    p.add_argument("--pages", type=int, default=20)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+
+    print(f"{'caso':<14} {'formato':<8} {'linha ns':>10} {'lote ns':>10} {'speedup':>8}")
+    for name, kind, slow, fast in run(args.rows, args.pages, args.repeat):
+        print(f"{name:<14} {kind:<8} {slow:>10.1f} {fast:>10.1f} {slow / fast:>7.2f}x")
+    print(f"sanitize_label: {bench_sanitize(args.rows, args.repeat):.1f} ns/rótulo")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+"""
+Bulkheads: pools isolados por classe de carga.
+
+Sem isso todas as rotas síncronas dividem o threadpool padrão do Starlette e
+varreduras longas (`ranking-*`, `top-atribuicao-*`) enfileiram na frente de
+rotas baratas. Cada classe tem vagas e fila próprias:
+
+- `heavy`: rotas que varrem tickets no GLPI (`BULKHEAD_HEAVY_*`);
+- `light`: rotas de consulta curta, como `tickets-novos` (`BULKHEAD_LIGHT_*`);
+- `names`: resolução de nomes de usuários (`GLPI_NAME_WORKERS`, `BULKHEAD_NAMES_QUEUE`),
+  um executor único compartilhado entre requisições em vez de um pool por chamada;
+- `completion`: conclusão em background de varreduras cortadas pelo prazo da
+  requisição (`BULKHEAD_COMPLETION_*`, ver `utils/deadline.py`);
+- `jobs`: jobs assíncronos de rankings/estatísticas (`JOBS_*`, ver `utils/jobs.py`);
+- `shards`: fatias de data de uma varredura longa, em paralelo (`SCAN_SHARD_*`,
+  ver `logic/sharding.py`).
+
+Rotas usam o decorador `@bulkhead('heavy', cache_key=...)`: a função continua
+síncrona e roda em thread sob um `CapacityLimiter` próprio da classe.
+
+Controle de admissão: com a fila da classe cheia, a requisição não entra na fila.
+Se houver valor em cache para `cache_key(**params)`, ele é servido na hora (mesmo
+expirado), com `Age` e `X-Cache: stale|hit`; sem valor, 503 com `Retry-After`
+estimado pela fila e pelo tempo médio de atendimento. Sobrecarga vira dado um
+pouco mais antigo, não timeouts (e nunca "vaza" para outra classe).
+
+Single-flight e cancelamento: requisições com a mesma chave de cache dividem um
+único cálculo (`utils/inflight.py`). Cada ouvinte escuta o `http.disconnect` do
+cliente enquanto espera; quando o último desiste, o orçamento do cálculo é cancelado
+e a paginação no GLPI para na próxima página (conclusões de fundo nunca são canceladas).
+
+Métricas: `bulkhead.queue_wait_ms`, `bulkhead.rejected`, `admission.shed`
+(tags `name`, `outcome`); ocupação em `GET /debug/runtime` (`bulkheads`).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse, Response
+
+from . import deadline, metrics
+from .cache import cache
+from .inflight import Flight, inflight
+from ..config import bulkhead_settings
+
+T = TypeVar("T")
+
+_REQUEST_PARAM = "_bulkhead_request"
+
+
+class BulkheadFullError(Exception):
+    """Fila do bulkhead cheia."""
+
+    def __init__(self, name: str):
+        super().__init__(f"bulkhead '{name}' cheio")
+        self.name = name
+
+
+class _Counters:
+    def __init__(self, name: str, workers: int, queue_limit: int):
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        # Média móvel (EWMA) do tempo de atendimento, para estimar o Retry-After
+        self.service_ms = 0.0
+        self._lock = threading.Lock()
+
+    def enter_queue(self) -> None:
+        with self._lock:
+            if self.waiting >= self.queue_limit:
+                self.rejected += 1
+                metrics.increment('bulkhead.rejected', tags={'name': self.name})
+                raise BulkheadFullError(self.name)
+            self.waiting += 1
+
+    def leave_queue(self, queued_at: float) -> None:
+        waited_ms = (time.perf_counter() - queued_at) * 1000
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+        if waited_ms >= 1.0:
+            metrics.record_timing('bulkhead.queue_wait_ms', waited_ms, tags={'name': self.name})
+
+    def abandon_queue(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+
+    def done(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+            self.service_ms = elapsed_ms if not self.service_ms else (0.8 * self.service_ms + 0.2 * elapsed_ms)
+
+    def retry_after_sec(self) -> int:
+        """Estimativa (1–60s) de quando a fila terá escoado o suficiente para admitir."""
+        with self._lock:
+            rounds = self.waiting / self.workers + 1
+            return min(60, max(1, math.ceil(rounds * self.service_ms / 1000.0)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_limit': self.queue_limit,
+                'active': self.active,
+                'waiting': self.waiting,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'service_ms': round(self.service_ms, 1),
+            }
+
+
+class RouteBulkhead(_Counters):
+    """Vagas de thread para rotas síncronas (usado por `@bulkhead`)."""
+
+    def __init__(self, name: str, workers: int, queue_limit: int):
+        super().__init__(name, workers, queue_limit)
+        self.limiter = anyio.CapacityLimiter(workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.enter_queue()
+        queued_at = time.perf_counter()
+        started = False
+
+        def _call() -> T:
+            nonlocal started
+            started = True
+            self.leave_queue(queued_at)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.done((time.perf_counter() - t0) * 1000)
+
+        try:
+            # to_thread.run_sync propaga os contextvars (trace da requisição)
+            return await anyio.to_thread.run_sync(_call, limiter=self.limiter)
+        finally:
+            if not started:
+                # Cancelada ainda na fila (cliente desconectou antes de ganhar vaga)
+                self.abandon_queue()
+
+
+class ExecutorBulkhead(_Counters):
+    """Executor compartilhado e limitado para fan-out dentro de uma requisição."""
+
+    def __init__(self, name: str, workers: int, queue_limit: int):
+        super().__init__(name, workers, queue_limit)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"bulkhead-{self.name}")
+            return self._executor
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Agenda `fn` no contexto atual; levanta `BulkheadFullError` com a fila cheia."""
+        self.enter_queue()
+        queued_at = time.perf_counter()
+        ctx = contextvars.copy_context()
+
+        def _call() -> T:
+            self.leave_queue(queued_at)
+            t0 = time.perf_counter()
+            try:
+                return ctx.run(fn, *args)
+            finally:
+                self.done((time.perf_counter() - t0) * 1000)
+
+        return self._pool().submit(_call)
+
+
+_settings = bulkhead_settings()
+bulkheads: Dict[str, RouteBulkhead] = {
+    'heavy': RouteBulkhead('heavy', *_settings['heavy']),
+    'light': RouteBulkhead('light', *_settings['light']),
+}
+name_bulkhead = ExecutorBulkhead('names', *_settings['names'])
+# Conclusão em background de varreduras interrompidas pelo prazo (`utils/deadline.py`)
+completion_bulkhead = ExecutorBulkhead('completion', *_settings['completion'])
+# Jobs assíncronos de períodos grandes (`utils/jobs.py`)
+job_bulkhead = ExecutorBulkhead('jobs', *_settings['jobs'])
+# Fatias de data varridas em paralelo (`logic/sharding.py`)
+shard_bulkhead = ExecutorBulkhead('shards', *_settings['shards'])
+
+
+def _shed(pool: RouteBulkhead, key: Optional[str]) -> JSONResponse:
+    """Resposta de sobrecarga: valor em cache (com idade) ou 503 com Retry-After."""
+    entry = cache.get_stale_with_age(key) if key is not None else None
+    if entry is None:
+        metrics.increment('admission.shed', tags={'name': pool.name, 'outcome': 'rejected'})
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente em instantes.",
+            headers={"Retry-After": str(pool.retry_after_sec())},
+        )
+    value, age, expired = entry
+    metrics.increment('admission.shed', tags={'name': pool.name, 'outcome': 'stale' if expired else 'hit'})
+    return JSONResponse(
+        content=jsonable_encoder(value),
+        headers={"Age": str(int(age)), "X-Cache": "stale" if expired else "hit"},
+    )
+
+
+async def _compute(flight: Flight, pool: RouteBulkhead, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> None:
+    """Executa o cálculo do voo (tarefa própria: não morre com a requisição que o criou)."""
+    try:
+        result = await pool.run(fn, **kwargs)
+    except BaseException as e:
+        inflight.finish(flight, error=e)
+        if not isinstance(e, Exception):
+            raise
+        return
+    inflight.finish(flight, result)
+    budget = flight.budget
+    if budget is not None and budget.truncated and not budget.cancelled:
+        # Prazo estourado: o parcial já foi entregue; termina o cálculo em background para o cache
+        deadline.complete_in_background(flight.key, fn, kwargs)
+
+
+def _consume(fut: "asyncio.Future[Any]") -> None:
+    # Marca a exceção como lida (evita "Future exception was never retrieved")
+    if not fut.cancelled():
+        fut.exception()
+
+
+async def _until_disconnect(request: Request) -> None:
+    # O corpo do GET chega na primeira mensagem; depois só resta o `http.disconnect`
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _wait_flight(flight: Flight, request: Request) -> bool:
+    """Aguarda o voo; False se o cliente desconectar antes (o ouvinte sai do voo)."""
+    fut = asyncio.wrap_future(flight.future)
+    # O resultado/erro é lido de `flight.future`; a cópia asyncio só serve para esperar
+    fut.add_done_callback(_consume)
+    listener = asyncio.ensure_future(_until_disconnect(request))
+    try:
+        await asyncio.wait({fut, listener}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        listener.cancel()
+        inflight.leave(flight)
+        raise
+    if fut.done():
+        listener.cancel()
+        return True
+    inflight.leave(flight)
+    metrics.increment('inflight.disconnected')
+    return False
+
+
+def bulkhead(name: str, cache_key: Optional[Callable[..., str]] = None) -> Callable[[Callable[..., T]], Callable[..., Any]]:
+    """
+    Decorador de rota: executa a função síncrona no bulkhead `name`.
+    `cache_key` recebe os parâmetros da rota e devolve a chave usada no cache,
+    servida quando a fila está cheia. Com `cache_key`, requisições idênticas
+    compartilham o cálculo (`utils/inflight.py`) e o cálculo é cancelado quando
+    todos os clientes desconectam.
+    """
+    pool = bulkheads[name]
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Request = kwargs.pop(_REQUEST_PARAM)
+            if cache_key is None:
+                try:
+                    return await pool.run(fn, *args, **kwargs)
+                except BulkheadFullError:
+                    return _shed(pool, None)
+
+            key = cache_key(**kwargs)
+            budget = deadline.current()
+            flight, owner = inflight.join_or_create(key, budget)
+            if owner:
+                asyncio.ensure_future(_compute(flight, pool, fn, kwargs))
+            if not await _wait_flight(flight, request):
+                return Response(status_code=499)
+            error = flight.future.exception()
+            if isinstance(error, BulkheadFullError):
+                return _shed(pool, key)
+            if error is not None:
+                raise error
+            if not owner and budget is not None and flight.budget is not None:
+                budget.adopt(flight.budget)
+            return flight.future.result()
+
+        # Usados pelos jobs (`utils/jobs.py`) para rodar o mesmo cálculo fora da requisição
+        wrapper.cache_key = cache_key
+        # FastAPI injeta o `Request` (usado para detectar desconexão) sem mudar a assinatura da rota
+        sig = inspect.signature(fn)
+        wrapper.__signature__ = sig.replace(parameters=[
+            *sig.parameters.values(),
+            inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+
+    return decorator
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    out = {name: b.stats() for name, b in bulkheads.items()}
+    out[name_bulkhead.name] = name_bulkhead.stats()
+    out[completion_bulkhead.name] = completion_bulkhead.stats()
+    out[job_bulkhead.name] = job_bulkhead.stats()
+    out[shard_bulkhead.name] = shard_bulkhead.stats()
+    return out
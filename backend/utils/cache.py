@@ -1,20 +1,72 @@
+"""
+Cache em memória com TTL e, opcionalmente, uma camada compartilhada em disco.
+
+Com `SHARED_CACHE_DIR`, cada `set` também grava a entrada (pickle, troca atômica)
+num arquivo por chave, e uma falta local (ou entrada local expirada) tenta o
+arquivo antes de desistir. Assim o que o líder (`utils/leader.py`) calcula nas
+atualizações agendadas vale para todos os workers/réplicas que montam o mesmo
+diretório, e um resultado calculado por um worker não é refeito pelos outros.
+"""
+import hashlib
+import logging
 import os
+import pickle
+import tempfile
 import time
 from typing import Any, Optional, Tuple
 
+from ..config import shared_cache_dir
+
+logger = logging.getLogger(__name__)
+
 # TTL padrão curto e configurável via variável de ambiente
 DEFAULT_TTL = int(os.environ.get("CACHE_TTL_SEC", "300"))  # 5 minutos por padrão
 
 
 class SimpleCache:
-    def __init__(self, default_ttl: int = DEFAULT_TTL):
+    def __init__(self, default_ttl: int = DEFAULT_TTL, shared_dir: Optional[str] = None):
         self._store: dict[str, Tuple[Any, float, int]] = {}
         self.default_ttl = default_ttl
+        self.shared_dir = shared_dir
         self.hits = 0
         self.misses = 0
+        self.shared_hits = 0
 
-    def get(self, key: str) -> Optional[Any]:
+    def _shared_path(self, key: str) -> str:
+        return os.path.join(self.shared_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def _entry(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """Entrada local; se faltar ou estiver expirada, tenta a camada compartilhada (mais nova vence)."""
         entry = self._store.get(key)
+        if self.shared_dir is None or (entry and (time.time() - entry[1]) < entry[2]):
+            return entry
+        try:
+            with open(self._shared_path(key), "rb") as f:
+                stored_key, value, ts, ttl = pickle.load(f)
+        except FileNotFoundError:
+            return entry
+        except Exception:
+            logger.warning("Entrada ilegível na camada compartilhada do cache: %s", key, exc_info=True)
+            return entry
+        if stored_key != key or (entry and entry[1] >= ts):
+            return entry
+        entry = self._store[key] = (value, ts, ttl)
+        self.shared_hits += 1
+        return entry
+
+    def _write_shared(self, key: str, entry: Tuple[Any, float, int]) -> None:
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.shared_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key,) + entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._shared_path(key))
+        except Exception:
+            # A camada compartilhada é best-effort: o valor continua no cache local
+            logger.warning("Falha ao gravar na camada compartilhada do cache: %s", key, exc_info=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entry(key)
         if not entry:
             self.misses += 1
             return None
@@ -30,20 +82,32 @@ class SimpleCache:
         """Retorna o valor mesmo expirado (stale), se existir.
         Não contabiliza hit, apenas permite fallback em caso de erro externo.
         """
-        entry = self._store.get(key)
+        entry = self._entry(key)
         if not entry:
             return None
         value, _, _ = entry
         return value
 
+    def get_stale_with_age(self, key: str) -> Optional[Tuple[Any, float, bool]]:
+        """Como `get_stale`, mas devolve (valor, idade em segundos, expirado)."""
+        entry = self._entry(key)
+        if not entry:
+            return None
+        value, ts, ttl = entry
+        age = time.time() - ts
+        return value, age, age >= ttl
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        self._store[key] = (value, time.time(), ttl or self.default_ttl)
+        entry = self._store[key] = (value, time.time(), ttl or self.default_ttl)
+        if self.shared_dir is not None:
+            self._write_shared(key, entry)
 
     def clear(self) -> None:
         self._store.clear()
         self.hits = 0
         self.misses = 0
+        self.shared_hits = 0
 
 
 # Instância global simples para uso nos roteadores
-cache = SimpleCache()
\ No newline at end of file
+cache = SimpleCache(shared_dir=shared_cache_dir())
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Circuit breaker para chamadas ao GLPI.
+
+Estados:
+- `closed`: chamadas passam; resultados entram numa janela deslizante de
+  `window_sec`. Com pelo menos `min_calls` na janela e taxa de falhas (erros,
+  5xx, timeouts e chamadas acima de `slow_ms`) >= `failure_rate`, abre.
+- `open`: chamadas falham imediatamente (sem esperar timeouts de conexão/leitura)
+  durante `open_sec`; os roteadores caem direto no cache/stale.
+- `half_open`: após `open_sec`, até `half_open_probes` chamadas de prova passam.
+  Se todas tiverem sucesso, fecha; qualquer falha reabre.
+
+`allow()` devolve um `Permit` (ou None se rejeitada) que volta em `record`/`release`:
+só as provas reservadas naquele `half_open` contam para fechar/reabrir; resultados
+de chamadas liberadas antes (no `closed` ou num `half_open` anterior) são ignorados.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class Permit(NamedTuple):
+    """Chamada liberada por `allow`: `probe` se reservou vaga de prova no `half_open` de número `epoch`."""
+    probe: bool
+    epoch: int
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window_sec: float = 30.0,
+        slow_ms: float = 8000.0,
+        open_sec: float = 15.0,
+        half_open_probes: int = 2,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_sec = window_sec
+        self.slow_ms = slow_ms
+        self.open_sec = open_sec
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes_inflight = 0
+        self._probes_ok = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("circuit.%s %s -> %s", self.name, self.state, state)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.time()
+        if state == HALF_OPEN:
+            self._epoch += 1
+        if state in (OPEN, HALF_OPEN):
+            self._probes_inflight = 0
+            self._probes_ok = 0
+        if state == CLOSED:
+            self._calls.clear()
+        metrics.increment('circuit.transition', tags={'name': self.name, 'to': state})
+        metrics.gauge('circuit.state', _STATE_GAUGE[state], tags={'name': self.name})
+
+    def _trim(self, now: float) -> None:
+        while self._calls and (now - self._calls[0][0]) > self.window_sec:
+            self._calls.popleft()
+
+    def allow(self) -> Optional[Permit]:
+        """Permit se a chamada pode seguir (None se rejeitada); em `half_open` reserva uma vaga de prova."""
+        with self._lock:
+            if self.state == OPEN:
+                if (time.time() - self._opened_at) < self.open_sec:
+                    return None
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes_inflight + self._probes_ok >= self.half_open_probes:
+                    return None
+                self._probes_inflight += 1
+                return Permit(True, self._epoch)
+            return Permit(False, self._epoch)
+
+    def _is_current_probe(self, permit: Permit) -> bool:
+        return permit.probe and self.state == HALF_OPEN and permit.epoch == self._epoch
+
+    def release(self, permit: Permit) -> None:
+        """Devolve a vaga reservada por `allow` sem resultado (chamada abortada antes de chegar ao GLPI)."""
+        with self._lock:
+            if self._is_current_probe(permit):
+                self._probes_inflight = max(0, self._probes_inflight - 1)
+
+    def record(self, permit: Permit, ok: bool, elapsed_ms: float = 0.0) -> None:
+        """Registra o resultado de uma chamada liberada por `allow` (com o `Permit` que ela devolveu)."""
+        failed = (not ok) or (self.slow_ms > 0 and elapsed_ms >= self.slow_ms)
+        now = time.time()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Só as provas deste half_open decidem; chamadas liberadas antes da abertura não contam
+                if not self._is_current_probe(permit):
+                    return
+                self._probes_inflight = max(0, self._probes_inflight - 1)
+                if failed:
+                    self._transition(OPEN)
+                    return
+                self._probes_ok += 1
+                if self._probes_ok >= self.half_open_probes:
+                    self._transition(CLOSED)
+                return
+            if self.state == OPEN or permit.probe:
+                return
+            self._calls.append((now, failed))
+            self._trim(now)
+            total = len(self._calls)
+            if total >= self.min_calls:
+                failures = sum(1 for _, f in self._calls if f)
+                if failures / total >= self.failure_rate:
+                    self._transition(OPEN)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._transition(CLOSED)
+
+    def retry_after_sec(self) -> float:
+        """Segundos até a próxima janela de prova (0 fora do estado `open`)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_sec - (time.time() - self._opened_at))
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            total = len(self._calls)
+            failures = sum(1 for _, f in self._calls if f)
+            return {
+                'state': self.state,
+                'calls': total,
+                'failure_rate': round(failures / total, 3) if total else 0.0,
+                'retry_after_sec': round(max(0.0, self.open_sec - (now - self._opened_at)), 1) if self.state == OPEN else 0.0,
+            }
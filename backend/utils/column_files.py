@@ -0,0 +1,100 @@
+"""
+Colunas de largura fixa em disco, mapeadas em memória (somente leitura).
+
+Layout de um diretório de snapshots:
+
+    <dir>/CURRENT                 nome da geração publicada
+    <dir>/gen-<ts>-<pid>/meta.json  typecodes, linhas e metadados livres
+    <dir>/gen-<ts>-<pid>/<col>.bin  bytes crus do `array` (ordem nativa)
+
+O escritor grava a geração inteira num diretório novo e só então publica
+trocando `CURRENT` via `os.replace` (rename atômico). Leitores abrem os
+arquivos com `mmap` e expõem cada coluna como `memoryview.cast(typecode)`:
+nenhuma cópia é feita e todos os processos compartilham o page cache do SO.
+
+Gerações antigas são removidas pelo escritor mantendo as duas mais recentes;
+um leitor que ainda tenha a anterior mapeada continua válido (o SO só libera
+as páginas quando o último mapeamento é fechado).
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import time
+from array import array
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+CURRENT = "CURRENT"
+_META = "meta.json"
+_KEEP_GENERATIONS = 2
+
+
+def write_generation(directory: str, columns: Dict[str, array], meta: Optional[Dict[str, Any]] = None) -> str:
+    """Grava as colunas numa nova geração, publica em `CURRENT` e devolve o nome."""
+    os.makedirs(directory, exist_ok=True)
+    name = f"gen-{time.time_ns()}-{os.getpid()}"
+    gen_dir = os.path.join(directory, name)
+    os.makedirs(gen_dir)
+    for col, values in columns.items():
+        with open(os.path.join(gen_dir, f"{col}.bin"), "wb") as fh:
+            values.tofile(fh)
+    info = {
+        "columns": {col: values.typecode for col, values in columns.items()},
+        "rows": len(next(iter(columns.values()))) if columns else 0,
+        "meta": meta or {},
+    }
+    with open(os.path.join(gen_dir, _META), "w", encoding="utf-8") as fh:
+        json.dump(info, fh)
+
+    tmp = os.path.join(directory, f"{CURRENT}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(name)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, os.path.join(directory, CURRENT))
+    _prune(directory, keep=name)
+    return name
+
+
+def _prune(directory: str, keep: str) -> None:
+    gens = sorted(d for d in os.listdir(directory) if d.startswith("gen-"))
+    for old in gens[:-_KEEP_GENERATIONS]:
+        if old != keep:
+            shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+
+def current_key(directory: str) -> Optional[Tuple[int, int]]:
+    """Identidade barata de `CURRENT` (inode, mtime) para detectar nova geração sem ler o arquivo."""
+    try:
+        st = os.stat(os.path.join(directory, CURRENT))
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def _map_column(path: str, typecode: str) -> Sequence[int]:
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            # mmap não aceita arquivos vazios
+            return array(typecode)
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(typecode)
+
+
+def open_current(directory: str) -> Optional[Tuple[str, Dict[str, Sequence[int]], Dict[str, Any]]]:
+    """Mapeia a geração publicada: (nome, colunas, meta) ou None se não houver."""
+    try:
+        with open(os.path.join(directory, CURRENT), encoding="utf-8") as fh:
+            name = fh.read().strip()
+        gen_dir = os.path.join(directory, name)
+        with open(os.path.join(gen_dir, _META), encoding="utf-8") as fh:
+            info = json.load(fh)
+        columns = {
+            col: _map_column(os.path.join(gen_dir, f"{col}.bin"), typecode)
+            for col, typecode in info["columns"].items()
+        }
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    return name, columns, info.get("meta", {})
@@ -4,7 +4,7 @@ Helpers de conversão e extração numérica comuns ao backend.
 Objetivo: evitar duplicação de lógica como `safe_int` e
 `get_first_numeric_id` entre diferentes módulos de lógica.
 """
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 
 def to_int_zero(value: Any) -> int:
@@ -34,4 +34,35 @@ def first_numeric_id(value: Any) -> Optional[int]:
                 return int(v_str)
         return None
     v_str = str(value)
-    return int(v_str) if v_str.isdigit() else None
\ No newline at end of file
+    return int(v_str) if v_str.isdigit() else None
+
+
+def column_values(rows: Sequence[Dict[str, Any]], key: str, alt_key: Optional[str] = None) -> List[Any]:
+    """
+    Extrai a coluna `key` de uma página de linhas.
+    Com `alt_key`, usa o valor alternativo quando o principal é vazio
+    (mesma semântica de `row.get(key) or row.get(alt_key)`).
+    """
+    if alt_key is None:
+        return [r.get(key) for r in rows]
+    return [r.get(key) or r.get(alt_key) for r in rows]
+
+
+def column_ids(values: Sequence[Any]) -> List[Optional[int]]:
+    """
+    Versão em lote de `first_numeric_id` para uma coluna inteira de uma página.
+
+    Páginas homogêneas (só `int`, só `str` ou só `None`, caso comum com
+    `display_type=2`) são convertidas sem chamada de função por linha;
+    páginas mistas caem no caminho linha a linha.
+    """
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        return [v if v >= 0 else None for v in values]
+    if kinds == {str}:
+        return [int(v) if v.isdigit() else None for v in values]
+    if kinds == {type(None)}:
+        return [None] * len(values)
+    if kinds == {int, type(None)}:
+        return [v if (v is not None and v >= 0) else None for v in values]
+    return [first_numeric_id(v) for v in values]
@@ -0,0 +1,140 @@
+"""
+Orçamento de tempo (deadline) por requisição e resultados parciais.
+
+- O middleware de `main.py` abre um `RequestBudget` por requisição das rotas do
+  dashboard, com o prazo do header `X-Deadline-Ms` (ou `REQUEST_DEADLINE_MS`;
+  0 = sem prazo). Ele é propagado via `contextvars`, como a trace, até as
+  threads dos bulkheads e a paginação do GLPI.
+- `glpi_client.search_paginated_pages` consulta o orçamento antes de cada página
+  (exceto a primeira, que traz o `totalcount`): com o prazo estourado, a varredura
+  para e a agregação devolve o que já foi contado.
+- A resposta sai com `X-Partial: true` e `X-Coverage` (linhas lidas / total).
+  Resultados parciais não vão para o cache; `complete_in_background` refaz o
+  cálculo sem prazo, como tráfego de fundo, e grava o resultado completo.
+  Uma única conclusão em andamento por chave de cache (registrada em `utils/inflight.py`).
+- `cancel()` encerra o orçamento na hora (cliente desconectou): a varredura para
+  como num prazo estourado, mas o parcial não é concluído em background.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    def __init__(self, budget_sec: Optional[float]):
+        self.deadline = (time.monotonic() + budget_sec) if budget_sec else None
+        self.rows_fetched = 0
+        self.rows_total = 0
+        self.pages_fetched = 0
+        self.truncated = False
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def remaining_sec(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.cancelled or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def add_scan(self, total_rows: int) -> None:
+        with self._lock:
+            self.rows_total += total_rows
+
+    def add_rows(self, rows: int) -> None:
+        with self._lock:
+            self.rows_fetched += rows
+            self.pages_fetched += 1
+
+    def truncate(self) -> None:
+        self.truncated = True
+
+    def adopt(self, other: "RequestBudget") -> None:
+        """Copia a cobertura de um cálculo compartilhado (single-flight) para esta requisição."""
+        with self._lock:
+            self.rows_fetched = other.rows_fetched
+            self.rows_total = other.rows_total
+            self.pages_fetched = other.pages_fetched
+            self.truncated = other.truncated
+
+    def coverage(self) -> float:
+        with self._lock:
+            if not self.rows_total:
+                return 1.0 if not self.truncated else 0.0
+            return min(1.0, self.rows_fetched / self.rows_total)
+
+    def progress(self) -> Dict[str, Any]:
+        """Páginas/linhas lidas até agora (usado pelos jobs)."""
+        with self._lock:
+            return {
+                'pages': self.pages_fetched,
+                'rows': self.rows_fetched,
+                'rows_total': self.rows_total,
+            }
+
+
+_current: contextvars.ContextVar[Optional[RequestBudget]] = contextvars.ContextVar("request_budget", default=None)
+
+
+def start(budget_sec: Optional[float]) -> RequestBudget:
+    """Abre o orçamento da requisição atual (`None`/0 = sem prazo, só mede cobertura)."""
+    budget = RequestBudget(budget_sec)
+    _current.set(budget)
+    return budget
+
+
+def current() -> Optional[RequestBudget]:
+    return _current.get()
+
+
+def is_partial() -> bool:
+    """True se a requisição atual teve alguma varredura interrompida pelo prazo."""
+    budget = _current.get()
+    return budget is not None and budget.truncated
+
+
+def complete_in_background(key: str, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> bool:
+    """
+    Agenda `fn(**kwargs)` sem prazo para preencher o cache de `key`.
+    Roda num contexto vazio (sem trace/orçamento da requisição) como tráfego de fundo.
+    Devolve False se já houver um cálculo em andamento para a chave ou a fila estiver cheia.
+    """
+    from .bulkhead import BulkheadFullError, completion_bulkhead
+    from .governor import BACKGROUND, traffic_class
+    from .inflight import inflight
+
+    flight = inflight.create_background(key)
+    if flight is None:
+        return False
+
+    def _run() -> None:
+        t0 = time.perf_counter()
+        try:
+            with traffic_class(BACKGROUND):
+                result = fn(**kwargs)
+        except Exception as e:
+            logger.exception("Falha ao concluir em background: %s", key)
+            inflight.finish(flight, error=e)
+            return
+        metrics.record_timing('deadline.completion_ms', (time.perf_counter() - t0) * 1000)
+        inflight.finish(flight, result)
+
+    try:
+        completion_bulkhead.submit(contextvars.Context().run, _run)
+    except BulkheadFullError:
+        inflight.finish(flight, error=BulkheadFullError(completion_bulkhead.name))
+        return False
+    metrics.increment('deadline.completion_scheduled')
+    return True
@@ -0,0 +1,133 @@
+"""
+Estatísticas móveis de latência/payload das buscas no GLPI, por formato de consulta.
+
+O "formato" (shape) é o itemtype + parâmetros da busca sem `range` e sem os
+valores dos critérios: `stats-gerais` de janeiro e de março caem no mesmo
+shape, uma busca com outros campos/critérios não.
+
+Com `GLPI_ADAPTIVE=1`, a paginação usa estes números para:
+- timeout de leitura: `p99 * GLPI_ADAPTIVE_TIMEOUT_K`, limitado entre
+  `GLPI_ADAPTIVE_TIMEOUT_MIN_MS` e o timeout configurado (nunca maior que ele);
+- tamanho de página: cresce (x1.25) enquanto o p95 por página fica abaixo de
+  metade de `GLPI_ADAPTIVE_PAGE_BUDGET_MS` e encolhe (x0.7) quando passa do
+  orçamento, entre `GLPI_ADAPTIVE_STEP_MIN` e `GLPI_ADAPTIVE_STEP_MAX`.
+  Páginas maiores rendem mais linhas/s (o custo fixo por requisição é diluído),
+  então o passo fica no maior valor que cabe no orçamento; com o GLPI sob
+  carga as páginas ficam lentas e o passo recua sozinho.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..config import (
+    adaptive_timeout_k,
+    adaptive_timeout_min_ms,
+    adaptive_page_budget_ms,
+    adaptive_step_bounds,
+)
+
+_SAMPLES = 200
+_MIN_SAMPLES = 20
+_GROW = 1.25
+_SHRINK = 0.7
+
+
+def query_shape(itemtype: str, params: Dict[str, Any]) -> str:
+    parts = [
+        f"{k}={v}" for k, v in sorted(params.items())
+        if k != 'range' and not k.endswith('[value]')
+    ]
+    return f"{itemtype}?" + "&".join(parts)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class ShapeStats:
+    def __init__(self):
+        # (elapsed_ms, rows, bytes)
+        self.samples: Deque[Tuple[float, int, int]] = deque(maxlen=_SAMPLES)
+        self.step: Optional[int] = None
+
+    def latency(self, q: float) -> Optional[float]:
+        if len(self.samples) < _MIN_SAMPLES:
+            return None
+        return _percentile([s[0] for s in self.samples], q)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = [s[0] for s in self.samples]
+        rows = sum(s[1] for s in self.samples)
+        total_ms = sum(elapsed)
+        return {
+            'samples': len(self.samples),
+            'p50_ms': round(_percentile(elapsed, 0.5), 1) if elapsed else None,
+            'p95_ms': round(_percentile(elapsed, 0.95), 1) if elapsed else None,
+            'p99_ms': round(_percentile(elapsed, 0.99), 1) if elapsed else None,
+            'rows_per_sec': round(rows * 1000 / total_ms, 1) if total_ms else None,
+            'avg_bytes': round(sum(s[2] for s in self.samples) / len(self.samples)) if self.samples else None,
+            'step': self.step,
+        }
+
+
+class LatencyTracker:
+    def __init__(self):
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, shape: str) -> ShapeStats:
+        st = self._shapes.get(shape)
+        if st is None:
+            st = self._shapes[shape] = ShapeStats()
+        return st
+
+    def record(self, shape: str, elapsed_ms: float, rows: int, nbytes: int) -> None:
+        with self._lock:
+            self._get(shape).samples.append((elapsed_ms, rows, nbytes))
+
+    def latency(self, shape: str, q: float) -> Optional[float]:
+        """Percentil `q` da latência por página do shape (None com poucas amostras)."""
+        with self._lock:
+            st = self._shapes.get(shape)
+            return st.latency(q) if st is not None else None
+
+    def read_timeout(self, shape: str, ceiling_sec: float) -> float:
+        p99 = self.latency(shape, 0.99)
+        if p99 is None:
+            return ceiling_sec
+        adaptive = max(adaptive_timeout_min_ms(), p99 * adaptive_timeout_k()) / 1000.0
+        return min(ceiling_sec, adaptive)
+
+    def page_size(self, shape: str, default: int) -> int:
+        lo, hi = adaptive_step_bounds()
+        budget = adaptive_page_budget_ms()
+        with self._lock:
+            st = self._get(shape)
+            step = st.step or min(hi, max(lo, default))
+            p95 = st.latency(0.95)
+            if p95 is not None:
+                if p95 > budget:
+                    step = int(step * _SHRINK)
+                elif p95 < budget / 2:
+                    step = int(step * _GROW)
+                step = min(hi, max(lo, step))
+                if step != st.step:
+                    # Amostras antigas refletem outro passo; recomeça a observação
+                    st.samples.clear()
+            st.step = step
+            return step
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {shape: st.summary() for shape, st in self._shapes.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+latency_tracker = LatencyTracker()
@@ -0,0 +1,155 @@
+"""
+Governador de concorrência e taxa para chamadas ao GLPI (por processo).
+
+Toda requisição HTTP ao GLPI passa por `governor.slot()` (em `glpi_client`):
+- semáforo de chamadas em andamento (`GLPI_MAX_INFLIGHT`);
+- token bucket de requisições por segundo (`GLPI_MAX_RPS`, 0 = sem limite).
+
+O orçamento é dividido entre duas classes de tráfego, escolhidas por
+contextvar (`traffic_class(...)`): `interactive` (requisições de usuário, padrão)
+e `background` (snapshot, renovação de sessões, jobs). A classe background fica
+com `GLPI_BACKGROUND_SHARE` do orçamento e nunca disputa a fatia interativa.
+
+Quem não consegue vaga em `GLPI_GOVERNOR_MAX_WAIT_MS` recebe `GLPINetworkError`
+(timeout). O tempo de fila vai para a métrica `glpi.queue_wait_ms` e para
+`stats()` (exposto em `/debug/runtime`).
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from . import metrics
+from ..config import governor_settings
+from ..logic.errors import GLPINetworkError
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_traffic_class: contextvars.ContextVar[str] = contextvars.ContextVar("glpi_traffic_class", default=INTERACTIVE)
+
+
+@contextmanager
+def traffic_class(name: str) -> Iterator[None]:
+    """Marca as chamadas GLPI feitas dentro do bloco com a classe de tráfego `name`."""
+    token = _traffic_class.set(name)
+    try:
+        yield
+    finally:
+        _traffic_class.reset(token)
+
+
+def current_class() -> str:
+    return _traffic_class.get()
+
+
+class TokenBucket:
+    """Token bucket simples; `rate <= 0` desativa o limite."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._ts) * self.rate)
+                self._ts = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Budget:
+    def __init__(self, max_inflight: int, rate: float):
+        self.max_inflight = max_inflight
+        self.semaphore = threading.BoundedSemaphore(max_inflight)
+        self.bucket = TokenBucket(rate)
+        self.inflight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class Governor:
+    def __init__(self):
+        cfg = governor_settings()
+        total, rps, share = cfg['max_inflight'], cfg['max_rps'], cfg['background_share']
+        # Background em [1, total-1] e interativo com o resto: a soma nunca passa de GLPI_MAX_INFLIGHT
+        background = min(max(1, round(total * share)), max(1, total - 1))
+        interactive = max(1, total - background)
+        self.max_wait_sec = cfg['max_wait_ms'] / 1000.0
+        self._budgets: Dict[str, _Budget] = {
+            INTERACTIVE: _Budget(interactive, rps * (1 - share)),
+            BACKGROUND: _Budget(background, rps * share),
+        }
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Aguarda vaga (semáforo + token) na classe de tráfego atual."""
+        cls = current_class()
+        budget = self._budgets.get(cls, self._budgets[INTERACTIVE])
+        t0 = time.monotonic()
+        deadline = t0 + self.max_wait_sec
+        with self._lock:
+            budget.waiting += 1
+        acquired = budget.semaphore.acquire(timeout=self.max_wait_sec)
+        if acquired and not budget.bucket.acquire(deadline):
+            budget.semaphore.release()
+            acquired = False
+        waited_ms = (time.monotonic() - t0) * 1000
+        with self._lock:
+            budget.waiting -= 1
+            if not acquired:
+                budget.rejected += 1
+            else:
+                budget.inflight += 1
+                budget.calls += 1
+                budget.wait_ms_total += waited_ms
+                budget.wait_ms_max = max(budget.wait_ms_max, waited_ms)
+        if not acquired:
+            metrics.increment('glpi.governor_rejected', tags={'class': cls})
+            raise GLPINetworkError("Fila de chamadas ao GLPI excedeu o tempo máximo", timeout=True)
+        if waited_ms >= 1.0:
+            metrics.record_timing('glpi.queue_wait_ms', waited_ms, tags={'class': cls})
+        try:
+            yield
+        finally:
+            with self._lock:
+                budget.inflight -= 1
+            budget.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                cls: {
+                    'max_inflight': b.max_inflight,
+                    'max_rps': b.bucket.rate if b.bucket.rate > 0 else None,
+                    'inflight': b.inflight,
+                    'waiting': b.waiting,
+                    'calls': b.calls,
+                    'rejected': b.rejected,
+                    'wait_ms_avg': round(b.wait_ms_total / b.calls, 2) if b.calls else 0.0,
+                    'wait_ms_max': round(b.wait_ms_max, 2),
+                }
+                for cls, b in self._budgets.items()
+            }
+
+
+governor = Governor()
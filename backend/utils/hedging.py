@@ -0,0 +1,154 @@
+"""
+Requisições "hedged" para páginas lentas.
+
+A chamada principal roda na própria thread do chamador (sem fila nem teto de
+concorrência próprios). Se ela não responder em `delay_sec` (p95 observado do
+formato de consulta, contado a partir do início da chamada), uma thread de
+agendamento dispara uma duplicata no pool `GLPI_HEDGE_WORKERS`. A duplicata sai
+pelo pool de sessões, que entrega a sessão menos ocupada (a principal está
+ocupando a sua), então normalmente usa outra sessão.
+
+Como a chamada principal (`requests`) não pode ser abortada, o chamador fica
+com ela quando ela responde; se ela falhar (ex.: timeout de leitura numa página
+presa) com a duplicata já a caminho, o chamador espera a duplicata em vez de
+propagar o erro.
+
+`HedgeBudget` limita as duplicatas a uma fração das requisições recentes
+(`GLPI_HEDGE_MAX_RATIO`), para que o hedging nunca dobre a carga no GLPI.
+A chamada perdedora não é cancelada, apenas descartada.
+"""
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, Tuple, TypeVar
+
+from . import metrics
+from ..config import hedge_max_ratio, hedge_workers
+
+T = TypeVar("T")
+
+_WINDOW_SEC = 60.0
+
+
+class HedgeBudget:
+    """Janela deslizante de requisições e duplicatas; duplicatas <= ratio * requisições."""
+
+    def __init__(self, window_sec: float = _WINDOW_SEC):
+        self.window_sec = window_sec
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        for q in (self._requests, self._hedges):
+            while q and (now - q[0]) > self.window_sec:
+                q.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._requests.append(time.time())
+
+    def try_acquire(self) -> bool:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            if len(self._hedges) + 1 > hedge_max_ratio() * len(self._requests):
+                return False
+            self._hedges.append(now)
+            return True
+
+
+hedge_budget = HedgeBudget()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=hedge_workers(), thread_name_prefix="glpi-hedge")
+        return _executor
+
+
+class _Scheduler:
+    """Uma thread daemon que executa callbacks curtos após um atraso (sem uma thread por chamada)."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay_sec: float, fn: Callable[[], None]) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay_sec, next(self._seq), fn))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="glpi-hedge-timer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(None if not self._heap else self._heap[0][0] - time.monotonic())
+                _, _, fn = heapq.heappop(self._heap)
+            try:
+                fn()
+            except Exception:
+                pass
+
+
+_scheduler = _Scheduler()
+
+
+class _Race:
+    """Estado de uma chamada hedged: a principal terminou? a duplicata saiu?"""
+
+    __slots__ = ('lock', 'finished', 'secondary')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.finished = False
+        self.secondary: Optional[Future] = None
+
+
+def hedged_call(fn: Callable[[], T], delay_sec: float) -> T:
+    """Executa `fn` nesta thread; passado `delay_sec` e havendo orçamento, dispara uma duplicata."""
+    hedge_budget.record_request()
+    race = _Race()
+    # A duplicata roda numa cópia do contexto do chamador (mantém a trace da requisição)
+    ctx = contextvars.copy_context()
+
+    def _launch() -> None:
+        with race.lock:
+            if race.finished:
+                return
+            if not hedge_budget.try_acquire():
+                metrics.increment('glpi.hedge', tags={'outcome': 'budget_exhausted'})
+                return
+            metrics.increment('glpi.hedge', tags={'outcome': 'sent'})
+            race.secondary = _pool().submit(ctx.run, fn)
+
+    _scheduler.call_later(delay_sec, _launch)
+    try:
+        result = fn()
+    except BaseException:
+        with race.lock:
+            race.finished = True
+            secondary = race.secondary
+        # Sem duplicata, ou ela também falhou: vale o erro da principal
+        if secondary is None or secondary.exception() is not None:
+            raise
+        metrics.increment('glpi.hedge', tags={'outcome': 'won'})
+        return secondary.result()
+    with race.lock:
+        race.finished = True
+    return result
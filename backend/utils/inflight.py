@@ -0,0 +1,88 @@
+"""
+Registro de cálculos em andamento por chave de cache (single-flight).
+
+Requisições idênticas simultâneas (mesma chave de cache) compartilham um único
+cálculo: a primeira cria o `Flight`, as demais entram como ouvintes e recebem o
+mesmo resultado. A conclusão em background (`utils/deadline.py`) também registra
+seu cálculo aqui, como voo de fundo, e requisições que chegam nesse meio tempo
+aguardam por ele em vez de abrir outra varredura.
+
+Cada voo conta seus ouvintes. Quando o último cliente desconecta (`leave`), o
+orçamento do cálculo é cancelado e a paginação para na próxima página — a não
+ser que o voo seja de fundo (alguém ainda precisa do resultado para o cache).
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+from . import metrics
+from .deadline import RequestBudget
+
+
+class Flight:
+    def __init__(self, key: str, budget: Optional[RequestBudget], background: bool):
+        self.key = key
+        self.budget = budget
+        self.background = background
+        self.waiters = 0 if background else 1
+        self.future: "Future[Any]" = Future()
+
+
+class InflightRegistry:
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    def join_or_create(self, key: str, budget: Optional[RequestBudget]) -> Tuple[Flight, bool]:
+        """(voo, dono): entra no voo existente da chave ou cria um novo (dono = True)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                metrics.increment('inflight.joined')
+                return flight, False
+            flight = self._flights[key] = Flight(key, budget, background=False)
+            return flight, True
+
+    def get(self, key: str) -> Optional[Flight]:
+        with self._lock:
+            return self._flights.get(key)
+
+    def create_background(self, key: str) -> Optional[Flight]:
+        """Voo de fundo para `key`; None se já houver um cálculo em andamento para a chave."""
+        with self._lock:
+            if key in self._flights:
+                return None
+            flight = self._flights[key] = Flight(key, None, background=True)
+            return flight
+
+    def leave(self, flight: Flight) -> None:
+        """Ouvinte desistiu (cliente desconectou); cancela o cálculo se ninguém mais precisa dele."""
+        with self._lock:
+            flight.waiters -= 1
+            orphaned = flight.waiters <= 0 and not flight.background and not flight.future.done()
+        if orphaned and flight.budget is not None:
+            flight.budget.cancel()
+            metrics.increment('inflight.cancelled')
+
+    def finish(self, flight: Flight, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'flights': len(self._flights),
+                'background': sum(1 for f in self._flights.values() if f.background),
+                'waiters': sum(f.waiters for f in self._flights.values()),
+            }
+
+
+inflight = InflightRegistry()
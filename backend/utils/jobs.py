@@ -0,0 +1,166 @@
+"""
+Jobs assíncronos para consultas caras (períodos grandes, "todo o período").
+
+`job_store.submit(tipo, fn, key, params)` devolve um `Job` na hora; o cálculo roda
+no bulkhead `jobs` (`JOBS_WORKERS`/`JOBS_QUEUE`) como tráfego de fundo do
+governador. `fn` é a própria função síncrona da rota: ela consulta e grava o
+cache com a chave normal, então chamadas síncronas posteriores já saem quentes.
+
+- Um job por chave de cache em andamento: um novo `POST` igual devolve o mesmo job.
+- Se já houver um cálculo da mesma chave em andamento (requisição ou conclusão em
+  background, `utils/inflight.py`), o job aguarda por ele e reaproveita o cache.
+- Progresso (páginas e linhas lidas / total) vem do `RequestBudget` do cálculo.
+- Jobs concluídos ficam consultáveis por `JOBS_TTL_SEC`.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from . import deadline, metrics
+from .bulkhead import job_bulkhead
+from .cache import cache
+from .governor import BACKGROUND, traffic_class
+from .inflight import inflight
+from ..config import jobs_ttl_sec
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, tipo: str, key: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:16]
+        self.tipo = tipo
+        self.key = key
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.budget: Optional[deadline.RequestBudget] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def progress(self) -> Dict[str, Any]:
+        budget = self.budget
+        data = budget.progress() if budget is not None else {'pages': 0, 'rows': 0, 'rows_total': 0}
+        if self.status == DONE:
+            data['coverage'] = 1.0
+        elif data['rows_total']:
+            data['coverage'] = round(min(1.0, data['rows'] / data['rows_total']), 3)
+        else:
+            data['coverage'] = None
+        return data
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'id': self.id,
+            'tipo': self.tipo,
+            'params': self.params,
+            'status': self.status,
+            'progress': self.progress(),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobStore:
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        ttl = jobs_ttl_sec()
+        for job_id in [j.id for j in self._jobs.values() if j.finished and (now - (j.finished_at or now)) > ttl]:
+            del self._jobs[job_id]
+
+    def submit(self, tipo: str, fn: Callable[..., Any], key: str, params: Dict[str, Any]) -> Job:
+        """Cria (ou reaproveita, mesma chave em andamento) um job; `BulkheadFullError` com a fila cheia."""
+        with self._lock:
+            self._prune(time.time())
+            active = self._active.get(key)
+            if active is not None:
+                return active
+            job = Job(tipo, key, params)
+            # Registra antes de agendar: o worker pode terminar antes do fim deste bloco
+            self._jobs[job.id] = job
+            self._active[key] = job
+            try:
+                job_bulkhead.submit(contextvars.Context().run, self._run, job, fn)
+            except Exception:
+                del self._jobs[job.id]
+                del self._active[key]
+                raise
+        metrics.increment('jobs.submitted', tags={'tipo': tipo})
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[..., Any]) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = cache.get(job.key)
+            if not result:
+                existing = inflight.get(job.key)
+                if existing is not None:
+                    # Alguém já calcula esta chave: acompanha o progresso dele e espera
+                    job.budget = existing.budget
+                    try:
+                        existing.future.result()
+                    except Exception:
+                        pass
+                    result = cache.get(job.key)
+            if not result:
+                job.budget = deadline.start(None)
+                with traffic_class(BACKGROUND):
+                    result = fn(**job.params)
+            job.result = result
+            job.status = DONE
+        except HTTPException as e:
+            job.error = str(e.detail)
+            job.status = FAILED
+        except Exception as e:
+            logger.exception("Falha no job %s (%s)", job.id, job.tipo)
+            job.error = str(e) or e.__class__.__name__
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+            metrics.increment('jobs.finished', tags={'tipo': job.tipo, 'status': job.status})
+            metrics.record_timing('jobs.duration_ms', (job.finished_at - job.started_at) * 1000, tags={'tipo': job.tipo})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                out[job.status] += 1
+            return out
+
+
+job_store = JobStore()
@@ -0,0 +1,174 @@
+"""
+Eleição de líder para o trabalho agendado contra o GLPI (refresh do snapshot,
+aquecimento do cache).
+
+Com vários workers do Uvicorn (ou várias réplicas), só o líder faz as
+atualizações periódicas e publica o resultado na camada compartilhada
+(`TICKET_SNAPSHOT_DIR`, `SHARED_CACHE_DIR`); os demais apenas leem. A carga no
+GLPI não cresce com o número de processos.
+
+Backends (`LEADER_BACKEND`):
+- `file`: `flock` não bloqueante em `LEADER_LOCK_PATH` (mesma máquina). O lock é
+  mantido pela vida do processo e some sozinho se ele morrer.
+- `http`: lease com TTL num serviço externo (`LEADER_LEASE_URL`), renovado por uma
+  thread a cada TTL/3. O stand-in do GLPI emula o serviço (`/_standin/lease/<nome>`)
+  para testar várias réplicas localmente.
+- `none`: processo único, sempre líder.
+- `auto` (padrão): `http` se houver `LEADER_LEASE_URL`, `file` se houver diretório
+  compartilhado, senão `none`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import requests
+
+from . import metrics
+from ..config import leader_settings
+
+logger = logging.getLogger(__name__)
+
+
+class NoopBackend:
+    name = "none"
+
+    def try_acquire(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+
+class FileLockBackend:
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        import fcntl
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # Mantido aberto pela vida do processo: o lock some se o processo morrer
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class HttpLeaseBackend:
+    name = "http"
+
+    def __init__(self, url: str, holder: str, ttl_sec: float):
+        self.url = url.rstrip("/")
+        self.holder = holder
+        self.ttl_sec = ttl_sec
+
+    def try_acquire(self) -> bool:
+        try:
+            resp = requests.post(self.url, json={"holder": self.holder, "ttl_sec": self.ttl_sec}, timeout=2)
+            resp.raise_for_status()
+            return bool(resp.json().get("granted"))
+        except (requests.exceptions.RequestException, ValueError):
+            # Sem resposta do serviço de lease: assume que não é líder (o lease de outro expira sozinho)
+            return False
+
+    def release(self) -> None:
+        try:
+            requests.post(f"{self.url}/release", json={"holder": self.holder}, timeout=2)
+        except requests.exceptions.RequestException:
+            pass
+
+
+def holder_id() -> str:
+    """Identidade deste processo no lease (host-pid-aleatório)."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaderElector:
+    def __init__(self, backend: Any, holder: str, renew_sec: Optional[float] = None):
+        self.backend = backend
+        self.holder = holder
+        self.renew_sec = renew_sec
+        self._leader = False
+        self._since: Optional[float] = None
+        self._lock = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+    def _update(self, leader: bool) -> bool:
+        with self._lock:
+            if leader != self._leader:
+                logger.info("leader.%s holder=%s backend=%s", "acquired" if leader else "lost", self.holder, self.backend.name)
+                metrics.increment('leader.transition', tags={'to': 'leader' if leader else 'follower'})
+                metrics.gauge('leader.is_leader', 1 if leader else 0)
+                self._since = time.time() if leader else None
+            self._leader = leader
+            return leader
+
+    def is_leader(self) -> bool:
+        """
+        Devolve se este processo é o líder agora. Com lease (`renew_sec`), a primeira
+        chamada adquire na hora e inicia a renovação em background; as seguintes
+        devolvem o último resultado da renovação.
+        """
+        if self.renew_sec is None or self._start_renewer():
+            return self._update(self.backend.try_acquire())
+        return self._leader
+
+    def _start_renewer(self) -> bool:
+        with self._lock:
+            if self._renewer is not None:
+                return False
+
+            def _loop() -> None:
+                while True:
+                    time.sleep(self.renew_sec)
+                    self._update(self.backend.try_acquire())
+
+            self._renewer = threading.Thread(target=_loop, name="leader-lease", daemon=True)
+            self._renewer.start()
+            return True
+
+    def release(self) -> None:
+        self.backend.release()
+        self._update(False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'holder': self.holder,
+                'leader': self._leader,
+                'since': self._since,
+            }
+
+
+def _build() -> LeaderElector:
+    cfg = leader_settings()
+    holder = holder_id()
+    if cfg['backend'] == 'http' and cfg['lease_url']:
+        backend = HttpLeaseBackend(cfg['lease_url'], holder, cfg['lease_ttl_sec'])
+        return LeaderElector(backend, holder, renew_sec=cfg['lease_ttl_sec'] / 3)
+    if cfg['backend'] == 'file' and cfg['lock_path']:
+        return LeaderElector(FileLockBackend(cfg['lock_path']), holder)
+    return LeaderElector(NoopBackend(), holder)
+
+
+leader = _build()
@@ -2,6 +2,7 @@ import logging
 from typing import Dict, Optional
 
 _counters: Dict[str, int] = {}
+_gauges: Dict[str, float] = {}
 logger = logging.getLogger(__name__)
 
 def increment(name: str, value: int = 1, tags: Optional[Dict[str, str]] = None) -> None:
@@ -9,6 +10,11 @@ def increment(name: str, value: int = 1, tags: Optional[Dict[str, str]] = None)
     _counters[key] = _counters.get(key, 0) + value
     logger.info("metric.increment name=%s value=%d tags=%s total=%d", name, value, tags or {}, _counters[key])
 
+def gauge(name: str, value: float, tags: Optional[Dict[str, str]] = None) -> None:
+    key = _format_key(name, tags)
+    _gauges[key] = value
+    logger.info("metric.gauge name=%s value=%s tags=%s", name, value, tags or {})
+
 def record_timing(name: str, elapsed_ms: float, tags: Optional[Dict[str, str]] = None) -> None:
     logger.info("metric.timing name=%s elapsed_ms=%.2f tags=%s", name, elapsed_ms, tags or {})
 
@@ -0,0 +1,182 @@
+"""
+Profiling sob demanda por amostragem de stacks.
+
+Dois modos, ambos desligados por padrão (sem custo quando desabilitados):
+
+- Por requisição: com `PROFILE_TOKEN` definido, uma requisição que envie
+  `X-Profile: <token>` (ou `?__profile=<token>`) é amostrada enquanto executa.
+  Apenas as threads que trabalharam na requisição (registradas pela trace)
+  entram na amostra. A saída em formato "collapsed stacks" é gravada em
+  `PROFILE_DIR/<request_id>.folded` ou devolvida no corpo com
+  `X-Profile-Output: inline`.
+- Processo inteiro: com `PROFILE_SAMPLING=1`, uma thread daemon amostra todas
+  as threads e grava a cada `PROFILE_DUMP_INTERVAL_SEC` um arquivo
+  `process-<pid>-<ts>.folded`, pronto para `flamegraph.pl`/speedscope.
+
+A amostragem usa `sys._current_frames()`, portanto captura tanto espera de
+rede (frames em `socket`/`ssl`) quanto CPU (json, conversões por linha).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+from ..config import profile_dir, profile_interval_ms, profile_dump_interval_sec
+
+logger = logging.getLogger(__name__)
+
+# Nomes de arquivo de profile: só [A-Za-z0-9_-], com tamanho limitado
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_-]")
+_MAX_NAME_LEN = 80
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename})"
+
+
+def collapse_frame(frame) -> str:
+    """Converte um frame em stack colapsada (raiz primeiro, separada por `;`)."""
+    parts: List[str] = []
+    while frame is not None:
+        parts.append(_frame_label(frame))
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+class StackSampler:
+    """
+    Amostra periodicamente as stacks das threads selecionadas.
+    `thread_filter` devolve o conjunto de thread ids a amostrar (None => todas).
+    """
+
+    def __init__(
+        self,
+        interval_sec: float,
+        thread_filter: Optional[Callable[[], frozenset]] = None,
+    ):
+        self.interval_sec = interval_sec
+        self.thread_filter = thread_filter
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample_once(self) -> None:
+        own = threading.get_ident()
+        wanted = self.thread_filter() if self.thread_filter else None
+        frames = sys._current_frames()
+        with self._lock:
+            for tid, frame in frames.items():
+                if tid == own:
+                    continue
+                if wanted is not None and tid not in wanted:
+                    continue
+                self.stacks[collapse_frame(frame)] += 1
+            self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self._sample_once()
+            except Exception:
+                logger.exception("Falha ao amostrar stacks")
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def drain(self) -> Counter:
+        """Devolve as stacks acumuladas e zera o acumulador."""
+        with self._lock:
+            stacks, self.stacks = self.stacks, Counter()
+            self.samples = 0
+        return stacks
+
+
+def format_collapsed(stacks: Counter) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+def safe_name(name: str) -> str:
+    """Nome de arquivo seguro a partir de entrada do cliente (ex.: `X-Request-ID`)."""
+    cleaned = _UNSAFE_NAME.sub("_", name or "")[:_MAX_NAME_LEN]
+    return cleaned if cleaned.strip("_") else uuid4().hex[:16]
+
+
+def write_profile(name: str, stacks: Counter) -> str:
+    """Grava a saída colapsada em `PROFILE_DIR/<name>.folded` e devolve o caminho."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{safe_name(name)}.folded")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(format_collapsed(stacks))
+    os.replace(tmp, path)
+    return path
+
+
+def list_profiles() -> List[str]:
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    return sorted(f for f in os.listdir(directory) if f.endswith(".folded"))
+
+
+def read_profile(name: str) -> Optional[str]:
+    # Impede travessia de diretório: apenas nomes simples dentro de PROFILE_DIR
+    if not name.endswith(".folded") or _UNSAFE_NAME.search(name[:-len(".folded")]):
+        return None
+    path = os.path.join(profile_dir(), name)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def request_sampler(thread_filter: Callable[[], frozenset]) -> StackSampler:
+    return StackSampler(profile_interval_ms() / 1000.0, thread_filter).start()
+
+
+_process_thread: Optional[threading.Thread] = None
+
+
+def start_process_sampler() -> None:
+    """Inicia o modo contínuo (processo inteiro) com dumps periódicos."""
+    global _process_thread
+    if _process_thread is not None:
+        return
+    sampler = StackSampler(profile_interval_ms() / 1000.0).start()
+    dump_every = profile_dump_interval_sec()
+
+    def _dump_loop() -> None:
+        while True:
+            time.sleep(dump_every)
+            stacks = sampler.drain()
+            if not stacks:
+                continue
+            try:
+                path = write_profile(f"process-{os.getpid()}-{int(time.time())}", stacks)
+                logger.info("profile.dump path=%s stacks=%d", path, len(stacks))
+            except Exception:
+                logger.exception("Falha ao gravar dump de profiling")
+
+    _process_thread = threading.Thread(target=_dump_loop, name="profile-dumper", daemon=True)
+    _process_thread.start()
+    logger.info("Profiling contínuo habilitado (dump a cada %ds)", dump_every)
@@ -0,0 +1,227 @@
+"""
+Rastreamento leve por requisição (spans).
+
+Objetivo: decompor a latência de um endpoint (autenticação, páginas GLPI,
+resolução de nomes) sem dependências externas.
+
+- Cada requisição HTTP abre uma `Trace` identificada por `request_id`.
+- A trace ativa é propagada via `contextvars`, inclusive para o threadpool
+  das rotas síncronas (o Starlette copia o contexto ao despachar).
+- `span(nome, **attrs)` mede um trecho e anexa atributos (ex.: range, rows, bytes).
+- Sem trace ativa, `span` não faz nada além de um `ContextVar.get`.
+- Traces concluídas das rotas `/api/` acima de `TRACE_SLOW_MS` vão para um
+  buffer das mais lentas (min-heap de `TRACE_BUFFER_SIZE`: sai a mais rápida,
+  não a mais antiga), consultável pelo endpoint de debug.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config import trace_buffer_size, trace_slow_ms
+
+# Limite de spans por trace para não crescer sem controle em scans muito longos
+MAX_SPANS_PER_TRACE = 2000
+
+
+class Span:
+    __slots__ = ("name", "start", "end", "attrs", "thread_id")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.thread_id = threading.get_ident()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+
+class _NoopSpan:
+    """Span nulo usado quando não há trace ativa."""
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, request_id: str, endpoint: str):
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.thread_ids: set[int] = set()
+        self._lock = threading.Lock()
+
+    def bind_thread(self, thread_id: int) -> None:
+        """Registra uma thread que executou trabalho desta requisição."""
+        if thread_id not in self.thread_ids:
+            with self._lock:
+                self.thread_ids.add(thread_id)
+
+    def threads(self) -> frozenset[int]:
+        with self._lock:
+            return frozenset(self.thread_ids)
+
+    def add(self, sp: Span) -> None:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped_spans += 1
+                return
+            self.spans.append(sp)
+
+    def finish(self, status_code: Optional[int] = None) -> None:
+        self.end = time.perf_counter()
+        self.status_code = status_code
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Agrega spans por nome: quantidade e soma das durações (ms)."""
+        agg: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for sp in spans:
+            entry = agg.setdefault(sp.name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += sp.duration_ms
+        return agg
+
+    def server_timing(self) -> str:
+        """Valor do header `Server-Timing` (uma métrica por nome de span + total)."""
+        parts = []
+        for name, entry in self.summary().items():
+            parts.append(f'{name};dur={entry["total_ms"]:.1f};desc="n={int(entry["count"])}"')
+        parts.append(f"total;dur={self.duration_ms:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "status_code": self.status_code,
+            "dropped_spans": self.dropped_spans,
+            "summary": self.summary(),
+            "spans": [
+                {
+                    "name": sp.name,
+                    "offset_ms": round((sp.start - self.start) * 1000, 2),
+                    "duration_ms": round(sp.duration_ms, 2),
+                    "thread_id": sp.thread_id,
+                    **sp.attrs,
+                }
+                for sp in spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def start_trace(request_id: str, endpoint: str) -> Trace:
+    trace = Trace(request_id, endpoint)
+    _current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    """
+    Mede um trecho dentro da trace ativa.
+    Uso: `with span('glpi.page', range='0-999') as sp: ...; sp.set(rows=n)`.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    sp = Span(name, attrs)
+    trace.bind_thread(sp.thread_id)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        sp.end = time.perf_counter()
+        trace.add(sp)
+
+
+class TraceStore:
+    """
+    Buffer das traces mais lentas: min-heap por duração limitado a `maxlen`.
+    Com o buffer cheio, uma trace nova só entra se for mais lenta que a mais
+    rápida guardada (que sai); polling rápido não empurra as lentas para fora.
+    Só rotas sob `RECORDED_PREFIX` entram (fora `/health`, `/ready`, estáticos).
+    """
+
+    RECORDED_PREFIX = "/api/"
+
+    def __init__(self, maxlen: int, slow_ms: float = 0.0):
+        self.maxlen = maxlen
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.slow_ms = slow_ms
+
+    def record(self, trace: Trace) -> None:
+        if trace.duration_ms < self.slow_ms or not (trace.endpoint or "").startswith(self.RECORDED_PREFIX):
+            return
+        item = (trace.duration_ms, next(self._seq), trace)
+        with self._lock:
+            if len(self._heap) < self.maxlen:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def slowest(self, limit: int = 10, endpoint: Optional[str] = None) -> List[Trace]:
+        with self._lock:
+            traces = [t for _, _, t in self._heap]
+        if endpoint:
+            traces = [t for t in traces if t.endpoint == endpoint]
+        traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        return traces[: max(0, limit)]
+
+    def get(self, request_id: str) -> Optional[Trace]:
+        with self._lock:
+            for _, _, t in self._heap:
+                if t.request_id == request_id:
+                    return t
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+
+# Instância global usada pelo middleware e pelo endpoint de debug
+trace_store = TraceStore(maxlen=trace_buffer_size(), slow_ms=trace_slow_ms())
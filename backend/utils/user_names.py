@@ -1,10 +1,19 @@
 import os
 from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 import requests
+from .. import glpi_client
 from .cache import cache
 from . import metrics
-from ..config import name_workers, timeouts_sec
+from . import tracing
+from .bulkhead import BulkheadFullError, name_bulkhead
+from ..config import timeouts_sec
+
+def user_label(data: Dict, uid: int) -> str:
+    """Nome de exibição de um User do GLPI (`firstname realname`)."""
+    full_name = f"{data.get('firstname') or ''} {data.get('realname') or ''}".strip()
+    return full_name if full_name else f"Usuário ID {uid}"
+
 
 def resolve_user_names_fast(headers: Dict[str, str], api_url: str, user_ids: List[int]) -> Dict[int, str]:
     """
@@ -31,15 +40,13 @@ def resolve_user_names_fast(headers: Dict[str, str], api_url: str, user_ids: Lis
             url = f"{api_url}/User/{uid}"
             import time
             t0 = time.perf_counter()
-            resp = requests.get(url, headers=headers, timeout=timeouts_sec())
-            resp.raise_for_status()
-            data = resp.json()
+            with tracing.span('glpi.item', itemtype='User', id=uid):
+                resp = glpi_client.get(url, headers, timeout=timeouts_sec())
+                resp.raise_for_status()
+                data = resp.json()
             if isinstance(data, list) and data:
                 data = data[0]
-            first_name = data.get('firstname', '')
-            last_name = data.get('realname', '')
-            full_name = f"{first_name} {last_name}".strip()
-            name = full_name if full_name else f"Usuário ID {uid}"
+            name = user_label(data, uid)
             t1 = time.perf_counter()
             metrics.record_timing('glpi.user_lookup_ms', (t1 - t0) * 1000, tags={'user_id': str(uid)})
             return uid, name
@@ -61,15 +68,20 @@ def resolve_user_names_fast(headers: Dict[str, str], api_url: str, user_ids: Lis
             return uid, f"Usuário ID {uid} (Dados Incompletos)"
 
     if to_fetch:
-        max_workers = name_workers()
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(fetch, uid): uid for uid in to_fetch}
-            for fut in as_completed(futures):
-                uid, name = fut.result()
-                names_map[uid] = name
-                try:
-                    cache.set(f"user_name_{uid}", name)
-                except Exception:
-                    pass
+        # Executor compartilhado do bulkhead `names` (mantém a trace da requisição)
+        futures = {}
+        for uid in to_fetch:
+            try:
+                futures[name_bulkhead.submit(fetch, uid)] = uid
+            except BulkheadFullError:
+                # Fila cheia: rótulo provisório, sem cache, para tentar de novo depois
+                names_map[uid] = f"Usuário ID {uid}"
+        for fut in as_completed(futures):
+            uid, name = fut.result()
+            names_map[uid] = name
+            try:
+                cache.set(f"user_name_{uid}", name)
+            except Exception:
+                pass
 
     return names_map
\ No newline at end of file
@@ -63,7 +63,7 @@ async function fetchFromAPI<T>(endpoint: string, init?: RequestInit & { query?:
     ...headers,
   } as HeadersInit;
 
-  const response = await fetch(url, { method: rest.method ?? 'GET', headers: mergedHeaders, body: rest.body });
+  const response = await fetch(url, { method: rest.method ?? 'GET', headers: mergedHeaders, body: rest.body, signal: rest.signal });
 
   if (!response.ok) {
     let detail: string | undefined;
@@ -100,6 +100,8 @@ export const fetchMaintenanceNewTickets = (limit: number = 10) => {
 
 // Timeout específico para ranking de técnicos (operação conhecidamente lenta)
 const TECHNICIAN_RANKING_TIMEOUT_MS = 30000; // 30 segundos
+// Prazo enviado ao backend: responde com resultado parcial (X-Partial) antes do abort local
+const TECHNICIAN_RANKING_DEADLINE_MS = TECHNICIAN_RANKING_TIMEOUT_MS - 5000;
 
 // Ranking de Técnicos (por período). Se o endpoint não existir ainda, retorna [] ao invés de falhar.
 export const fetchTechnicianRanking = async (inicio?: string, fim?: string) => {
@@ -110,6 +112,7 @@ export const fetchTechnicianRanking = async (inicio?: string, fim?: string) => {
   try {
     const result = await fetchFromAPI<TechnicianRankingItem[]>(`/manutencao/ranking-tecnicos`, { 
       query: { inicio, fim },
+      headers: { 'X-Deadline-Ms': String(TECHNICIAN_RANKING_DEADLINE_MS) },
       signal: controller.signal
     });
     clearTimeout(timeoutId);